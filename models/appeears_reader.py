@@ -0,0 +1,230 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Columnas comunes a todos los resultados de extracción por punto de AppEEARS
+COMMON_COLUMNS = {
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+    'Date': 'datetime',
+    'MODIS_Tile': 'category'
+}
+
+# Esquema por producto: solo las columnas que usa el pipeline y su tipo compacto.
+# Las columnas de descripción de QA (texto repetido) nunca se leen.
+PRODUCT_SCHEMAS = {
+    'MOD13Q1': {
+        **COMMON_COLUMNS,
+        'MOD13Q1_061__250m_16_days_EVI': 'float32',
+        'MOD13Q1_061__250m_16_days_NDVI': 'float32',
+        'MOD13Q1_061__250m_16_days_VI_Quality': 'uint16',
+        'MOD13Q1_061__250m_16_days_pixel_reliability': 'int16'
+    },
+    'MCD12Q2': {
+        **COMMON_COLUMNS,
+        **{f'MCD12Q2_061_{metric}_{cycle}': 'int16'
+           for metric in ['Dormancy', 'Greenup', 'Maturity', 'Peak', 'Senescence']
+           for cycle in [0, 1]},
+        **{f'MCD12Q2_061_QA_{kind}_{cycle}': 'uint16'
+           for kind in ['Detailed', 'Overall']
+           for cycle in [0, 1]}
+    }
+}
+
+# Valor usado para celdas vacías al convertir columnas enteras
+INTEGER_FILL_VALUES = {
+    'int16': -1,
+    'uint16': 65535
+}
+
+# Bytes por valor de cada tipo del esquema (para dimensionar bloques)
+SCHEMA_DTYPE_BYTES = {
+    'float64': 8,
+    'float32': 4,
+    'int16': 2,
+    'uint16': 2,
+    'datetime': 8,
+    'category': 1
+}
+
+# Memoria de trabajo por fila respecto al bloque ya tipado: el parser de CSV
+# mantiene el texto y los valores intermedios antes de convertirlos
+PARSE_OVERHEAD = 8
+
+
+def infer_product(file_path):
+    """
+    Detecta el producto (MOD13Q1 o MCD12Q2) a partir del encabezado del CSV
+
+    Args:
+        file_path (str): Archivo CSV de resultados de AppEEARS
+
+    Returns:
+        str: Nombre del producto
+    """
+    with open(file_path) as f:
+        header = f.readline()
+
+    for product in PRODUCT_SCHEMAS:
+        if f'{product}_' in header:
+            return product
+
+    raise ValueError(f"No se reconoce el producto de {file_path}")
+
+
+def _read_dtypes(schema):
+    """
+    Tipos usados durante el parseo: las columnas enteras se leen como float
+    porque AppEEARS las escribe como '2321.0' y pueden venir vacías
+    """
+    read_dtypes = {}
+    for column, dtype in schema.items():
+        if dtype == 'datetime':
+            continue
+        if dtype in INTEGER_FILL_VALUES:
+            read_dtypes[column] = 'float32'
+        else:
+            read_dtypes[column] = dtype
+    return read_dtypes
+
+
+def apply_schema(df, schema, region=None):
+    """
+    Convierte un bloque recién leído a los tipos finales del esquema
+
+    Args:
+        df (pd.DataFrame): Datos leídos con los tipos de parseo
+        schema (dict): Esquema del producto
+        region (str): Nombre de la región (opcional)
+
+    Returns:
+        pd.DataFrame: Datos con tipos compactos
+    """
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'datetime':
+            df[column] = pd.to_datetime(df[column], format='%Y-%m-%d')
+        elif dtype in INTEGER_FILL_VALUES:
+            values = df[column].to_numpy()
+            df[column] = np.where(np.isnan(values), INTEGER_FILL_VALUES[dtype], values).astype(dtype)
+        elif df[column].dtype != dtype:
+            # Bloques de Parquet pueden traer float64 o texto en lugar de los tipos compactos
+            df[column] = df[column].astype(dtype)
+
+    if region is not None:
+        df['Region'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[region])
+
+    return df
+
+
+def read_appeears_csv(file_path, product=None, region=None, columns=None, names=None):
+    """
+    Lee un CSV de resultados de AppEEARS cargando solo las columnas del esquema
+
+    Args:
+        file_path (str): Archivo CSV de resultados (o buffer con datos)
+        product (str): 'MOD13Q1' o 'MCD12Q2' (se detecta si es None)
+        region (str): Nombre de la región a agregar como columna categórica
+        columns (list): Subconjunto de columnas del esquema a leer
+        names (list): Encabezado completo cuando los datos no lo incluyen
+            (por ejemplo, al leer solo el final de un archivo)
+
+    Returns:
+        pd.DataFrame: Datos con tipos compactos (float32, int16, uint16,
+            categóricas y fecha ya parseada)
+    """
+    if product is None:
+        product = infer_product(file_path)
+    if names is not None:
+        read_options = {'header': None, 'names': names}
+    else:
+        read_options = {}
+
+    schema = PRODUCT_SCHEMAS[product]
+    if columns is not None:
+        schema = {column: schema[column] for column in columns}
+
+    df = pd.read_csv(
+        file_path,
+        usecols=list(schema),
+        dtype=_read_dtypes(schema),
+        **read_options
+    )
+
+    return apply_schema(df, schema, region)
+
+
+def chunk_rows_for_budget(product, memory_budget_mb, columns=None):
+    """
+    Número de filas por bloque para que leer y limpiar un bloque quepa en el
+    presupuesto de memoria
+
+    Args:
+        product (str): 'MOD13Q1' o 'MCD12Q2'
+        memory_budget_mb (float): Presupuesto de memoria por bloque en MB
+        columns (list): Subconjunto de columnas del esquema a leer
+
+    Returns:
+        int: Filas por bloque (al menos 1,000)
+    """
+    schema = PRODUCT_SCHEMAS[product]
+    if columns is not None:
+        schema = {column: schema[column] for column in columns}
+
+    row_bytes = sum(SCHEMA_DTYPE_BYTES[dtype] for dtype in schema.values()) * PARSE_OVERHEAD
+    return max(1000, int(memory_budget_mb * 1024 * 1024 // row_bytes))
+
+
+def iter_appeears_chunks(file_path, product=None, region=None, columns=None, chunk_rows=100000):
+    """
+    Lee un resultado de AppEEARS por bloques con los tipos del esquema
+
+    Los CSV se leen con el parser por bloques de pandas; los archivos Parquet
+    se leen por lotes de sus grupos de filas. Nunca se carga la tabla completa.
+
+    Args:
+        file_path (str): Archivo de resultados (.csv o .parquet)
+        product (str): 'MOD13Q1' o 'MCD12Q2' (se detecta si es None en CSV)
+        region (str): Nombre de la región a agregar como columna categórica
+        columns (list): Subconjunto de columnas del esquema a leer
+        chunk_rows (int): Filas por bloque
+
+    Yields:
+        pd.DataFrame: Bloques con tipos compactos
+    """
+    file_path = Path(file_path)
+    parquet = file_path.suffix == '.parquet'
+
+    if product is None:
+        if parquet:
+            raise ValueError("Debe indicar el producto al leer archivos Parquet")
+        product = infer_product(file_path)
+
+    schema = PRODUCT_SCHEMAS[product]
+    if columns is not None:
+        schema = {column: schema[column] for column in columns}
+
+    if parquet:
+        if not PARQUET_AVAILABLE:
+            raise ImportError("pyarrow es necesario para leer archivos Parquet")
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=list(schema)):
+            yield apply_schema(batch.to_pandas(), schema, region)
+        return
+
+    reader = pd.read_csv(
+        file_path,
+        usecols=list(schema),
+        dtype=_read_dtypes(schema),
+        chunksize=chunk_rows
+    )
+    with reader:
+        for chunk in reader:
+            yield apply_schema(chunk, schema, region)
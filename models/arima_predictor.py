@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_cache import load_processed_data
+from ndvi_panel import COMPOSITES_PER_YEAR, composite_dates
+from series_provider import RegionSeriesProvider
+from arima_search import ARIMASearchExecutor, grid_candidates, select_best, stepwise_search, summarize_results
+from model_registry import ModelRegistry, config_hash, series_fingerprint
+from interval_engine import DEFAULT_INTERVAL_LEVEL, DEFAULT_QUANTILES, add_prediction_intervals, calibration_residuals
+
 try:
     from statsmodels.tsa.arima.model import ARIMA
     from statsmodels.tsa.seasonal import seasonal_decompose
@@ -14,22 +20,174 @@ except ImportError:
     ARIMA_AVAILABLE = False
     print("⚠️ statsmodels no disponible. Instala con: pip install statsmodels")
 
+def adf_test(ts_data):
+    """
+    Prueba de estacionariedad usando ADF test
+    
+    Args:
+        ts_data (pd.Series): Serie temporal
+        
+    Returns:
+        dict: Resultados del test
+    """
+    result = adfuller(ts_data.dropna())
+    
+    return {
+        'ADF Statistic': result[0],
+        'p-value': result[1],
+        'Critical Values': result[4],
+        'is_stationary': result[1] < 0.05
+    }
+
+def difference_to_stationary(ts_data, max_diffs=3):
+    """
+    Diferencia la serie hasta que la prueba ADF la considera estacionaria
+    
+    Args:
+        ts_data (pd.Series): Serie temporal
+        max_diffs (int): Máximo de diferenciaciones
+        
+    Returns:
+        tuple: (serie_estacionaria, diferencia_aplicada)
+    """
+    diff_count = 0
+    current_ts = ts_data.copy()
+    
+    while diff_count < max_diffs:
+        if adf_test(current_ts)['is_stationary']:
+            break
+            
+        current_ts = current_ts.diff().dropna()
+        diff_count += 1
+    
+    return current_ts, diff_count
+
+def search_arima_order(executor, values, search='grid', seasonal_period=None, max_p=3, max_d=2, max_q=3):
+    """
+    Busca el orden ARIMA de menor AIC
+    
+    Args:
+        executor (ARIMASearchExecutor): Ejecutor de los ajustes candidatos
+        values (np.ndarray): Serie (ya diferenciada si corresponde)
+        search (str): 'grid' (exhaustiva) o 'stepwise' (escalonada)
+        seasonal_period (int): Periodo estacional para 'stepwise'
+        max_p (int): Máximo valor de p
+        max_d (int): Máximo valor de d
+        max_q (int): Máximo valor de q
+        
+    Returns:
+        dict: strategy, results, best (None si ningún candidato se ajustó)
+            y summary
+    """
+    if search == 'stepwise':
+        # d ya fue elegido por difference_to_stationary (prueba ADF); solo se
+        # recorren los vecinos de (p, q) y, si aplica, (P, Q) estacionales
+        best, results = stepwise_search(executor, values, d=0, seasonal_period=seasonal_period)
+    else:
+        # Todos los candidatos se ajustan en paralelo; los fallos, tiempos
+        # agotados y advertencias quedan en los resultados
+        results = executor.run(values, grid_candidates(max_p, max_d, max_q))
+        best = select_best(results)
+    
+    return {
+        'strategy': search,
+        'results': results,
+        'best': best,
+        'summary': summarize_results(results)
+    }
+
+def select_arima_order(executor, ts_data, search='grid', seasonal_period=None):
+    """
+    Elige el orden ARIMA como ARIMAPredictor: diferencia la serie hasta que
+    es estacionaria, busca el orden sobre la serie diferenciada y suma las
+    diferenciaciones aplicadas a d
+    
+    Args:
+        executor (ARIMASearchExecutor): Ejecutor de los ajustes candidatos
+        ts_data (pd.Series): Serie a ajustar
+        search (str): 'grid' o 'stepwise'
+        seasonal_period (int): Periodo estacional para 'stepwise'
+        
+    Returns:
+        tuple: ((p, d, q), orden estacional, resultado de search_arima_order)
+    """
+    stationary_data, diff_count = difference_to_stationary(ts_data)
+    search_result = search_arima_order(executor, stationary_data.to_numpy(), search, seasonal_period)
+    
+    best = search_result['best']
+    if best is None:
+        # Ningún candidato se ajustó: ARIMA(0, d, 0)
+        return (0, diff_count, 0), (0, 0, 0, 0), search_result
+    
+    p, d, q = best['order']
+    return (p, d + diff_count, q), tuple(best['seasonal_order']), search_result
+
 class ARIMAPredictor:
     """
     Clase para predicción usando modelos ARIMA
     """
     
-    def __init__(self, data_file="data/processed/processed_ndvi_data.csv"):
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", search_workers=None, fit_timeout=60,
+                 search='grid', seasonal_period=None, registry_dir="data/models",
+                 update_mode='refit', refit_every=6, drift_threshold=3.0, interval_level=DEFAULT_INTERVAL_LEVEL,
+                 quantiles=DEFAULT_QUANTILES, interval_method='conformal', calibration_errors=None):
         """
         Inicializa el predictor ARIMA
         
         Args:
             data_file (str): Archivo CSV con datos procesados
+            search_workers (int): Procesos para la búsqueda de parámetros
+                (None = número de núcleos, 1 = secuencial)
+            fit_timeout (float): Segundos máximos por ajuste de candidato
+            search (str): Estrategia de búsqueda: 'grid' (exhaustiva) o
+                'stepwise' (escalonada, pocos ajustes por serie)
+            seasonal_period (int): Periodo estacional para 'stepwise'
+                (por ejemplo COMPOSITES_PER_YEAR; None = sin estacionalidad)
+            registry_dir (str): Carpeta del registro de modelos ajustados
+                (None = no reutilizar ni guardar ajustes)
+            update_mode (str): 'refit' (búsqueda y ajuste completos cuando
+                cambia la serie) o 'incremental' (filtrar las composiciones
+                nuevas con los parámetros del ajuste anterior)
+            refit_every (int): En modo incremental, composiciones nuevas
+                tras las cuales se vuelven a estimar los parámetros
+            drift_threshold (float): En modo incremental, error de pronóstico
+                estandarizado máximo de las composiciones nuevas antes de
+                volver a estimar
+            interval_level (float): Cobertura de Lower_Bound–Upper_Bound
+            quantiles (tuple): Cuantiles intermedios adicionales (columnas Q<porcentaje>)
+            interval_method (str): 'conformal' o 'bootstrap' (ver interval_engine)
+            calibration_errors (pd.DataFrame | str): Errores del backtest (o ruta
+                del CSV exportado) con los que se calibran los intervalos; None =
+                errores de la validación 80/20
         """
+        if search not in ('grid', 'stepwise'):
+            raise ValueError(f"Estrategia de búsqueda {search} no soportada")
+        if update_mode not in ('refit', 'incremental'):
+            raise ValueError(f"Modo de actualización {update_mode} no soportado")
+        if update_mode == 'incremental' and registry_dir is None:
+            raise ValueError("El modo incremental requiere el registro de modelos")
+        
         self.data_file = data_file
         self.data = None
+        self.panel = None
+        self.series_provider = RegionSeriesProvider(data_file)
         self.models = {}
         self.predictions = {}
+        self.search_executor = ARIMASearchExecutor(search_workers, fit_timeout)
+        self.search = search
+        self.seasonal_period = seasonal_period
+        self.search_results = {}
+        self.selected_orders = {}
+        self.last_search = None
+        self.registry = ModelRegistry(registry_dir) if registry_dir is not None else None
+        self.update_mode = update_mode
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+        self.update_log = {}
+        self.interval_level = interval_level
+        self.quantiles = quantiles
+        self.interval_method = interval_method
+        self.calibration_errors = calibration_errors
         
     def load_data(self):
         """
@@ -38,12 +196,13 @@ class ARIMAPredictor:
         print("📊 Cargando datos para modelo ARIMA...")
         
         try:
-            self.data = pd.read_csv(self.data_file)
-            self.data['Date'] = pd.to_datetime(self.data['Date'])
+            self.data = load_processed_data(self.data_file)
             self.data = self.data.sort_values(['Region', 'Date'])
+            self.panel = self.series_provider.panel()
             
             print(f"✓ Datos cargados: {len(self.data)} registros")
             print(f"✓ Período: {self.data['Date'].min()} a {self.data['Date'].max()}")
+            print(f"✓ Panel: {len(self.panel)} regiones × {len(self.panel.dates)} composiciones")
             
             return self.data
             
@@ -59,23 +218,12 @@ class ARIMAPredictor:
             region (str): Nombre de la región
             
         Returns:
-            pd.Series: Serie temporal con índice de fecha
+            pd.Series: Serie temporal con índice de fecha (una composición
+                de 16 días por período)
         """
-        region_data = self.data[self.data['Region'] == region].copy()
-        region_data = region_data.sort_values('Date')
-        
-        # Crear serie temporal
-        ts_data = region_data.set_index('Date')['NDVI']
-        
-        # Reindexar para fechas consecutivas
-        date_range = pd.date_range(start=ts_data.index.min(), 
-                                 end=ts_data.index.max(), 
-                                 freq='16D')
-        
-        ts_data = ts_data.reindex(date_range)
-        ts_data = ts_data.interpolate(method='linear')
-        
-        return ts_data
+        # Fila del panel: fit_arima_model y predict_future no vuelven a
+        # recorrer todos los datos
+        return self.series_provider.series(region)
     
     def test_stationarity(self, ts_data):
         """
@@ -87,14 +235,7 @@ class ARIMAPredictor:
         Returns:
             dict: Resultados del test
         """
-        result = adfuller(ts_data.dropna())
-        
-        return {
-            'ADF Statistic': result[0],
-            'p-value': result[1],
-            'Critical Values': result[4],
-            'is_stationary': result[1] < 0.05
-        }
+        return adf_test(ts_data)
     
     def make_stationary(self, ts_data):
         """
@@ -106,20 +247,8 @@ class ARIMAPredictor:
         Returns:
             tuple: (serie_estacionaria, diferencia_aplicada)
         """
-        # Aplicar diferenciación hasta que sea estacionaria
-        diff_count = 0
-        current_ts = ts_data.copy()
-        
-        while diff_count < 3:  # Máximo 3 diferenciaciones
-            adf_result = self.test_stationarity(current_ts)
-            
-            if adf_result['is_stationary']:
-                break
-                
-            current_ts = current_ts.diff().dropna()
-            diff_count += 1
-        
-        return current_ts, diff_count
+        # Aplicar diferenciación hasta que sea estacionaria (máximo 3)
+        return difference_to_stationary(ts_data)
     
     def find_best_arima_params(self, ts_data, max_p=3, max_d=2, max_q=3):
         """
@@ -134,27 +263,247 @@ class ARIMAPredictor:
         Returns:
             tuple: (p, d, q) mejores parámetros
         """
-        best_aic = float('inf')
-        best_params = (0, 0, 0)
-        
-        print(f"🔍 Buscando mejores parámetros ARIMA...")
-        
-        for p in range(max_p + 1):
-            for d in range(max_d + 1):
-                for q in range(max_q + 1):
-                    try:
-                        model = ARIMA(ts_data, order=(p, d, q))
-                        fitted_model = model.fit()
-                        
-                        if fitted_model.aic < best_aic:
-                            best_aic = fitted_model.aic
-                            best_params = (p, d, q)
-                            
-                    except:
-                        continue
-        
-        print(f"✓ Mejores parámetros: ARIMA{best_params}, AIC={best_aic:.2f}")
-        return best_params
+        print(f"🔍 Buscando mejores parámetros ARIMA ({self.search})...")
+        
+        self.last_search = search_arima_order(self.search_executor, ts_data.to_numpy(), self.search,
+                                              self.seasonal_period, max_p, max_d, max_q)
+        self._report_search(self.last_search)
+        
+        best = self.last_search['best']
+        return (0, 0, 0) if best is None else best['order']
+    
+    def _report_search(self, search):
+        """
+        Imprime el resumen de una búsqueda de orden
+        """
+        summary = search['summary']
+        best = search['best']
+        
+        print(f"  Candidatos: {summary['ok']} ajustados, {summary['failed']} fallidos, "
+              f"{summary['timeout']} sin terminar, {summary['with_warnings']} con advertencias")
+        
+        if best is None:
+            print("⚠️ Ningún candidato se ajustó; se usa ARIMA(0, 0, 0)")
+        else:
+            print(f"✓ Mejores parámetros: ARIMA{best['order']}{self._seasonal_label(best['seasonal_order'])}, "
+                  f"AIC={best['aic']:.2f}")
+    
+    def _seasonal_label(self, seasonal_order):
+        """
+        Texto del orden estacional (vacío si no hay estacionalidad)
+        """
+        P, D, Q, m = seasonal_order
+        return f"({P},{D},{Q})[{m}]" if m > 1 else ""
+    
+    def _model_config(self, auto_params=True):
+        """
+        Configuración que determina el orden y el ajuste (para el registro)
+        """
+        return {
+            'model': 'ARIMA',
+            'auto_params': auto_params,
+            'search': self.search,
+            'seasonal_period': self.seasonal_period,
+            'grid': [3, 2, 3]
+        }
+    
+    def _select_and_fit(self, region, stage, ts_data, auto_params=True):
+        """
+        Elige el orden y ajusta el modelo, reutilizando el registro
+        
+        Si el registro tiene un ajuste para la misma región, configuración y
+        serie, no se busca el orden ni se optimiza: el modelo se reconstruye
+        filtrando la serie con los parámetros guardados. En modo incremental,
+        si solo hay un ajuste de una versión más corta de la serie, se
+        actualiza ese ajuste con las composiciones nuevas. Si no, se ajusta
+        con el orden elegido en la etapa de validación de la misma región (el
+        pronóstico no repite la búsqueda) o se busca el orden, y se guarda el
+        resultado.
+        
+        Args:
+            region (str): Nombre de la región
+            stage (str): 'validation' o 'forecast' (para search_results)
+            ts_data (pd.Series): Serie a ajustar
+            auto_params (bool): Si buscar el orden automáticamente
+            
+        Returns:
+            tuple: (modelo ajustado, (p, d, q), orden estacional)
+        """
+        config_key = config_hash(self._model_config(auto_params))
+        data_fingerprint = series_fingerprint(ts_data)
+        
+        record = None
+        if self.registry is not None:
+            record = self.registry.get(region, 'ARIMA', config_key, data_fingerprint)
+        
+        if record is not None:
+            order = tuple(record['order'])
+            seasonal_order = tuple(record['seasonal_order'])
+            model = ARIMA(ts_data.to_numpy(), order=order, seasonal_order=seasonal_order)
+            fitted_model = model.filter(np.asarray(record['params']))
+            
+            self.search_results[(region, stage)] = {
+                'strategy': 'registry',
+                'results': [],
+                'best': None,
+                'summary': record['diagnostics'].get('search')
+            }
+            print(f"  ♻️ Ajuste reutilizado del registro: ARIMA{order}{self._seasonal_label(seasonal_order)}")
+            if stage == 'validation' and auto_params:
+                self.selected_orders[region] = (order, seasonal_order)
+            return fitted_model, order, seasonal_order
+        
+        previous = None
+        if self.update_mode == 'incremental':
+            previous = self._previous_fit(region, stage, config_key, ts_data)
+        
+        if previous is not None:
+            fitted_model, since_estimation = self._update_from_previous(region, stage, ts_data, previous)
+            p, d, q = previous['order']
+            seasonal_order = tuple(previous['seasonal_order'])
+            self.search_results[(region, stage)] = {
+                'strategy': 'incremental',
+                'results': [],
+                'best': None,
+                'summary': previous['diagnostics'].get('search')
+            }
+            if stage == 'validation' and auto_params:
+                self.selected_orders[region] = ((p, d, q), seasonal_order)
+        elif auto_params and stage == 'forecast' and region in self.selected_orders:
+            # Reutilizar el orden elegido en la validación (solo se reajustan
+            # los parámetros con la serie completa)
+            (p, d, q), seasonal_order = self.selected_orders[region]
+            validation = self.search_results.get((region, 'validation'))
+            self.search_results[(region, stage)] = {
+                'strategy': 'validation',
+                'results': [],
+                'best': None,
+                'summary': validation['summary'] if validation else None
+            }
+            print(f"  ⏩ Orden de la validación reutilizado: ARIMA({p},{d},{q}){self._seasonal_label(seasonal_order)}")
+        elif auto_params:
+            # Hacer estacionaria la serie y encontrar mejores parámetros (la
+            # misma selección que usa el backtest en cada origen)
+            print(f"🔍 Buscando mejores parámetros ARIMA ({self.search})...")
+            (p, d, q), seasonal_order, self.last_search = select_arima_order(
+                self.search_executor, ts_data, self.search, self.seasonal_period
+            )
+            self._report_search(self.last_search)
+            self.search_results[(region, stage)] = self.last_search
+            if stage == 'validation':
+                self.selected_orders[region] = ((p, d, q), seasonal_order)
+        else:
+            # Usar parámetros por defecto
+            p, d, q = 1, 1, 1
+            seasonal_order = (0, 0, 0, 0)
+        
+        if previous is None:
+            # Se ajusta sobre los valores: el calendario de composiciones (que se
+            # reinicia cada 1 de enero) no es una frecuencia regular de pandas
+            model = ARIMA(ts_data.to_numpy(), order=(p, d, q), seasonal_order=seasonal_order)
+            fitted_model = model.fit()
+            since_estimation = 0
+            searched = auto_params and self.search_results[(region, stage)]['strategy'] != 'validation'
+            self.update_log[(region, stage)] = {'action': 'search' if searched else 'fit'}
+        
+        if self.registry is not None:
+            search = self.search_results.get((region, stage)) if auto_params else None
+            self.registry.put(region, 'ARIMA', config_key, data_fingerprint, {
+                'order': [p, d, q],
+                'seasonal_order': list(seasonal_order),
+                'params': fitted_model.params.tolist(),
+                'param_names': list(fitted_model.model.param_names),
+                'nobs': int(fitted_model.nobs),
+                'stage': stage,
+                'series_length': len(ts_data),
+                'first_date': str(ts_data.index[0].date()),
+                'last_date': str(ts_data.index[-1].date()),
+                'observations_since_estimation': since_estimation,
+                'config': self._model_config(auto_params),
+                'diagnostics': {
+                    'aic': float(fitted_model.aic),
+                    'bic': float(fitted_model.bic),
+                    'llf': float(fitted_model.llf),
+                    'converged': self._converged(fitted_model),
+                    'search': search['summary'] if search else None
+                }
+            })
+        
+        return fitted_model, (p, d, q), seasonal_order
+    
+    @staticmethod
+    def _converged(fitted_model):
+        """
+        Si la optimización convergió (None si el modelo solo se filtró)
+        """
+        mle_retvals = getattr(fitted_model, 'mle_retvals', None)
+        return bool(mle_retvals.get('converged', True)) if mle_retvals else None
+    
+    def _previous_fit(self, region, stage, config_key, ts_data):
+        """
+        Ajuste registrado más reciente de la misma etapa y configuración cuya
+        serie es un prefijo (más corto) de la serie actual
+        
+        La etapa se compara para que el pronóstico no parta del ajuste de
+        validación (80 % de la serie) escrito en la misma ejecución.
+        """
+        first_date = str(ts_data.index[0].date())
+        
+        for record in self.registry.records(region, 'ARIMA', config_key):
+            length = record.get('series_length', 0)
+            if record.get('stage') != stage or record.get('first_date') != first_date or not 0 < length < len(ts_data):
+                continue
+            if series_fingerprint(ts_data.iloc[:length]) == record.get('data_fingerprint'):
+                return record
+        
+        return None
+    
+    def _update_from_previous(self, region, stage, ts_data, previous):
+        """
+        Actualiza un ajuste anterior con las composiciones nuevas
+        
+        La serie completa se filtra con los parámetros guardados (sin
+        optimizar). Los parámetros solo se vuelven a estimar, partiendo de
+        los anteriores, si se acumularon refit_every composiciones desde la
+        última estimación o si el error de pronóstico estandarizado de alguna
+        composición nueva supera drift_threshold.
+        
+        Returns:
+            tuple: (modelo ajustado, composiciones desde la última estimación)
+        """
+        order = tuple(previous['order'])
+        seasonal_order = tuple(previous['seasonal_order'])
+        params = np.asarray(previous['params'])
+        new_observations = len(ts_data) - previous['series_length']
+        since_estimation = previous.get('observations_since_estimation', 0) + new_observations
+        
+        model = ARIMA(ts_data.to_numpy(), order=order, seasonal_order=seasonal_order)
+        fitted_model = model.filter(params)
+        
+        # Errores de pronóstico a un paso de las composiciones nuevas
+        errors = fitted_model.filter_results.standardized_forecasts_error[0, -new_observations:]
+        max_error = float(np.nanmax(np.abs(errors))) if new_observations > 0 else 0.0
+        drift = max_error > self.drift_threshold
+        
+        if drift or since_estimation >= self.refit_every:
+            fitted_model = model.fit(start_params=params)
+            action = 'reestimate'
+            reason = 'deriva' if drift else 'periodicidad'
+            since_estimation = 0
+            print(f"  🔁 Parámetros reestimados desde el ajuste anterior ({reason}, |z| máx = {max_error:.2f})")
+        else:
+            action = 'filter'
+            print(f"  ⏩ Filtrado con los parámetros anteriores: {new_observations} composiciones nuevas "
+                  f"(|z| máx = {max_error:.2f})")
+        
+        self.update_log[(region, stage)] = {
+            'action': action,
+            'new_observations': new_observations,
+            'max_standardized_error': max_error,
+            'observations_since_estimation': since_estimation
+        }
+        
+        return fitted_model, since_estimation
     
     def fit_arima_model(self, region, auto_params=True):
         """
@@ -176,21 +525,9 @@ class ARIMAPredictor:
         train_data = ts_data[:train_size]
         test_data = ts_data[train_size:]
         
-        # Hacer estacionaria la serie
-        stationary_data, diff_count = self.make_stationary(train_data)
-        
-        if auto_params:
-            # Encontrar mejores parámetros automáticamente
-            p, d, q = self.find_best_arima_params(stationary_data)
-            d += diff_count  # Ajustar d por las diferenciaciones aplicadas
-        else:
-            # Usar parámetros por defecto
-            p, d, q = 1, 1, 1
-        
-        # Ajustar modelo ARIMA
+        # Ajustar modelo ARIMA (o reutilizar el ajuste registrado)
         try:
-            model = ARIMA(train_data, order=(p, d, q))
-            fitted_model = model.fit()
+            fitted_model, (p, d, q), seasonal_order = self._select_and_fit(region, 'validation', train_data, auto_params)
             
             # Predicciones en el conjunto de prueba
             predictions = fitted_model.forecast(steps=len(test_data))
@@ -210,7 +547,7 @@ class ARIMAPredictor:
                 'BIC': fitted_model.bic
             }
             
-            print(f"  ✓ Parámetros: ARIMA({p},{d},{q})")
+            print(f"  ✓ Parámetros: ARIMA({p},{d},{q}){self._seasonal_label(seasonal_order)}")
             print(f"  ✓ RMSE: {rmse:.4f}")
             print(f"  ✓ MAPE: {mape:.2f}%")
             print(f"  ✓ AIC: {fitted_model.aic:.2f}")
@@ -219,6 +556,7 @@ class ARIMAPredictor:
                 'model': fitted_model,
                 'metrics': metrics,
                 'params': (p, d, q),
+                'seasonal_order': seasonal_order,
                 'train_data': train_data,
                 'test_data': test_data,
                 'predictions': predictions
@@ -244,25 +582,14 @@ class ARIMAPredictor:
         # Ajustar modelo con todos los datos disponibles
         ts_data = self.prepare_time_series(region)
         
-        # Hacer estacionaria
-        stationary_data, diff_count = self.make_stationary(ts_data)
-        
-        # Encontrar mejores parámetros
-        p, d, q = self.find_best_arima_params(stationary_data)
-        d += diff_count
-        
-        # Ajustar modelo final
-        model = ARIMA(ts_data, order=(p, d, q))
-        fitted_model = model.fit()
+        # Ajustar modelo final (o reutilizar el ajuste registrado)
+        fitted_model, (p, d, q), seasonal_order = self._select_and_fit(region, 'forecast', ts_data)
         
         # Predicciones futuras
-        future_predictions = fitted_model.forecast(steps=periods)
+        future_predictions = np.asarray(fitted_model.forecast(steps=periods))
         
-        # Crear fechas futuras
-        last_date = ts_data.index[-1]
-        future_dates = pd.date_range(start=last_date + timedelta(days=16), 
-                                   periods=periods, 
-                                   freq='16D')
+        # Crear fechas futuras (siguientes composiciones de 16 días)
+        future_dates = composite_dates(ts_data.index[-1], periods)
         
         # Crear DataFrame con predicciones
         predictions_df = pd.DataFrame({
@@ -270,7 +597,7 @@ class ARIMAPredictor:
             'Predicted_NDVI': future_predictions,
             'Region': region,
             'Model': 'ARIMA',
-            'Params': f"ARIMA({p},{d},{q})"
+            'Params': f"ARIMA({p},{d},{q}){self._seasonal_label(seasonal_order)}"
         })
         
         print(f"  ✓ Predicciones generadas para {periods} períodos")
@@ -291,24 +618,36 @@ class ARIMAPredictor:
         
         all_predictions = []
         all_metrics = {}
+        residuals = {}
         
-        for region in self.data['Region'].unique():
-            print(f"\nProcesando región: {region}")
-            
-            # Ajustar modelo y obtener métricas
-            model_result = self.fit_arima_model(region)
-            
-            if model_result is not None:
-                all_metrics[region] = model_result['metrics']
+        try:
+            for region in self.data['Region'].unique():
+                print(f"\nProcesando región: {region}")
+                
+                # Ajustar modelo y obtener métricas
+                model_result = self.fit_arima_model(region)
                 
-                # Generar predicciones futuras
-                future_predictions = self.predict_future(region, periods)
-                all_predictions.append(future_predictions)
+                if model_result is not None:
+                    all_metrics[region] = model_result['metrics']
+                    residuals[region] = model_result['test_data'].values - np.asarray(model_result['predictions'])
+                    
+                    # Generar predicciones futuras
+                    future_predictions = self.predict_future(region, periods)
+                    all_predictions.append(future_predictions)
+        finally:
+            # El pool de búsqueda se reutiliza entre regiones y se cierra al final
+            self.search_executor.shutdown()
         
         # Combinar todas las predicciones
         if all_predictions:
             combined_predictions = pd.concat(all_predictions, ignore_index=True)
             
+            # Intervalos a partir de los errores del backtest o de validación (sin reajustar)
+            combined_predictions = add_prediction_intervals(
+                combined_predictions, calibration_residuals(residuals, self.calibration_errors, 'arima'),
+                self.interval_level, self.quantiles, self.interval_method
+            )
+            
             print(f"\n✅ Predicciones ARIMA completadas para {len(all_predictions)} regiones")
             
             return {
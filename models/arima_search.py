@@ -0,0 +1,280 @@
+import math
+import signal
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from job_pool import JobPool
+
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+    ARIMA_AVAILABLE = True
+except ImportError:
+    ARIMA_AVAILABLE = False
+
+# Estados posibles del ajuste de un candidato
+FIT_OK = 'ok'
+FIT_FAILED = 'failed'
+FIT_TIMEOUT = 'timeout'
+
+
+class FitTimeout(Exception):
+    """
+    El ajuste de un candidato superó el tiempo máximo
+    """
+
+
+def _raise_timeout(signum, frame):
+    raise FitTimeout()
+
+
+def fit_candidate(values, order, seasonal_order=(0, 0, 0, 0), timeout=None):
+    """
+    Ajusta un candidato ARIMA y devuelve un resultado estructurado
+
+    Función de módulo para poder ejecutarse en un pool de procesos. El
+    tiempo máximo se aplica con SIGALRM cuando se ejecuta en el hilo
+    principal de un sistema que lo soporta; las advertencias del ajuste
+    (por ejemplo, de convergencia) se registran en lugar de descartarse.
+
+    Args:
+        values (np.ndarray): Serie a ajustar
+        order (tuple): (p, d, q)
+        seasonal_order (tuple): (P, D, Q, m)
+        timeout (float): Segundos máximos por ajuste (None = sin límite)
+
+    Returns:
+        dict: order, seasonal_order, status, aic, converged, warnings,
+            error y seconds
+    """
+    result = {
+        'order': tuple(order),
+        'seasonal_order': tuple(seasonal_order),
+        'status': FIT_FAILED,
+        'aic': math.inf,
+        'converged': None,
+        'warnings': [],
+        'error': None,
+        'seconds': 0.0
+    }
+
+    use_alarm = (
+        timeout is not None and
+        hasattr(signal, 'SIGALRM') and
+        threading.current_thread() is threading.main_thread()
+    )
+    start = time.perf_counter()
+
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            model = ARIMA(np.asarray(values, dtype=np.float64), order=order, seasonal_order=seasonal_order)
+            fitted_model = model.fit()
+
+        result['aic'] = float(fitted_model.aic)
+        result['converged'] = bool(fitted_model.mle_retvals.get('converged', True)) if fitted_model.mle_retvals else None
+        result['warnings'] = sorted({f"{w.category.__name__}: {w.message}" for w in caught})
+        result['status'] = FIT_OK if np.isfinite(result['aic']) else FIT_FAILED
+
+    except FitTimeout:
+        result['status'] = FIT_TIMEOUT
+        result['error'] = f"Tiempo máximo de {timeout} s superado"
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def selection_key(result):
+    """
+    Clave de orden determinista: AIC, luego el modelo más simple y luego el
+    orden lexicográfico, de modo que los empates no dependen del orden en
+    que terminan los procesos
+    """
+    order = result['order']
+    seasonal_order = result['seasonal_order']
+    complexity = sum(order) + sum(seasonal_order[:3])
+    return (round(result['aic'], 6), complexity, order, seasonal_order)
+
+
+def select_best(results):
+    """
+    Mejor candidato ajustado correctamente
+
+    Args:
+        results (list): Resultados de fit_candidate
+
+    Returns:
+        dict: Mejor resultado o None si ningún ajuste fue exitoso
+    """
+    fitted = [result for result in results if result['status'] == FIT_OK]
+    if not fitted:
+        return None
+    return min(fitted, key=selection_key)
+
+
+def summarize_results(results):
+    """
+    Conteo de ajustes exitosos, fallidos, con tiempo agotado y con advertencias
+    """
+    return {
+        'candidates': len(results),
+        'ok': sum(result['status'] == FIT_OK for result in results),
+        'failed': sum(result['status'] == FIT_FAILED for result in results),
+        'timeout': sum(result['status'] == FIT_TIMEOUT for result in results),
+        'with_warnings': sum(bool(result['warnings']) for result in results),
+        'not_converged': sum(result['converged'] is False for result in results)
+    }
+
+
+class ARIMASearchExecutor(JobPool):
+    """
+    Ejecuta ajustes de candidatos ARIMA en un pool de procesos persistente
+
+    El pool se crea la primera vez que se usa y se reutiliza entre regiones;
+    con un solo trabajador los candidatos se ajustan en el proceso actual.
+    """
+
+    def __init__(self, workers=None, timeout=60):
+        """
+        Inicializa el ejecutor
+
+        Args:
+            workers (int): Procesos del pool (None = número de núcleos,
+                1 = secuencial)
+            timeout (float): Segundos máximos por ajuste
+        """
+        super().__init__(workers)
+        self.timeout = timeout
+
+    def run(self, values, candidates):
+        """
+        Ajusta todos los candidatos
+
+        Args:
+            values (np.ndarray): Serie a ajustar
+            candidates (list): Pares (order, seasonal_order)
+
+        Returns:
+            list: Resultados en el mismo orden que los candidatos
+        """
+        values = np.asarray(values, dtype=np.float64)
+        jobs = [{'values': values, 'order': order, 'seasonal_order': seasonal_order, 'timeout': self.timeout}
+                for order, seasonal_order in candidates]
+        return self.map(fit_candidate, jobs, _failed_candidate)
+
+
+def _failed_candidate(job, error):
+    """
+    Resultado de un candidato cuyo proceso trabajador falló (no el ajuste)
+    """
+    return {
+        'order': tuple(job['order']),
+        'seasonal_order': tuple(job['seasonal_order']),
+        'status': FIT_FAILED,
+        'aic': math.inf,
+        'converged': None,
+        'warnings': [],
+        'error': f"{type(error).__name__}: {error}",
+        'seconds': 0.0
+    }
+
+
+def grid_candidates(max_p=3, max_d=2, max_q=3):
+    """
+    Candidatos de la búsqueda exhaustiva (p, d, q) sin términos estacionales
+    """
+    return [((p, d, q), (0, 0, 0, 0))
+            for p in range(max_p + 1)
+            for d in range(max_d + 1)
+            for q in range(max_q + 1)]
+
+
+# Movimientos de la búsqueda escalonada sobre (p, q) o (P, Q): uno a la
+# vez o ambos en la misma dirección
+NEIGHBOUR_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1)]
+
+
+def stepwise_search(executor, values, d=0, seasonal_period=None, max_p=5, max_q=5, max_P=2, max_Q=2, max_rounds=20):
+    """
+    Búsqueda escalonada de órdenes ARIMA (estilo Hyndman–Khandakar)
+
+    La diferenciación d se fija de antemano (prueba de raíz unitaria). Se
+    ajustan en paralelo unos pocos modelos iniciales y después, en cada
+    ronda, los vecinos del mejor modelo actual (p ± 1, q ± 1, ambos a la vez
+    y, con estacionalidad, lo mismo para P y Q). La búsqueda termina cuando ningún
+    vecino mejora el AIC.
+
+    Args:
+        executor (ARIMASearchExecutor): Ejecutor para ajustar cada ronda
+        values (np.ndarray): Serie a ajustar
+        d (int): Orden de diferenciación ya elegido
+        seasonal_period (int): Periodo estacional (None = sin estacionalidad)
+        max_p (int): Máximo valor de p
+        max_q (int): Máximo valor de q
+        max_P (int): Máximo valor de P estacional
+        max_Q (int): Máximo valor de Q estacional
+        max_rounds (int): Máximo de rondas de vecinos
+
+    Returns:
+        tuple: (mejor resultado o None, lista de todos los resultados)
+    """
+    seasonal = seasonal_period is not None and seasonal_period > 1
+
+    def seasonal_order(P, Q):
+        return (P, 0, Q, seasonal_period) if seasonal else (0, 0, 0, 0)
+
+    # Modelos iniciales: (p, q, P, Q)
+    if seasonal:
+        start = [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+    else:
+        start = [(2, 2, 0, 0), (0, 0, 0, 0), (1, 0, 0, 0), (0, 1, 0, 0)]
+
+    visited = set()
+    results = []
+
+    def evaluate(orders):
+        pending = [order for order in orders if order not in visited]
+        visited.update(pending)
+        candidates = [((p, d, q), seasonal_order(P, Q)) for p, q, P, Q in pending]
+        round_results = executor.run(values, candidates) if candidates else []
+        results.extend(round_results)
+        return round_results
+
+    best = select_best(evaluate([order for order in start if order[0] <= max_p and order[1] <= max_q]))
+    if best is None:
+        return None, results
+
+    for _ in range(max_rounds):
+        p, _, q = best['order']
+        P, _, Q, _ = best['seasonal_order']
+
+        steps = [(dp, dq, 0, 0) for dp, dq in NEIGHBOUR_STEPS]
+        if seasonal:
+            steps += [(0, 0, dP, dQ) for dP, dQ in NEIGHBOUR_STEPS]
+
+        neighbours = [
+            (p + dp, q + dq, P + dP, Q + dQ)
+            for dp, dq, dP, dQ in steps
+            if 0 <= p + dp <= max_p and 0 <= q + dq <= max_q and 0 <= P + dP <= max_P and 0 <= Q + dQ <= max_Q
+        ]
+
+        candidate = select_best(evaluate(neighbours))
+        if candidate is None or selection_key(candidate) >= selection_key(best):
+            break
+        best = candidate
+
+    return best, results
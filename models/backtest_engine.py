@@ -0,0 +1,511 @@
+import hashlib
+import logging
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from job_pool import JobPool
+from model_registry import ModelRegistry, config_hash
+from harmonic_predictor import harmonic_design, fit_harmonic, forecast_harmonic
+from ets_predictor import SEASONAL_PERIOD, fit_holt_winters, forecast_holt_winters
+from kalman_predictor import day_deltas, fit_kalman, forecast_kalman, observation_matrix
+from ndvi_panel import NDVIPanel, aligned_groups, composite_slots
+from ndvi_predictor import fit_linear_trend, linear_trend_values, fit_monthly_pattern, monthly_pattern_values
+from prophet_executor import JOB_OK as PROPHET_OK, PROPHET_AVAILABLE, SPLIT_FORECAST, prophet_job
+
+try:
+    from statsmodels.tsa.arima.model import ARIMA
+    from arima_search import ARIMASearchExecutor
+    from arima_predictor import select_arima_order
+    ARIMA_AVAILABLE = True
+except ImportError:
+    ARIMA_AVAILABLE = False
+
+try:
+    import xgboost
+    from xgboost_predictor import fit_global, recursive_forecast
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+
+# Configuración por defecto del backtest: horizonte máximo, separación entre
+# orígenes y períodos mínimos de entrenamiento (en composiciones de 16 días).
+# Las opciones de cada modelo son los valores por defecto de su predictor
+BACKTEST_CONFIG = {
+    'horizon': 12,
+    'step': 23,        # Un origen por año
+    'min_train': 69,   # Tres años de historia
+    'arima_search': 'grid',
+    'arima_seasonal_period': None,
+    'arima_fit_timeout': 60,
+    'prophet_mode': 'additive',
+    'harmonics': 3,
+    'kalman_harmonics': 2
+}
+
+# Estados posibles de un trabajo
+JOB_OK = 'ok'
+JOB_FAILED = 'failed'
+
+
+def _init_worker():
+    """
+    Inicializa un proceso trabajador silenciando advertencias y mensajes
+    de progreso de los modelos
+    """
+    warnings.filterwarnings('ignore')
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+
+def backtest_linear(values, weights, dates, target_dates, config):
+    """
+    Tendencia lineal de NDVIPredictor: una recta por serie con un solo polyfit
+    """
+    coeffs = fit_linear_trend(values)
+    return linear_trend_values(coeffs, np.arange(values.shape[1], values.shape[1] + len(target_dates)))
+
+
+def backtest_seasonal(values, weights, dates, target_dates, config):
+    """
+    Naive estacional de NDVIPredictor: promedio de cada mes en la historia
+    """
+    pattern, _ = fit_monthly_pattern(values, dates)
+    return monthly_pattern_values(pattern, target_dates)
+
+
+def backtest_harmonic(values, weights, dates, target_dates, config):
+    """
+    Regresión armónica de HarmonicPredictor (un solo sistema de mínimos
+    cuadrados)
+    """
+    design = harmonic_design(dates, dates[0], config['harmonics'])
+    fit = fit_harmonic(design, values)
+    mean, _, _ = forecast_harmonic(fit, harmonic_design(target_dates, dates[0], config['harmonics']))
+    return mean
+
+
+def backtest_ets(values, weights, dates, target_dates, config):
+    """
+    Holt-Winters aditivo de ETSPredictor con el optimizador por lotes
+    """
+    fit = fit_holt_winters(values, SEASONAL_PERIOD)
+    mean, _, _ = forecast_holt_winters(fit, len(target_dates), SEASONAL_PERIOD)
+    return mean
+
+
+def backtest_kalman(values, weights, dates, target_dates, config):
+    """
+    Modelo estructural (Kalman) como en KalmanPredictor: observaciones sin
+    interpolar y pesos de calidad (las composiciones nubladas no actualizan
+    el estado)
+    """
+    harmonics = config['kalman_harmonics']
+    state, _ = fit_kalman(values, weights, day_deltas(dates), harmonics)
+    mean, _, _ = forecast_kalman(state, day_deltas(target_dates, previous=dates[-1]), harmonics)
+    return mean
+
+
+def backtest_arima(values, weights, dates, target_dates, config):
+    """
+    ARIMA como en ARIMAPredictor (update_mode='refit'): en cada origen se
+    elige el orden con select_arima_order (diferenciación por ADF y búsqueda
+    por AIC) y se ajusta sobre la historia
+    """
+    executor = ARIMASearchExecutor(workers=1, timeout=config['arima_fit_timeout'])
+    forecasts = np.empty((len(values), len(target_dates)))
+    for row, series in enumerate(values):
+        order, seasonal_order, _ = select_arima_order(executor, pd.Series(series, index=dates),
+                                                      config['arima_search'], config['arima_seasonal_period'])
+        fitted_model = ARIMA(series, order=order, seasonal_order=seasonal_order).fit()
+        forecasts[row] = fitted_model.forecast(steps=len(target_dates))
+    return forecasts
+
+
+def backtest_prophet(values, weights, dates, target_dates, config):
+    """
+    Prophet con prophet_job, como ProphetPredictor. Se usa el intervalo
+    'analytic' porque el backtest solo puntúa yhat, que no depende del modo
+    de intervalo
+    """
+    forecasts = np.empty((len(values), len(target_dates)))
+    for row, (region, series) in enumerate(zip(config['regions'], values)):
+        result = prophet_job(region, config['prophet_mode'], SPLIT_FORECAST, dates.to_numpy(), series,
+                             periods=len(target_dates), interval_mode='analytic')
+        if result['status'] != PROPHET_OK:
+            raise RuntimeError(result['error'])
+        forecasts[row] = result['forecast']['yhat']
+    return forecasts
+
+
+def backtest_xgboost(values, weights, dates, target_dates, config):
+    """
+    Modelo XGBoost global de XGBoostPredictor entrenado con todas las series
+    del bloque (con las mismas categorías de región que el panel)
+    """
+    categories = pd.Index(config['categories'])
+    codes = categories.get_indexer(config['regions'])
+
+    model = fit_global([(codes, values, dates)], [values.shape[1]], categories)
+    forecasts, _ = recursive_forecast(model, values, dates[-1], len(target_dates), codes, categories,
+                                      dates=target_dates)
+    return forecasts
+
+
+# Modelos disponibles: función de pronóstico, si ajusta todas las series de
+# un bloque a la vez (un trabajo por origen) o una por una (un trabajo por
+# región y origen), entrada ('panel' = valores del panel como los predictores,
+# 'observations' = observaciones sin interpolar y pesos de calidad), variante
+# de producción que se puntúa y si sus dependencias están instaladas
+BACKTEST_MODELS = {
+    'linear': {'function': backtest_linear, 'batched': True, 'input': 'panel',
+               'variant': 'NDVIPredictor, tendencia lineal (fit_linear_trend)', 'available': True},
+    'seasonal': {'function': backtest_seasonal, 'batched': True, 'input': 'panel',
+                 'variant': 'NDVIPredictor, promedio mensual (fit_monthly_pattern)', 'available': True},
+    'harmonic': {'function': backtest_harmonic, 'batched': True, 'input': 'panel',
+                 'variant': 'HarmonicPredictor (fit_harmonic)', 'available': True},
+    'ets': {'function': backtest_ets, 'batched': True, 'input': 'panel',
+            'variant': 'ETSPredictor (fit_holt_winters)', 'available': True},
+    'kalman': {'function': backtest_kalman, 'batched': True, 'input': 'observations',
+               'variant': 'KalmanPredictor (fit_kalman con pesos de calidad)', 'available': True},
+    'xgboost': {'function': backtest_xgboost, 'batched': True, 'input': 'panel',
+                'variant': 'XGBoostPredictor (fit_global y recursive_forecast)', 'available': XGBOOST_AVAILABLE},
+    'arima': {'function': backtest_arima, 'batched': False, 'input': 'panel',
+              'variant': 'ARIMAPredictor, update_mode=refit (select_arima_order en cada origen)',
+              'available': ARIMA_AVAILABLE},
+    'prophet': {'function': backtest_prophet, 'batched': False, 'input': 'panel',
+                'variant': 'ProphetPredictor (prophet_job)', 'available': PROPHET_AVAILABLE}
+}
+
+
+def block_fingerprint(regions, dates, values, weights):
+    """
+    Huella de un bloque de historia (regiones, fechas, valores y pesos)
+
+    Returns:
+        str: Primeros 16 caracteres del SHA-256
+    """
+    digest = hashlib.sha256()
+    digest.update("|".join(regions).encode())
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(dates).asi8).tobytes())
+    digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(weights, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def backtest_job(model, regions, cutoff, dates, target_dates, values, weights, config):
+    """
+    Ajusta un modelo con la historia hasta un origen y pronostica el horizonte
+
+    Función de módulo para poder ejecutarse en un pool de procesos.
+
+    Args:
+        model (str): Nombre del modelo (clave de BACKTEST_MODELS)
+        regions (list): Regiones del bloque (filas de values)
+        cutoff (pd.Timestamp): Fecha del primer período pronosticado
+        dates (pd.DatetimeIndex): Composiciones de la historia
+        target_dates (pd.DatetimeIndex): Composiciones a pronosticar
+        values (np.ndarray): Historia (regiones × períodos)
+        weights (np.ndarray): Pesos de calidad de la historia (0 = nublado
+            o faltante)
+        config (dict): Configuración del backtest
+
+    Returns:
+        dict: model, regions, cutoff, status, error, forecast
+            (regiones × fechas pronosticadas) y seconds
+    """
+    result = {
+        'model': model,
+        'regions': regions,
+        'cutoff': cutoff,
+        'status': JOB_FAILED,
+        'error': None,
+        'forecast': None,
+        'seconds': 0.0
+    }
+    start = time.perf_counter()
+
+    try:
+        function = BACKTEST_MODELS[model]['function']
+        forecast = function(np.asarray(values, dtype=np.float64), np.asarray(weights, dtype=np.float64),
+                            pd.DatetimeIndex(dates), pd.DatetimeIndex(target_dates), {**config, 'regions': regions})
+        result['forecast'] = np.asarray(forecast, dtype=np.float64)
+        result['status'] = JOB_OK
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _failed_job(job, error):
+    """
+    Resultado de un trabajo cuyo proceso trabajador falló (no el ajuste)
+    """
+    return {
+        'model': job['model'],
+        'regions': job['regions'],
+        'cutoff': job['cutoff'],
+        'status': JOB_FAILED,
+        'error': f"{type(error).__name__}: {error}",
+        'forecast': None,
+        'seconds': 0.0
+    }
+
+
+class BacktestEngine:
+    """
+    Backtest con orígenes móviles sobre el calendario de composiciones
+
+    Cada modelo recibe la misma entrada que su predictor de producción (el
+    panel construido con NDVIPanel.from_frame o, para Kalman, las
+    observaciones sin interpolar con sus pesos de calidad) y se ajusta con
+    las mismas funciones (ver 'variant' en BACKTEST_MODELS). En cada origen
+    (cada `step` composiciones a partir de `min_train`) se ajusta cada
+    modelo solo con la historia anterior y se pronostican las `horizon`
+    composiciones siguientes; solo se puntúan las que tienen una
+    observación. Los trabajos
+    (modelo, región, origen) se ejecutan en un pool de procesos y cada
+    pronóstico se guarda en el registro de modelos por origen, de modo que
+    repetir el backtest o agregar datos solo ajusta los orígenes nuevos.
+    """
+
+    def __init__(self, data, models=None, horizon=None, step=None, min_train=None, workers=None,
+                 registry_dir="data/models/backtest", **config):
+        """
+        Inicializa el motor de backtest
+
+        Args:
+            data (pd.DataFrame): Datos procesados (Region, Date, NDVI y
+                columnas de calidad)
+            models (list): Modelos a evaluar (None = todos los disponibles)
+            horizon (int): Horizonte máximo de pronóstico
+            step (int): Períodos entre orígenes consecutivos
+            min_train (int): Períodos de historia del primer origen
+            workers (int): Procesos del pool (None = número de núcleos,
+                1 = secuencial)
+            registry_dir (str): Carpeta de la caché de ajustes por origen
+                (None = sin caché)
+            **config: Otras opciones de BACKTEST_CONFIG (arima_search,
+                arima_seasonal_period, prophet_mode, harmonics, ...)
+        """
+        if models is None:
+            models = [name for name, spec in BACKTEST_MODELS.items() if spec['available']]
+        for model in models:
+            if model not in BACKTEST_MODELS:
+                raise ValueError(f"Modelo {model} no soportado en el backtest")
+            if not BACKTEST_MODELS[model]['available']:
+                raise ValueError(f"Modelo {model} no disponible (faltan dependencias)")
+
+        # Entrada de los predictores: el panel (composiciones faltantes
+        # interpoladas, nunca puntuadas) y las observaciones con sus pesos
+        # de calidad colocadas en la misma malla
+        panel = NDVIPanel.from_frame(data)
+        self.regions, self.dates = panel.regions, panel.dates
+        self.values = np.asarray(panel.values, dtype=np.float64)
+
+        regions, dates, observed, weights = observation_matrix(data)
+        rows = self.regions.get_indexer(regions)
+        columns = self.dates.get_indexer(composite_slots(dates))
+        self.observed = np.full(self.values.shape, np.nan)
+        self.weights = np.zeros(self.values.shape)
+        self.observed[np.ix_(rows, columns)] = observed
+        self.weights[np.ix_(rows, columns)] = weights
+        self.models = list(models)
+        self.config = {**BACKTEST_CONFIG, **config, 'categories': [str(region) for region in self.regions]}
+        self.config['horizon'] = horizon or self.config['horizon']
+        self.config['step'] = step or self.config['step']
+        self.config['min_train'] = min_train or self.config['min_train']
+        self.workers = workers or os.cpu_count()
+        self.registry = ModelRegistry(registry_dir) if registry_dir is not None else None
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self.failures = []
+
+    def cutoffs(self, n_periods):
+        """
+        Posiciones de los orígenes de una serie de n_periods períodos
+
+        Los orígenes se anclan al inicio de la serie para que sigan siendo los
+        mismos cuando se agregan datos nuevos.
+
+        Returns:
+            np.ndarray: Posición del primer período pronosticado en cada origen
+        """
+        return np.arange(self.config['min_train'], n_periods - self.config['horizon'] + 1, self.config['step'])
+
+    def _model_config(self, model):
+        """
+        Parámetros que identifican los ajustes de un modelo en la caché
+        """
+        keys = {
+            'arima': ['arima_search', 'arima_seasonal_period', 'arima_fit_timeout'],
+            'prophet': ['prophet_mode'],
+            'harmonic': ['harmonics'],
+            'kalman': ['kalman_harmonics'],
+            'xgboost': ['categories']
+        }.get(model, [])
+        return {'model': model, 'input': BACKTEST_MODELS[model]['input'], 'horizon': self.config['horizon'],
+                **{key: self.config[key] for key in keys}}
+
+    def _jobs(self):
+        """
+        Trabajos del backtest con su clave de caché y su bloque de valores
+
+        Returns:
+            list: Tuplas (argumentos de backtest_job, clave de caché, posiciones
+                de las filas, columnas del bloque, origen)
+        """
+        jobs = []
+        for positions, columns in aligned_groups(self.values):
+            inputs = {
+                'panel': self.values[positions, columns],
+                'observations': self.observed[positions, columns]
+            }
+            weights = self.weights[positions, columns]
+            dates = self.dates[columns]
+            regions = [str(region) for region in self.regions[positions]]
+
+            for cutoff in self.cutoffs(len(dates)):
+                for model in self.models:
+                    values = inputs[BACKTEST_MODELS[model]['input']]
+                    blocks = [np.arange(len(regions))] if BACKTEST_MODELS[model]['batched'] else \
+                        [np.array([row]) for row in range(len(regions))]
+
+                    for rows in blocks:
+                        block_regions = [regions[row] for row in rows]
+                        history = values[rows, :cutoff]
+                        history_weights = weights[rows, :cutoff]
+                        key = (
+                            'panel' if len(rows) > 1 else block_regions[0],
+                            f"backtest-{model}",
+                            config_hash(self._model_config(model)),
+                            block_fingerprint(block_regions, dates[:cutoff], history, history_weights)
+                        )
+                        job = {
+                            'model': model,
+                            'regions': block_regions,
+                            'cutoff': dates[cutoff],
+                            'dates': dates[:cutoff],
+                            'target_dates': dates[cutoff:cutoff + self.config['horizon']],
+                            'values': history,
+                            'weights': history_weights,
+                            'config': self.config
+                        }
+                        jobs.append((job, key, positions[rows], columns, cutoff))
+        return jobs
+
+    def _execute(self, jobs):
+        """
+        Ejecuta los trabajos en orden (en el pool si hay más de un trabajador)
+        """
+        with JobPool(self.workers, initializer=_init_worker) as pool:
+            return pool.map(backtest_job, jobs, _failed_job)
+
+    def _forecasts(self, jobs):
+        """
+        Pronósticos de todos los trabajos, ajustando solo los que no están en
+        la caché
+
+        Returns:
+            list: Pronóstico (regiones × horizonte) de cada trabajo o None
+        """
+        forecasts = [None] * len(jobs)
+        pending = []
+
+        for index, (job, key, _, _, _) in enumerate(jobs):
+            record = self.registry.get(*key) if self.registry is not None else None
+            if record is not None and record.get('regions') == job['regions']:
+                forecasts[index] = np.asarray(record['forecast'], dtype=np.float64)
+                self.cache_stats['hits'] += 1
+            else:
+                pending.append(index)
+                self.cache_stats['misses'] += 1
+
+        results = self._execute([jobs[index][0] for index in pending])
+
+        for index, result in zip(pending, results):
+            if result['status'] != JOB_OK:
+                self.failures.append(result)
+                continue
+
+            forecasts[index] = result['forecast']
+            if self.registry is not None:
+                self.registry.put(*jobs[index][1], {
+                    'regions': result['regions'],
+                    'cutoff': str(result['cutoff'].date()),
+                    'forecast': result['forecast'].tolist(),
+                    'seconds': result['seconds']
+                })
+
+        return forecasts
+
+    def run(self):
+        """
+        Ejecuta el backtest de todos los modelos, regiones y orígenes
+
+        Returns:
+            pd.DataFrame: Un registro por (modelo, región, origen, horizonte)
+                con una adquisición observada: Date, Actual, Predicted y
+                Error (real - predicho)
+        """
+        jobs = self._jobs()
+        print(f"🔁 Backtest: {len(self.models)} modelos, {len(jobs)} ajustes "
+              f"(horizonte={self.config['horizon']}, paso={self.config['step']})")
+        for model in self.models:
+            print(f"  {model}: {BACKTEST_MODELS[model]['variant']}")
+
+        start = time.perf_counter()
+        forecasts = self._forecasts(jobs)
+        horizon = self.config['horizon']
+        steps = np.arange(1, horizon + 1)
+
+        frames = []
+        for (job, _, positions, columns, cutoff), forecast in zip(jobs, forecasts):
+            if forecast is None:
+                continue
+
+            actual = self.observed[positions, columns][:, cutoff:cutoff + horizon].ravel()
+            observed = ~np.isnan(actual)
+            frames.append(pd.DataFrame({
+                'Model': job['model'],
+                'Region': np.repeat(job['regions'], horizon)[observed],
+                'Cutoff': job['cutoff'],
+                'Horizon': np.tile(steps, len(job['regions']))[observed],
+                'Date': np.tile(job['target_dates'], len(job['regions']))[observed],
+                'Actual': actual[observed],
+                'Predicted': forecast.ravel()[observed]
+            }))
+
+        print(f"  ✓ {self.cache_stats['misses']} ajustes nuevos, {self.cache_stats['hits']} desde caché, "
+              f"{len(self.failures)} fallidos ({time.perf_counter() - start:.1f}s)")
+        for failure in self.failures:
+            print(f"  ❌ {failure['model']} {failure['regions']} {failure['cutoff'].date()}: {failure['error']}")
+
+        if not frames:
+            return pd.DataFrame(columns=['Model', 'Region', 'Cutoff', 'Horizon', 'Date', 'Actual', 'Predicted', 'Error'])
+
+        errors = pd.concat(frames, ignore_index=True)
+        errors['Error'] = errors['Actual'] - errors['Predicted']
+        return errors
+
+
+def summarize_errors(errors, by=('Model', 'Region')):
+    """
+    Métricas del backtest agrupadas
+
+    Args:
+        errors (pd.DataFrame): Resultado de BacktestEngine.run
+        by (tuple): Columnas de agrupación (por ejemplo ('Model', 'Horizon'))
+
+    Returns:
+        pd.DataFrame: MAE, MSE, RMSE, MAPE y Samples por grupo
+    """
+    frame = errors.assign(_abs=errors['Error'].abs(), _sq=errors['Error'] ** 2,
+                          _pct=(errors['Error'] / errors['Actual']).abs() * 100)
+    summary = frame.groupby(list(by), observed=True).agg(MAE=('_abs', 'mean'), MSE=('_sq', 'mean'),
+                                                          MAPE=('_pct', 'mean'), Samples=('Error', 'size'))
+    summary.insert(summary.columns.get_loc('MSE') + 1, 'RMSE', np.sqrt(summary['MSE']))
+    return summary.reset_index()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark de NDVIDataLoader.prepare_data: motor vectorizado vs. preparación
+por región (implementación anterior), con 9, 100 y 1,000 regiones sintéticas
+
+Script independiente (no se importa desde los módulos de models/). Se
+ejecuta desde la raíz del repositorio o desde models/:
+
+    python models/benchmarks/benchmark_prepare_data.py
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Carpeta con los módulos planos de models/ (data_loader, ...)
+MODELS_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_data_loader():
+    """
+    Importa data_loader desde models/ (solo al ejecutar el benchmark)
+    """
+    if str(MODELS_DIR) not in sys.path:
+        sys.path.insert(0, str(MODELS_DIR))
+    import data_loader
+    return data_loader
+
+
+def legacy_prepare_data(data, season_by_month):
+    """
+    Implementación anterior: copia, filtra y agrupa cada región por separado
+    """
+    all_dataframes = []
+
+    for region, df in data.items():
+        df_clean = df.copy()
+        df_clean['Date'] = pd.to_datetime(df_clean['Date'])
+        df_clean = df_clean[
+            (df_clean['MOD13Q1_061__250m_16_days_NDVI'] >= 0) &
+            (df_clean['MOD13Q1_061__250m_16_days_NDVI'] <= 1) &
+            (df_clean['MOD13Q1_061__250m_16_days_EVI'] >= 0) &
+            (df_clean['MOD13Q1_061__250m_16_days_EVI'] <= 1)
+        ]
+        df_clean = df_clean.rename(columns={
+            'MOD13Q1_061__250m_16_days_NDVI': 'NDVI',
+            'MOD13Q1_061__250m_16_days_EVI': 'EVI',
+            'MOD13Q1_061__250m_16_days_pixel_reliability': 'Pixel_Reliability'
+        })
+        df_clean['Year'] = df_clean['Date'].dt.year
+        df_clean['Month'] = df_clean['Date'].dt.month
+        df_clean['Season'] = df_clean['Month'].map(season_by_month)
+        df_clean['NDVI_Mean'] = df_clean.groupby('Region')['NDVI'].transform('mean')
+        df_clean['NDVI_Std'] = df_clean.groupby('Region')['NDVI'].transform('std')
+        all_dataframes.append(df_clean)
+
+    combined = pd.concat(all_dataframes, ignore_index=True)
+    return combined.sort_values(['Region', 'Date'])
+
+
+def make_synthetic_regions(n_regions, n_dates=461, seed=42):
+    """
+    Genera datos crudos con el mismo esquema que el lector de AppEEARS
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2004-12-18', periods=n_dates, freq='16D')
+    data = {}
+
+    for i in range(n_regions):
+        region = f"Region_{i:04d}"
+        # Algunos valores fuera de rango para ejercitar el filtro
+        ndvi = rng.uniform(-0.05, 1.0, n_dates).astype(np.float32)
+        evi = rng.uniform(-0.05, 1.0, n_dates).astype(np.float32)
+        data[region] = pd.DataFrame({
+            'Latitude': np.full(n_dates, 25.6866),
+            'Longitude': np.full(n_dates, -100.3161),
+            'Date': dates,
+            'MODIS_Tile': pd.Categorical(['h08v06'] * n_dates),
+            'MOD13Q1_061__250m_16_days_EVI': evi,
+            'MOD13Q1_061__250m_16_days_NDVI': ndvi,
+            'MOD13Q1_061__250m_16_days_VI_Quality': rng.integers(0, 4096, n_dates).astype(np.uint16),
+            'MOD13Q1_061__250m_16_days_pixel_reliability': rng.integers(0, 4, n_dates).astype(np.int16),
+            'Region': pd.Categorical.from_codes(np.zeros(n_dates, dtype=np.int8), categories=[region])
+        })
+
+    return data
+
+
+def time_call(func, repeats=3):
+    """
+    Mejor tiempo de varias ejecuciones
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """
+    Ejecuta el benchmark y verifica que ambas implementaciones coinciden
+    """
+    data_loader = load_data_loader()
+
+    print("⏱️ BENCHMARK DE prepare_data")
+    print("="*50)
+
+    for n_regions in [9, 100, 1000]:
+        data = make_synthetic_regions(n_regions)
+
+        # La implementación anterior solo filtraba por rango
+        loader = data_loader.NDVIDataLoader(quality_mode='range')
+        loader.data = data
+
+        legacy_time, legacy_result = time_call(lambda: legacy_prepare_data(data, data_loader.SEASON_BY_MONTH))
+
+        # Silenciar los mensajes de prepare_data durante la medición
+        with contextlib.redirect_stdout(io.StringIO()):
+            new_time, new_result = time_call(loader.prepare_data)
+
+        pd.testing.assert_frame_equal(legacy_result, new_result)
+
+        print(f"{n_regions:>5} regiones: anterior={legacy_time:.3f} s, "
+              f"vectorizado={new_time:.3f} s, aceleración={legacy_time / new_time:.1f}x")
+
+    print("\n✓ Resultados idénticos en todos los tamaños")
+
+
+if __name__ == "__main__":
+    main()
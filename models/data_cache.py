@@ -0,0 +1,177 @@
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (requerido por DataFrame.to_feather / read_feather)
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Versión del formato de la caché; se incrementa si cambian los tipos guardados
+CACHE_VERSION = 1
+
+# Columnas de texto con pocos valores distintos que se guardan como categóricas
+CATEGORICAL_COLUMNS = ['Region', 'Season', 'MODIS_Tile']
+
+# Tipos compactos de las columnas numéricas (los mismos que produce el lector
+# de AppEEARS), para que la caché y el CSV entreguen exactamente los mismos tipos
+VALUE_DTYPES = {
+    'NDVI': 'float32',
+    'EVI': 'float32',
+    'Year': 'int16',
+    'Month': 'int8',
+    'NDVI_Mean': 'float32',
+    'NDVI_Std': 'float32',
+    'Pixel_Reliability': 'int16',
+    'MOD13Q1_061__250m_16_days_VI_Quality': 'uint16',
+    'QA_MODLAND': 'uint8',
+    'QA_Usefulness': 'uint8',
+    'QA_Aerosol': 'uint8',
+    'QA_Land_Water': 'uint8',
+    'Quality_Weight': 'float32'
+}
+
+
+def cache_path_for(csv_file):
+    """
+    Ruta de la caché columnar (Arrow IPC / Feather) asociada a un CSV procesado
+
+    Args:
+        csv_file (str): Archivo CSV con datos procesados
+
+    Returns:
+        Path: Ruta del archivo .feather
+    """
+    return Path(csv_file).with_suffix('.feather')
+
+
+def _meta_path_for(cache_file):
+    return Path(str(cache_file) + '.json')
+
+
+def source_fingerprint(csv_file):
+    """
+    Huella del CSV de origen (tamaño y fecha de modificación)
+
+    Args:
+        csv_file (str): Archivo CSV con datos procesados
+
+    Returns:
+        dict: Huella del archivo
+    """
+    stat = os.stat(csv_file)
+    return {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def apply_processed_dtypes(df):
+    """
+    Aplica los tipos nativos de los datos procesados (fecha, valores
+    compactos y categóricas)
+
+    Args:
+        df (pd.DataFrame): Datos procesados
+
+    Returns:
+        pd.DataFrame: Datos con 'Date' como datetime64 y columnas categóricas
+    """
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'])
+
+    for column, dtype in VALUE_DTYPES.items():
+        if column in df.columns and df[column].dtype != dtype:
+            df[column] = df[column].astype(dtype)
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+    return df
+
+
+def write_processed_cache(df, csv_file):
+    """
+    Escribe la caché columnar junto al CSV procesado
+
+    La huella del CSV se guarda en un archivo .json al lado de la caché para
+    poder detectar si el CSV cambió después de generarla.
+
+    Args:
+        df (pd.DataFrame): Datos procesados (el mismo contenido del CSV)
+        csv_file (str): Archivo CSV ya escrito
+
+    Returns:
+        Path: Ruta de la caché o None si pyarrow no está disponible
+    """
+    if not ARROW_AVAILABLE:
+        return None
+
+    cache_file = cache_path_for(csv_file)
+    typed = apply_processed_dtypes(df.reset_index(drop=True).copy())
+    typed.to_feather(cache_file)
+
+    with open(_meta_path_for(cache_file), 'w') as f:
+        json.dump(source_fingerprint(csv_file), f)
+
+    return cache_file
+
+
+def is_cache_valid(csv_file):
+    """
+    Indica si la caché columnar corresponde al CSV actual
+
+    Args:
+        csv_file (str): Archivo CSV con datos procesados
+
+    Returns:
+        bool: True si la huella guardada coincide con la del CSV
+    """
+    cache_file = cache_path_for(csv_file)
+    meta_file = _meta_path_for(cache_file)
+
+    if not ARROW_AVAILABLE or not cache_file.exists() or not meta_file.exists():
+        return False
+
+    try:
+        with open(meta_file) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    return stored == source_fingerprint(csv_file)
+
+
+def load_processed_data(csv_file="data/processed/processed_ndvi_data.csv", use_cache=True, refresh_cache=True):
+    """
+    Carga los datos procesados usando la caché columnar cuando es válida
+
+    Si la caché no existe o su huella no coincide con el CSV, se lee el CSV y
+    (opcionalmente) se regenera la caché para las siguientes etapas.
+
+    Args:
+        csv_file (str): Archivo CSV con datos procesados
+        use_cache (bool): Si leer la caché columnar cuando es válida
+        refresh_cache (bool): Si regenerar la caché al leer desde el CSV
+
+    Returns:
+        pd.DataFrame: Datos procesados con tipos nativos
+    """
+    if use_cache and is_cache_valid(csv_file):
+        return pd.read_feather(cache_path_for(csv_file))
+
+    df = pd.read_csv(csv_file, parse_dates=['Date'])
+    df = apply_processed_dtypes(df)
+
+    if use_cache and refresh_cache and ARROW_AVAILABLE:
+        try:
+            write_processed_cache(df, csv_file)
+        except OSError as e:
+            print(f"⚠️ No se pudo actualizar la caché columnar: {e}")
+
+    return df
@@ -1,110 +1,559 @@
 import pandas as pd
 import numpy as np
+import hashlib
+import io
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+from appeears_reader import read_appeears_csv, iter_appeears_chunks, chunk_rows_for_budget
+from data_cache import load_processed_data, write_processed_cache, source_fingerprint
+from ndvi_panel import NDVIPanel, panel_path_for
+from quality_flags import decode_vi_quality, cloud_mask, quality_weights
+
+SEASON_BY_MONTH = {
+    12: 'Winter', 1: 'Winter', 2: 'Winter',
+    3: 'Spring', 4: 'Spring', 5: 'Spring',
+    6: 'Summer', 7: 'Summer', 8: 'Summer',
+    9: 'Fall', 10: 'Fall', 11: 'Fall'
+}
+
+# Tabla de búsqueda mes -> estación (índice 0 sin uso)
+SEASON_LOOKUP = np.array([None] + [SEASON_BY_MONTH[month] for month in range(1, 13)], dtype=object)
+
+# Modos de limpieza por calidad:
+#   'range'  solo elimina NDVI/EVI fuera de [0, 1]
+#   'drop'   además elimina composiciones nubladas o no producidas
+#   'weight' conserva las filas y agrega las columnas Cloudy y
+#            Quality_Weight (el panel trata las nubladas como faltantes y
+#            el filtro de Kalman pondera las demás por calidad)
+QUALITY_MODES = ('range', 'drop', 'weight')
+DEFAULT_QUALITY_MODE = 'weight'
+
+# Claves de agregación de la ingesta por bloques:
+#   'zone'   una serie por zona (región) y fecha, promediando sus píxeles
+#   'pixel'  estadísticas de todo el periodo por píxel
+AGGREGATE_KEYS = {
+    'zone': ['Region', 'Date'],
+    'pixel': ['Region', 'Latitude', 'Longitude']
+}
+
+# Cómo combinar cada acumulador parcial entre bloques
+PARTIAL_REDUCERS = {
+    'Observations': 'sum',
+    'Weight': 'sum',
+    'Weight_Sq': 'sum',
+    'NDVI_Sum': 'sum',
+    'NDVI_Sumsq': 'sum',
+    'EVI_Sum': 'sum',
+    'NDVI_Min': 'min',
+    'NDVI_Max': 'max',
+    'First_Date': 'min',
+    'Last_Date': 'max'
+}
+
+RAW_COLUMN_NAMES = {
+    'MOD13Q1_061__250m_16_days_NDVI': 'NDVI',
+    'MOD13Q1_061__250m_16_days_EVI': 'EVI',
+    'MOD13Q1_061__250m_16_days_pixel_reliability': 'Pixel_Reliability'
+}
+
+
+def region_name_from_file(file_path):
+    """
+    Extrae el nombre de la región del nombre del archivo
+    (monterrey_<Región>_NDVI_clean.csv)
+    """
+    return Path(file_path).stem.replace("monterrey_", "").replace("_NDVI_clean", "")
+
+
+def quality_mask(df, quality_mode='range'):
+    """
+    Máscara de filas válidas según el modo de limpieza por calidad
+    
+    Args:
+        df (pd.DataFrame): Datos crudos con las columnas de MOD13Q1
+        quality_mode (str): 'range', 'drop' o 'weight'
+        
+    Returns:
+        tuple: (máscara de filas válidas, máscara de nubes o None en 'range')
+    """
+    if quality_mode not in QUALITY_MODES:
+        raise ValueError(f"Modo de calidad {quality_mode} no soportado")
+    
+    # Limpiar valores de NDVI y EVI (eliminar valores inválidos)
+    ndvi = df['MOD13Q1_061__250m_16_days_NDVI'].to_numpy()
+    evi = df['MOD13Q1_061__250m_16_days_EVI'].to_numpy()
+    valid = (ndvi >= 0) & (ndvi <= 1) & (evi >= 0) & (evi <= 1)
+    cloudy = None
+    
+    if quality_mode != 'range':
+        cloudy = cloud_mask(
+            df['MOD13Q1_061__250m_16_days_VI_Quality'].to_numpy(),
+            df['MOD13Q1_061__250m_16_days_pixel_reliability'].to_numpy()
+        )
+        
+        # Eliminar composiciones nubladas
+        if quality_mode == 'drop':
+            valid &= ~cloudy
+    
+    return valid, cloudy
+
+
+def add_calendar_columns(df):
+    """
+    Agrega Year, Month y Season a partir de los valores datetime64 de 'Date'
+    """
+    dates = df['Date'].to_numpy()
+    months = dates.astype('datetime64[M]').astype(np.int64)
+    df['Year'] = (months // 12 + 1970).astype(np.int32)
+    df['Month'] = (months % 12 + 1).astype(np.int32)
+    df['Season'] = pd.Series(SEASON_LOOKUP[df['Month'].to_numpy()], index=df.index)
+    return df
+
+
+def prepare_frame(df, quality_mode='range'):
+    """
+    Limpia datos crudos de una o varias regiones y agrega columnas derivadas
+    
+    Todo se calcula con operaciones vectorizadas sobre el DataFrame completo:
+    un solo filtro por máscara, Year/Month/Season a partir de los valores
+    datetime64 y las estadísticas por región con una sola transformación
+    agrupada.
+    
+    Args:
+        df (pd.DataFrame): Datos crudos (con columna 'Region')
+        quality_mode (str): Modo de limpieza por calidad ('range', 'drop' o
+            'weight'). Fuera de 'range' se agregan las banderas de QA
+            decodificadas de VI_Quality y la columna Cloudy.
+        
+    Returns:
+        pd.DataFrame: Datos limpios con Year, Month, Season y estadísticas
+    """
+    valid, cloudy = quality_mask(df, quality_mode)
+    
+    # Renombrar columnas para facilitar el trabajo
+    df_clean = df[valid].rename(columns=RAW_COLUMN_NAMES)
+    
+    if not pd.api.types.is_datetime64_any_dtype(df_clean['Date']):
+        df_clean['Date'] = pd.to_datetime(df_clean['Date'])
+    
+    # Agregar columnas derivadas
+    df_clean = add_calendar_columns(df_clean)
+    
+    # Banderas de calidad decodificadas (sin leer las columnas de texto)
+    if quality_mode != 'range':
+        vi_quality = df['MOD13Q1_061__250m_16_days_VI_Quality'].to_numpy()
+        reliability = df['MOD13Q1_061__250m_16_days_pixel_reliability'].to_numpy()
+        for name, values in decode_vi_quality(vi_quality[valid]).items():
+            df_clean[name] = values
+        df_clean['Cloudy'] = cloudy[valid]
+        
+        if quality_mode == 'weight':
+            df_clean['Quality_Weight'] = quality_weights(vi_quality[valid], reliability[valid])
+    
+    # Calcular estadísticas por región
+    ndvi_by_region = df_clean.groupby('Region', observed=True, sort=False)['NDVI']
+    df_clean['NDVI_Mean'] = ndvi_by_region.transform('mean')
+    df_clean['NDVI_Std'] = ndvi_by_region.transform('std')
+    
+    return df_clean
+
+
+def ingest_region_file(file_path, prepare=False, quality_mode='range', region_name=None):
+    """
+    Lee (y opcionalmente prepara) el archivo de una región
+    
+    Función de módulo para poder ejecutarse en un pool de hilos o de procesos.
+    
+    Args:
+        file_path (Path): Archivo CSV de la región
+        prepare (bool): Si también limpiar y derivar columnas
+        quality_mode (str): Modo de limpieza por calidad (ver prepare_frame)
+        region_name (str): Nombre de la región (por defecto se deduce del
+            nombre del archivo)
+        
+    Returns:
+        tuple: (region, datos_crudos, datos_preparados o None, segundos)
+    """
+    start = time.perf_counter()
+    if region_name is None:
+        region_name = region_name_from_file(file_path)
+    
+    # Cargar solo las columnas del esquema con tipos compactos
+    # (incluye la columna categórica de región)
+    df = read_appeears_csv(file_path, product='MOD13Q1', region=region_name)
+    prepared = prepare_frame(df, quality_mode) if prepare else None
+    
+    return region_name, df, prepared, time.perf_counter() - start
+
+
+def file_prefix_hash(file_path, n_bytes):
+    """
+    Hash SHA-256 de los primeros n_bytes de un archivo
+    """
+    digest = hashlib.sha256()
+    remaining = n_bytes
+    
+    with open(file_path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(remaining, 1 << 20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    
+    return digest.hexdigest()
+
+
+def complete_lines_offset(file_path):
+    """
+    Posición justo después del último salto de línea del archivo
+    
+    Las filas posteriores a esta posición son las que se leerán en la
+    siguiente ingesta incremental.
+    """
+    size = os.path.getsize(file_path)
+    
+    with open(file_path, 'rb') as f:
+        position = size
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    
+    return 0
+
+
+def region_ndvi_totals(df):
+    """
+    Conteo, suma y suma de cuadrados de NDVI por región (acumuladores del
+    manifiesto para mantener NDVI_Mean y NDVI_Std sin releer el histórico)
+    """
+    ndvi = df['NDVI'].astype(np.float64)
+    totals = pd.DataFrame({'Region': df['Region'], 'ndvi': ndvi, 'ndvi_sq': ndvi ** 2})
+    totals = totals.groupby('Region', observed=True, sort=False).agg(
+        ndvi_count=('ndvi', 'count'),
+        ndvi_sum=('ndvi', 'sum'),
+        ndvi_sumsq=('ndvi_sq', 'sum')
+    )
+    return totals
+
+
+def manifest_ndvi_stats(entry):
+    """
+    NDVI_Mean y NDVI_Std de una región a partir de los acumuladores de su
+    entrada del manifiesto (todo el histórico ingerido)
+    """
+    count = entry['ndvi_count']
+    if count == 0:
+        return np.float32(np.nan), np.float32(np.nan)
+    
+    mean = entry['ndvi_sum'] / count
+    variance = (entry['ndvi_sumsq'] - entry['ndvi_sum'] * mean) / (count - 1) if count > 1 else np.nan
+    return np.float32(mean), np.float32(np.sqrt(max(variance, 0.0)))
+
+
+def aggregate_chunk(chunk, group_by='zone', quality_mode='range'):
+    """
+    Limpia un bloque de datos crudos y lo reduce a acumuladores parciales
+    
+    Las sumas (ponderadas por Quality_Weight en modo 'weight', con peso 1 en
+    otro caso) permiten combinar bloques y calcular medias y desviaciones al
+    final sin conservar las filas.
+    
+    Args:
+        chunk (pd.DataFrame): Bloque con las columnas de MOD13Q1 y 'Region'
+        group_by (str): 'zone' o 'pixel'
+        quality_mode (str): Modo de limpieza por calidad
+        
+    Returns:
+        pd.DataFrame: Acumuladores por clave de agregación
+    """
+    valid, _ = quality_mask(chunk, quality_mode)
+    chunk = chunk[valid]
+    
+    ndvi = chunk['MOD13Q1_061__250m_16_days_NDVI'].to_numpy(dtype=np.float64)
+    evi = chunk['MOD13Q1_061__250m_16_days_EVI'].to_numpy(dtype=np.float64)
+    
+    if quality_mode == 'weight':
+        weight = quality_weights(
+            chunk['MOD13Q1_061__250m_16_days_VI_Quality'].to_numpy(),
+            chunk['MOD13Q1_061__250m_16_days_pixel_reliability'].to_numpy()
+        ).astype(np.float64)
+    else:
+        weight = np.ones(len(chunk))
+    
+    keys = AGGREGATE_KEYS[group_by]
+    partial = pd.DataFrame({
+        **{key: chunk[key].to_numpy() for key in keys},
+        'Observations': np.ones(len(chunk), dtype=np.int64),
+        'Weight': weight,
+        'Weight_Sq': weight ** 2,
+        'NDVI_Sum': weight * ndvi,
+        'NDVI_Sumsq': weight * ndvi ** 2,
+        'EVI_Sum': weight * evi,
+        'NDVI_Min': ndvi,
+        'NDVI_Max': ndvi,
+        'First_Date': chunk['Date'].to_numpy(),
+        'Last_Date': chunk['Date'].to_numpy()
+    })
+    
+    return combine_partials([partial], group_by)
+
+
+def combine_partials(partials, group_by='zone'):
+    """
+    Combina acumuladores parciales de varios bloques en uno solo
+    """
+    keys = AGGREGATE_KEYS[group_by]
+    combined = pd.concat(partials, ignore_index=True)
+    return combined.groupby(keys, observed=True, sort=False).agg(PARTIAL_REDUCERS).reset_index()
+
+
+def finalize_aggregates(totals, group_by='zone', quality_mode='range'):
+    """
+    Convierte los acumuladores combinados en la tabla final
+    
+    En 'zone' el resultado tiene el mismo formato que los datos preparados
+    (NDVI/EVI promedio de los píxeles de cada zona y fecha, Year/Month/Season
+    y estadísticas por región), más Pixel_Count y NDVI_Pixel_Std. En 'pixel'
+    se entregan las estadísticas de cada píxel en todo el periodo.
+    
+    Args:
+        totals (pd.DataFrame): Acumuladores combinados
+        group_by (str): 'zone' o 'pixel'
+        quality_mode (str): Modo de limpieza por calidad
+        
+    Returns:
+        pd.DataFrame: Agregados por zona y fecha o por píxel
+    """
+    totals = totals[totals['Weight'] > 0]
+    weight = totals['Weight'].to_numpy()
+    mean = totals['NDVI_Sum'].to_numpy() / weight
+    
+    # Varianza muestral ponderada (con pesos 1 coincide con std de pandas)
+    denominator = weight - totals['Weight_Sq'].to_numpy() / weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = (totals['NDVI_Sumsq'].to_numpy() - totals['NDVI_Sum'].to_numpy() * mean) / denominator
+    std = np.where(denominator > 0, np.sqrt(np.clip(variance, 0.0, None)), np.nan)
+    evi_mean = totals['EVI_Sum'].to_numpy() / weight
+    
+    if group_by == 'pixel':
+        result = totals[AGGREGATE_KEYS['pixel']].copy()
+        result['Observations'] = totals['Observations'].to_numpy()
+        result['NDVI_Mean'] = mean.astype(np.float32)
+        result['NDVI_Std'] = std.astype(np.float32)
+        result['NDVI_Min'] = totals['NDVI_Min'].to_numpy(dtype=np.float32)
+        result['NDVI_Max'] = totals['NDVI_Max'].to_numpy(dtype=np.float32)
+        result['EVI_Mean'] = evi_mean.astype(np.float32)
+        result['First_Date'] = totals['First_Date'].to_numpy()
+        result['Last_Date'] = totals['Last_Date'].to_numpy()
+        return result.sort_values(AGGREGATE_KEYS['pixel']).reset_index(drop=True)
+    
+    result = totals[AGGREGATE_KEYS['zone']].copy()
+    result['NDVI'] = mean.astype(np.float32)
+    result['EVI'] = evi_mean.astype(np.float32)
+    result['Pixel_Count'] = totals['Observations'].to_numpy()
+    result['NDVI_Pixel_Std'] = std.astype(np.float32)
+    if quality_mode == 'weight':
+        result['Quality_Weight'] = (weight / totals['Observations'].to_numpy()).astype(np.float32)
+    
+    result = add_calendar_columns(result)
+    
+    # Estadísticas por región sobre la serie de la zona (como en prepare_frame)
+    ndvi_by_region = result.groupby('Region', observed=True, sort=False)['NDVI']
+    result['NDVI_Mean'] = ndvi_by_region.transform('mean')
+    result['NDVI_Std'] = ndvi_by_region.transform('std')
+    
+    return result.sort_values(['Region', 'Date']).reset_index(drop=True)
+
+
 class NDVIDataLoader:
     """
     Clase para cargar y preparar datos de NDVI de múltiples regiones de Monterrey
     """
     
-    def __init__(self, data_folder="data/raw"):
+    def __init__(self, data_folder="data/raw", workers=1, executor="thread", quality_mode=DEFAULT_QUALITY_MODE,
+                 manifest_file="data/processed/ingest_manifest.json"):
         """
         Inicializa el cargador de datos
         
         Args:
             data_folder (str): Ruta a la carpeta con los archivos CSV
+            workers (int): Número de trabajadores para la ingesta
+                (1 = secuencial, None = número de núcleos)
+            executor (str): 'thread' (lectura limitada por I/O) o
+                'process' (archivos pesados de parsear)
+            quality_mode (str): Modo de limpieza por calidad: 'range',
+                'drop' (elimina composiciones nubladas) o 'weight'
+                (agrega Cloudy y Quality_Weight)
+            manifest_file (str): Manifiesto de ingesta incremental (última
+                fecha, hash y conteo de filas por región)
         """
+        if quality_mode not in QUALITY_MODES:
+            raise ValueError(f"Modo de calidad {quality_mode} no soportado")
+        
         self.data_folder = Path(data_folder)
+        self.workers = workers
+        self.executor = executor
+        self.quality_mode = quality_mode
+        self.manifest_file = Path(manifest_file)
         self.data = {}
+        self.prepared_data = {}
+        self.file_timings = {}
+        self.source_files = {}
         self.combined_data = None
         
-    def load_all_csv_files(self):
+    def _create_executor(self, workers):
+        """
+        Crea el pool de ejecución configurado
+        """
+        if self.executor == "thread":
+            return ThreadPoolExecutor(max_workers=workers)
+        elif self.executor == "process":
+            return ProcessPoolExecutor(max_workers=workers)
+        else:
+            raise ValueError(f"Ejecutor {self.executor} no soportado")
+        
+    def load_all_csv_files(self, prepare=False, sources=None):
         """
         Carga todos los archivos CSV de la carpeta de datos
+        
+        Con más de un trabajador, cada región se lee (y opcionalmente se
+        prepara) en paralelo; los resultados se guardan en orden de nombre de
+        archivo, independientemente del orden en que terminen.
+        
+        Args:
+            prepare (bool): Si limpiar y derivar columnas por región durante
+                la ingesta (prepare_data reutiliza esos resultados)
+            sources (list): Pares (región, archivo) a leer en lugar de
+                buscar en la carpeta de datos (ver load_from_catalog)
         """
         print("Cargando archivos CSV...")
         
-        # Buscar todos los archivos CSV en la carpeta
-        csv_files = list(self.data_folder.glob("*.csv"))
+        if sources is None:
+            # Buscar todos los archivos CSV en la carpeta (orden determinista)
+            sources = [(region_name_from_file(file_path), file_path) for file_path in sorted(self.data_folder.glob("*.csv"))]
         
-        if not csv_files:
+        if not sources:
             raise FileNotFoundError(f"No se encontraron archivos CSV en {self.data_folder}")
         
-        for file_path in csv_files:
-            # Extraer nombre de la región del nombre del archivo
-            region_name = file_path.stem.replace("monterrey_", "").replace("_NDVI_clean", "")
+        csv_files = [Path(file_path) for _, file_path in sources]
+        regions = [region for region, _ in sources]
+        
+        workers = self.workers or os.cpu_count()
+        workers = min(workers, len(csv_files))
+        start = time.perf_counter()
+        
+        if workers > 1:
+            print(f"Ingesta paralela: {workers} trabajadores ({self.executor})")
+            with self._create_executor(workers) as pool:
+                futures = [pool.submit(ingest_region_file, file_path, prepare, self.quality_mode, region)
+                           for region, file_path in zip(regions, csv_files)]
+                outcomes = []
+                for future in futures:
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as e:
+                        outcomes.append(e)
+        else:
+            outcomes = []
+            for region, file_path in zip(regions, csv_files):
+                try:
+                    outcomes.append(ingest_region_file(file_path, prepare, self.quality_mode, region))
+                except Exception as e:
+                    outcomes.append(e)
+        
+        for file_path, outcome in zip(csv_files, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"  ✗ Error cargando {file_path.name}: {outcome}")
+                continue
             
-            print(f"Cargando: {file_path.name} -> Región: {region_name}")
+            region_name, df, prepared, elapsed = outcome
             
-            try:
-                # Cargar el archivo CSV
-                df = pd.read_csv(file_path)
-                
-                # Agregar columna de región
-                df['Region'] = region_name
-                
-                # Guardar en el diccionario
-                self.data[region_name] = df
-                
-                print(f"  ✓ {len(df)} registros cargados")
-                
-            except Exception as e:
-                print(f"  ✗ Error cargando {file_path.name}: {e}")
+            # Guardar en el diccionario
+            self.data[region_name] = df
+            if prepared is not None:
+                self.prepared_data[region_name] = prepared
+            self.file_timings[file_path.name] = elapsed
+            self.source_files[region_name] = file_path
+            
+            print(f"Cargando: {file_path.name} -> Región: {region_name}")
+            print(f"  ✓ {len(df)} registros cargados ({elapsed:.3f} s)")
         
         print(f"\nTotal de regiones cargadas: {len(self.data)}")
+        print(f"Tiempo de ingesta: {time.perf_counter() - start:.3f} s")
         return self.data
     
-    def prepare_data(self):
+    def load_from_catalog(self, catalog, regions=None, start=None, end=None, prepare=False):
+        """
+        Carga los resultados MOD13Q1 indicados por el catálogo de datasets
+        
+        Los archivos y sus regiones salen de una consulta al índice en lugar
+        de recorrer carpetas y deducir la región del nombre del archivo.
+        
+        Args:
+            catalog (DatasetCatalog): Catálogo ya construido
+            regions (list): Regiones a cargar (por defecto todas)
+            start (str): Fecha inicial (las filas anteriores se descartan)
+            end (str): Fecha final (las filas posteriores se descartan)
+            prepare (bool): Si preparar por región durante la ingesta (solo
+                sin recorte de fechas)
+        """
+        sources = []
+        for region in (regions or [None]):
+            sources.extend(catalog.results_files(region=region, product='MOD13Q1', start=start, end=end))
+        
+        if not sources:
+            raise FileNotFoundError("El catálogo no tiene resultados MOD13Q1 para la consulta")
+        
+        trim = start is not None or end is not None
+        self.load_all_csv_files(prepare=prepare and not trim, sources=sources)
+        
+        if trim:
+            for region, df in self.data.items():
+                in_range = pd.Series(True, index=df.index)
+                if start is not None:
+                    in_range &= df['Date'] >= pd.Timestamp(start)
+                if end is not None:
+                    in_range &= df['Date'] <= pd.Timestamp(end)
+                self.data[region] = df[in_range]
+            print(f"✓ Filas recortadas al periodo {start or '...'} a {end or '...'}")
+        
+        return self.data
+    
+    def prepare_data(self, quality_mode=None):
         """
         Prepara y limpia los datos para análisis
+        
+        Args:
+            quality_mode (str): Modo de limpieza por calidad ('range', 'drop'
+                o 'weight'); por defecto el configurado en el cargador
         """
         print("\nPreparando datos...")
         
-        # Combinar todos los datos
-        all_dataframes = []
+        if quality_mode is None:
+            quality_mode = self.quality_mode
         
-        for region, df in self.data.items():
-            # Crear copia para no modificar el original
-            df_clean = df.copy()
-            
-            # Convertir fecha a datetime
-            df_clean['Date'] = pd.to_datetime(df_clean['Date'])
-            
-            # Limpiar valores de NDVI y EVI (eliminar valores inválidos)
-            df_clean = df_clean[
-                (df_clean['MOD13Q1_061__250m_16_days_NDVI'] >= 0) & 
-                (df_clean['MOD13Q1_061__250m_16_days_NDVI'] <= 1) &
-                (df_clean['MOD13Q1_061__250m_16_days_EVI'] >= 0) & 
-                (df_clean['MOD13Q1_061__250m_16_days_EVI'] <= 1)
-            ]
-            
-            # Renombrar columnas para facilitar el trabajo
-            df_clean = df_clean.rename(columns={
-                'MOD13Q1_061__250m_16_days_NDVI': 'NDVI',
-                'MOD13Q1_061__250m_16_days_EVI': 'EVI',
-                'MOD13Q1_061__250m_16_days_pixel_reliability': 'Pixel_Reliability'
-            })
-            
-            # Agregar columnas derivadas
-            df_clean['Year'] = df_clean['Date'].dt.year
-            df_clean['Month'] = df_clean['Date'].dt.month
-            df_clean['Season'] = df_clean['Month'].map({
-                12: 'Winter', 1: 'Winter', 2: 'Winter',
-                3: 'Spring', 4: 'Spring', 5: 'Spring',
-                6: 'Summer', 7: 'Summer', 8: 'Summer',
-                9: 'Fall', 10: 'Fall', 11: 'Fall'
-            })
-            
-            # Calcular estadísticas por región
-            df_clean['NDVI_Mean'] = df_clean.groupby('Region')['NDVI'].transform('mean')
-            df_clean['NDVI_Std'] = df_clean.groupby('Region')['NDVI'].transform('std')
-            
-            all_dataframes.append(df_clean)
+        # Regiones ya preparadas durante la ingesta (con el mismo modo) y pendientes
+        reuse = quality_mode == self.quality_mode
+        prepared = [self.prepared_data[region] for region in self.data if reuse and region in self.prepared_data]
+        pending = [df for region, df in self.data.items() if not (reuse and region in self.prepared_data)]
+        
+        # Las regiones pendientes se concatenan una sola vez y se preparan juntas
+        if pending:
+            prepared.append(prepare_frame(pd.concat(pending, ignore_index=True), quality_mode))
         
         # Combinar todos los datos
-        self.combined_data = pd.concat(all_dataframes, ignore_index=True)
+        self.combined_data = pd.concat(prepared, ignore_index=True)
         
         # Ordenar por fecha
         self.combined_data = self.combined_data.sort_values(['Region', 'Date'])
@@ -115,6 +564,302 @@ class NDVIDataLoader:
         
         return self.combined_data
     
+    def load_manifest(self):
+        """
+        Carga el manifiesto de ingesta incremental
+        
+        Returns:
+            dict: Manifiesto (vacío si no existe)
+        """
+        if not self.manifest_file.exists():
+            return {'quality_mode': self.quality_mode, 'regions': {}}
+        
+        with open(self.manifest_file) as f:
+            return json.load(f)
+    
+    def save_manifest(self, manifest):
+        """
+        Guarda el manifiesto de forma atómica
+        """
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.manifest_file.with_suffix('.tmp')
+        
+        with open(temp_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_file, self.manifest_file)
+    
+    def _manifest_entry(self, file_path, raw_rows, last_date, totals, previous=None):
+        """
+        Crea la entrada del manifiesto para una región
+        """
+        offset = complete_lines_offset(file_path)
+        entry = {
+            'file': file_path.name,
+            'offset': offset,
+            'source_hash': file_prefix_hash(file_path, offset),
+            'row_count': int(raw_rows) + (previous['row_count'] if previous else 0),
+            'last_date': str(pd.Timestamp(last_date).date()),
+            'ndvi_count': 0,
+            'ndvi_sum': 0.0,
+            'ndvi_sumsq': 0.0
+        }
+        
+        if previous is not None:
+            for key in ['ndvi_count', 'ndvi_sum', 'ndvi_sumsq']:
+                entry[key] = previous[key]
+        
+        if totals is not None:
+            entry['ndvi_count'] += int(totals['ndvi_count'])
+            entry['ndvi_sum'] += float(totals['ndvi_sum'])
+            entry['ndvi_sumsq'] += float(totals['ndvi_sumsq'])
+        
+        return entry
+    
+    def build_manifest(self):
+        """
+        Construye el manifiesto a partir de una carga completa
+        (load_all_csv_files + prepare_data)
+        
+        Returns:
+            dict: Manifiesto con la marca de agua de cada región
+        """
+        if self.combined_data is None:
+            raise ValueError("Primero debe cargar y preparar los datos")
+        
+        totals = region_ndvi_totals(self.combined_data)
+        manifest = {'quality_mode': self.quality_mode, 'regions': {}}
+        
+        for region, file_path in sorted(self.source_files.items(), key=lambda item: item[1].name):
+            if region not in self.data:
+                continue
+            
+            raw = self.data[region]
+            manifest['regions'][region] = self._manifest_entry(
+                file_path,
+                len(raw),
+                raw['Date'].max(),
+                totals.loc[region] if region in totals.index else None
+            )
+        
+        return manifest
+    
+    def load_incremental(self):
+        """
+        Lee solo las filas posteriores a la marca de agua de cada región
+        
+        Si el inicio del archivo no cambió (mismo hash), solo se leen los
+        bytes agregados al final; si el archivo fue reescrito se relee
+        completo y se descartan las filas con fecha <= última fecha ingerida.
+        
+        Returns:
+            tuple: (filas nuevas preparadas, manifiesto actualizado)
+        """
+        print("Ingesta incremental...")
+        
+        manifest = self.load_manifest()
+        if manifest['regions'] and manifest.get('quality_mode') != self.quality_mode:
+            raise ValueError("El modo de calidad no coincide con el del manifiesto; ejecute una carga completa")
+        
+        csv_files = sorted(self.data_folder.glob("*.csv"))
+        if not csv_files:
+            raise FileNotFoundError(f"No se encontraron archivos CSV en {self.data_folder}")
+        
+        new_frames = []
+        raw_info = {}
+        
+        for file_path in csv_files:
+            region = region_name_from_file(file_path)
+            entry = manifest['regions'].get(region)
+            size = file_path.stat().st_size
+            
+            unchanged_prefix = (
+                entry is not None and
+                entry['file'] == file_path.name and
+                entry['offset'] <= size and
+                file_prefix_hash(file_path, entry['offset']) == entry['source_hash']
+            )
+            
+            if unchanged_prefix and entry['offset'] == size:
+                print(f"  = {region}: sin cambios")
+                continue
+            
+            if unchanged_prefix:
+                # Leer solo el final agregado usando el encabezado del archivo
+                with open(file_path, 'rb') as f:
+                    header = f.readline().decode().strip().split(',')
+                    f.seek(entry['offset'])
+                    tail = f.read()
+                df = read_appeears_csv(io.BytesIO(tail), product='MOD13Q1', region=region, names=header)
+            else:
+                df = read_appeears_csv(file_path, product='MOD13Q1', region=region)
+            
+            raw_rows = len(df)
+            last_date = df['Date'].max() if raw_rows else None
+            if entry is not None:
+                df = df[df['Date'] > pd.Timestamp(entry['last_date'])]
+                if last_date is None or last_date < pd.Timestamp(entry['last_date']):
+                    last_date = pd.Timestamp(entry['last_date'])
+            
+            print(f"  + {region}: {len(df)} filas nuevas")
+            raw_info[region] = (file_path, len(df), last_date)
+            new_frames.append(df)
+        
+        new_rows = None
+        if any(len(df) for df in new_frames):
+            new_rows = prepare_frame(pd.concat(new_frames, ignore_index=True), self.quality_mode)
+        
+        totals = region_ndvi_totals(new_rows) if new_rows is not None else pd.DataFrame()
+        
+        for region, (file_path, raw_rows, last_date) in raw_info.items():
+            previous = manifest['regions'].get(region)
+            region_totals = totals.loc[region] if region in totals.index else None
+            
+            if last_date is None:
+                continue
+            
+            entry = self._manifest_entry(file_path, raw_rows, last_date, region_totals, previous)
+            manifest['regions'][region] = entry
+            
+            # Estadísticas de región con el histórico completo (acumuladores)
+            if previous is not None and region_totals is not None:
+                region_mask = new_rows['Region'] == region
+                new_rows.loc[region_mask, ['NDVI_Mean', 'NDVI_Std']] = manifest_ndvi_stats(entry)
+        
+        manifest['quality_mode'] = self.quality_mode
+        
+        if new_rows is not None:
+            new_rows = new_rows.sort_values(['Region', 'Date'])
+        
+        return new_rows, manifest
+    
+    def run_incremental(self, output_file="data/processed/processed_ndvi_data.csv"):
+        """
+        Agrega al almacén procesado solo las composiciones nuevas
+        
+        Sin manifiesto (primera ejecución) se hace una carga completa y se
+        reescribe el almacén. Las filas nuevas se agregan al final del almacén
+        (ordenadas por región y fecha) y NDVI_Mean/NDVI_Std se reescriben en
+        todas las filas de las regiones con datos nuevos a partir de los
+        acumuladores del manifiesto, de modo que las filas existentes y las
+        nuevas tengan las mismas estadísticas. El almacén existente se lee de
+        la caché columnar (no se releen los archivos crudos) y el CSV y la
+        caché se reescriben.
+        
+        Args:
+            output_file (str): Archivo CSV procesado
+            
+        Returns:
+            pd.DataFrame: Filas agregadas (None si no hubo datos nuevos)
+        """
+        if not self.manifest_file.exists() or not Path(output_file).exists():
+            print("Sin manifiesto previo: carga completa")
+            self.load_all_csv_files()
+            self.prepare_data()
+            self.export_processed_data(output_file)
+            return self.combined_data
+        
+        new_rows, manifest = self.load_incremental()
+        
+        if new_rows is None:
+            print("✓ No hay composiciones nuevas")
+            self.save_manifest(manifest)
+            return None
+        
+        existing = load_processed_data(output_file)
+        if existing.columns.tolist() != new_rows.columns.tolist():
+            raise ValueError("Las columnas no coinciden con el almacén procesado; ejecute una carga completa")
+        
+        combined = pd.concat([existing, new_rows], ignore_index=True)
+        
+        # Estadísticas de región con el histórico completo en todas sus filas
+        for region in new_rows['Region'].unique():
+            region_mask = combined['Region'] == region
+            combined.loc[region_mask, ['NDVI_Mean', 'NDVI_Std']] = manifest_ndvi_stats(manifest['regions'][region])
+        
+        combined.to_csv(output_file, index=False)
+        write_processed_cache(combined, output_file)
+        self.save_manifest(manifest)
+        self.combined_data = new_rows
+        
+        print(f"✓ {len(new_rows)} filas nuevas agregadas a: {output_file}")
+        return new_rows
+    
+    def stream_aggregate(self, files=None, group_by='zone', memory_budget_mb=256):
+        """
+        Ingesta por bloques para extracciones de área (millones de filas)
+        
+        Cada archivo se lee por bloques (o grupos de filas en Parquet) de un
+        tamaño derivado del presupuesto de memoria; cada bloque se limpia con
+        el modo de calidad configurado y se reduce a acumuladores por zona o
+        por píxel. Los acumuladores se combinan cuando ocupan más de la mitad
+        del presupuesto, de modo que la tabla completa nunca está en memoria.
+        
+        Args:
+            files (list): Archivos a procesar (por defecto los .csv y
+                .parquet de la carpeta de datos)
+            group_by (str): 'zone' (serie por región y fecha, queda en
+                combined_data lista para exportar) o 'pixel' (estadísticas
+                por píxel en todo el periodo)
+            memory_budget_mb (float): Presupuesto de memoria en MB
+            
+        Returns:
+            pd.DataFrame: Agregados por zona y fecha o por píxel
+        """
+        if group_by not in AGGREGATE_KEYS:
+            raise ValueError(f"Agregación {group_by} no soportada")
+        
+        if files is None:
+            files = sorted(list(self.data_folder.glob("*.csv")) + list(self.data_folder.glob("*.parquet")))
+        files = [Path(file_path) for file_path in files]
+        
+        if not files:
+            raise FileNotFoundError(f"No se encontraron archivos en {self.data_folder}")
+        
+        # Mitad del presupuesto para el bloque en lectura y mitad para los acumuladores
+        budget_bytes = memory_budget_mb * 1024 * 1024
+        chunk_rows = chunk_rows_for_budget('MOD13Q1', memory_budget_mb / 2)
+        print(f"Ingesta por bloques: {chunk_rows} filas por bloque (presupuesto {memory_budget_mb} MB)")
+        
+        start = time.perf_counter()
+        totals = None
+        partials = []
+        partial_bytes = 0
+        total_rows = 0
+        
+        for file_path in files:
+            region = region_name_from_file(file_path)
+            file_rows = 0
+            
+            for chunk in iter_appeears_chunks(file_path, product='MOD13Q1', region=region, chunk_rows=chunk_rows):
+                partial = aggregate_chunk(chunk, group_by, self.quality_mode)
+                partials.append(partial)
+                partial_bytes += partial.memory_usage(deep=True).sum()
+                file_rows += len(chunk)
+                
+                if partial_bytes > budget_bytes / 2:
+                    totals = combine_partials(([totals] if totals is not None else []) + partials, group_by)
+                    partials = []
+                    partial_bytes = totals.memory_usage(deep=True).sum()
+            
+            total_rows += file_rows
+            print(f"  ✓ {region}: {file_rows} filas")
+        
+        if partials:
+            totals = combine_partials(([totals] if totals is not None else []) + partials, group_by)
+        
+        if totals is None:
+            raise ValueError("Los archivos no contienen filas para agregar")
+        
+        result = finalize_aggregates(totals, group_by, self.quality_mode)
+        
+        print(f"✓ {total_rows} filas reducidas a {len(result)} agregados por {group_by} "
+              f"({time.perf_counter() - start:.3f} s)")
+        
+        if group_by == 'zone':
+            self.combined_data = result
+        
+        return result
+    
     def get_data_summary(self):
         """
         Obtiene un resumen estadístico de los datos
@@ -219,9 +964,14 @@ class NDVIDataLoader:
         
         plt.show()
     
-    def export_processed_data(self, output_file="data/processed/processed_ndvi_data.csv"):
+    def export_processed_data(self, output_file="data/processed/processed_ndvi_data.csv", columnar_cache=True):
         """
         Exporta los datos procesados a un archivo CSV
+        
+        Args:
+            output_file (str): Archivo CSV de salida
+            columnar_cache (bool): Si escribir también la caché columnar tipada
+                (Feather) que usan las etapas siguientes
         """
         if self.combined_data is None:
             raise ValueError("Primero debe cargar y preparar los datos")
@@ -229,8 +979,41 @@ class NDVIDataLoader:
         self.combined_data.to_csv(output_file, index=False)
         print(f"✓ Datos procesados exportados a: {output_file}")
         
+        # Marca de agua para las siguientes ejecuciones incrementales
+        if self.data:
+            self.save_manifest(self.build_manifest())
+        
+        if columnar_cache:
+            cache_file = write_processed_cache(self.combined_data, output_file)
+            if cache_file is not None:
+                print(f"✓ Caché columnar escrita en: {cache_file}")
+            else:
+                print("⚠️ pyarrow no disponible, se omite la caché columnar")
+        
         return output_file
 
+    def export_panel(self, output_file="data/processed/processed_ndvi_data.csv", target_columns=('NDVI',)):
+        """
+        Guarda el panel denso región × tiempo (.npy con memmap) de cada
+        columna objetivo, asociado al CSV procesado ya exportado
+        
+        Args:
+            output_file (str): Archivo CSV procesado (para la huella)
+            target_columns (tuple): Columnas con las que construir paneles
+        """
+        if self.combined_data is None:
+            raise ValueError("Primero debe cargar y preparar los datos")
+        
+        paths = []
+        for target_column in target_columns:
+            panel = NDVIPanel.from_frame(self.combined_data, target_column)
+            panel.fingerprint = source_fingerprint(output_file)
+            path = panel.save(panel_path_for(output_file, target_column))
+            paths.append(path)
+            print(f"✓ Panel {target_column} {panel.values.shape} guardado en: {path}.npy")
+        
+        return paths
+
 def main():
     """
     Función principal para ejecutar el cargador de datos
@@ -257,6 +1040,9 @@ def main():
         # Exportar datos procesados
         loader.export_processed_data()
         
+        # Guardar el panel región × tiempo compartido por los predictores
+        loader.export_panel()
+        
         print("\n" + "="*50)
         print("✅ PROCESAMIENTO COMPLETADO EXITOSAMENTE")
         print("="*50)
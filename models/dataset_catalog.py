@@ -0,0 +1,365 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Versión del formato del catálogo; se incrementa si cambian los campos guardados
+CATALOG_VERSION = 1
+
+# Archivos de cada extracción de AppEEARS, por rol
+SIDECAR_PATTERNS = {
+    'request': '*-request.json',
+    'granules': '*-granule-list.txt',
+    'metadata': '*-metadata.xml',
+    'results': '*-results.csv'
+}
+
+# Fecha de adquisición en el nombre del gránulo (MOD13Q1.A2005001.h08v06...)
+GRANULE_PATTERN = re.compile(r'\.A(\d{7})\.(h\d{2}v\d{2})\.')
+
+# Campos del metadata.xml. AppEEARS escribe caracteres sin escapar (por
+# ejemplo 'NDVI & EVI'), así que el archivo no siempre es XML válido y se
+# extraen con expresiones regulares en lugar de un parser XML
+METADATA_PRODUCT_PATTERN = re.compile(r'<gco:CharacterString>\s*([A-Z0-9]+\.\d{3})\s*</gco:CharacterString>')
+METADATA_GRANULARITY_PATTERN = re.compile(r'<gml:description>\s*(.*?)\s*</gml:description>', re.S)
+METADATA_POINT_PATTERN = re.compile(r'<gml:pos>\s*([-\d.]+)\s+([-\d.]+)\s*</gml:pos>')
+
+
+def file_sha256(file_path):
+    """
+    Hash SHA-256 del contenido completo de un archivo
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_request(file_path):
+    """
+    Extrae tarea, productos, coordenadas y rango solicitado de un request.json
+
+    Args:
+        file_path (Path): Archivo *-request.json de AppEEARS
+
+    Returns:
+        dict: Campos de la solicitud
+    """
+    with open(file_path) as f:
+        request = json.load(f)
+
+    params = request.get('params', {})
+    dates = params.get('dates', [])
+    starts = [datetime.strptime(d['startDate'], '%m-%d-%Y') for d in dates]
+    ends = [datetime.strptime(d['endDate'], '%m-%d-%Y') for d in dates]
+
+    # monterrey_<Región>_<tipo>_<inicio>_<fin>
+    task_name = request.get('task_name', '')
+    parts = task_name.split('_')
+
+    return {
+        'task_id': request.get('task_id'),
+        'task_name': task_name,
+        'task_type': request.get('task_type'),
+        'region': parts[1] if len(parts) > 1 else None,
+        'products': sorted({layer['product'] for layer in params.get('layers', [])}),
+        'layers': [layer['layer'] for layer in params.get('layers', [])],
+        'coordinates': [[c['latitude'], c['longitude']] for c in params.get('coordinates', [])],
+        'requested_start': str(min(starts).date()) if starts else None,
+        'requested_end': str(max(ends).date()) if ends else None
+    }
+
+
+def parse_granule_list(file_path):
+    """
+    Fechas de adquisición y mosaicos de la lista de gránulos
+
+    Args:
+        file_path (Path): Archivo *-granule-list.txt
+
+    Returns:
+        dict: Número de gránulos, primera/última fecha y mosaicos
+    """
+    dates = []
+    tiles = set()
+
+    with open(file_path) as f:
+        for line in f:
+            match = GRANULE_PATTERN.search(line)
+            if match:
+                dates.append(datetime.strptime(match.group(1), '%Y%j'))
+                tiles.add(match.group(2))
+
+    return {
+        'granule_count': len(dates),
+        'start_date': str(min(dates).date()) if dates else None,
+        'end_date': str(max(dates).date()) if dates else None,
+        'tiles': sorted(tiles)
+    }
+
+
+def parse_metadata(file_path):
+    """
+    Producto, granularidad temporal y puntos del metadata.xml (ISO 19115)
+
+    Args:
+        file_path (Path): Archivo *-metadata.xml
+
+    Returns:
+        dict: Campos del metadato
+    """
+    with open(file_path, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+
+    product = METADATA_PRODUCT_PATTERN.search(text)
+    granularity = METADATA_GRANULARITY_PATTERN.search(text)
+
+    return {
+        'product': product.group(1) if product else None,
+        'temporal_granularity': granularity.group(1) if granularity else None,
+        'points': [[float(lat), float(lon)] for lat, lon in METADATA_POINT_PATTERN.findall(text)]
+    }
+
+
+class DatasetCatalog:
+    """
+    Catálogo persistente de las extracciones de AppEEARS
+
+    Indexa cada carpeta de extracción (producto, región, rango de fechas,
+    coordenadas y archivos con tamaño y hash) a partir de los archivos
+    request.json, granule-list y metadata.xml. Al reconstruirlo solo se
+    vuelven a leer y a hashear los archivos cuyo tamaño o fecha de
+    modificación cambiaron.
+    """
+
+    def __init__(self, datasets_root="../extractors/datasets", catalog_file="data/processed/dataset_catalog.json"):
+        """
+        Inicializa el catálogo
+
+        Args:
+            datasets_root (str): Carpeta raíz de los datasets descargados
+            catalog_file (str): Archivo JSON donde se guarda el índice
+        """
+        self.datasets_root = Path(datasets_root)
+        self.catalog_file = Path(catalog_file)
+        self.entries = {}
+
+    def load(self):
+        """
+        Carga el índice guardado (si existe y es de la versión actual)
+        """
+        if not self.catalog_file.exists():
+            return self.entries
+
+        with open(self.catalog_file) as f:
+            stored = json.load(f)
+
+        if stored.get('version') == CATALOG_VERSION:
+            self.entries = stored.get('entries', {})
+
+        return self.entries
+
+    def save(self):
+        """
+        Guarda el índice de forma atómica
+        """
+        self.catalog_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.catalog_file.with_suffix('.tmp')
+
+        with open(temp_file, 'w') as f:
+            json.dump({'version': CATALOG_VERSION, 'entries': self.entries}, f, indent=2)
+        os.replace(temp_file, self.catalog_file)
+
+    def _file_record(self, file_path, previous=None):
+        """
+        Tamaño, fecha de modificación y hash de un archivo; el hash se
+        reutiliza si el tamaño y la fecha no cambiaron
+        """
+        stat = file_path.stat()
+        record = {
+            'path': file_path.relative_to(self.datasets_root).as_posix(),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+
+        if previous is not None and previous['size'] == record['size'] and previous['mtime_ns'] == record['mtime_ns']:
+            record['sha256'] = previous['sha256']
+        else:
+            record['sha256'] = file_sha256(file_path)
+
+        return record
+
+    def _build_entry(self, folder, files):
+        """
+        Crea la entrada de una carpeta de extracción a partir de sus archivos
+        """
+        entry = {'folder': folder.relative_to(self.datasets_root).as_posix(), 'files': files}
+
+        if 'request' in files:
+            entry.update(parse_request(self.datasets_root / files['request']['path']))
+        if 'granules' in files:
+            entry.update(parse_granule_list(self.datasets_root / files['granules']['path']))
+        if 'metadata' in files:
+            entry.update(parse_metadata(self.datasets_root / files['metadata']['path']))
+
+        # Producto sin versión (MOD13Q1.061 -> MOD13Q1), como en los esquemas del lector
+        product = entry.get('product') or (entry.get('products') or [None])[0]
+        entry['product'] = product
+        entry['product_name'] = product.split('.')[0] if product else None
+
+        # Sin lista de gránulos, usar el rango solicitado
+        if entry.get('start_date') is None:
+            entry['start_date'] = entry.get('requested_start')
+            entry['end_date'] = entry.get('requested_end')
+
+        return entry
+
+    def update(self):
+        """
+        Actualiza el índice de forma incremental
+
+        Las carpetas sin cambios (mismos tamaños y fechas de modificación) se
+        conservan tal cual; las nuevas o modificadas se vuelven a leer y las
+        que ya no existen se eliminan.
+
+        Returns:
+            dict: Conteo de carpetas nuevas, actualizadas, sin cambios y eliminadas
+        """
+        if not self.datasets_root.exists():
+            raise FileNotFoundError(f"No se encontró la carpeta {self.datasets_root}")
+
+        counts = {'new': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        seen = set()
+
+        for request_file in sorted(self.datasets_root.glob(f"**/{SIDECAR_PATTERNS['request']}")):
+            folder = request_file.parent
+            key = folder.relative_to(self.datasets_root).as_posix()
+            seen.add(key)
+            previous = self.entries.get(key)
+            previous_files = previous['files'] if previous else {}
+
+            files = {}
+            for role, pattern in SIDECAR_PATTERNS.items():
+                matches = sorted(folder.glob(pattern))
+                if matches:
+                    files[role] = self._file_record(matches[0], previous_files.get(role))
+
+            if previous is not None and files == previous_files:
+                counts['unchanged'] += 1
+                continue
+
+            self.entries[key] = self._build_entry(folder, files)
+            counts['updated' if previous is not None else 'new'] += 1
+
+        for key in set(self.entries) - seen:
+            del self.entries[key]
+            counts['removed'] += 1
+
+        return counts
+
+    @classmethod
+    def load_or_build(cls, datasets_root="../extractors/datasets", catalog_file="data/processed/dataset_catalog.json"):
+        """
+        Carga el índice guardado, lo actualiza y lo guarda si hubo cambios
+
+        Returns:
+            DatasetCatalog: Catálogo al día
+        """
+        catalog = cls(datasets_root, catalog_file)
+        catalog.load()
+        counts = catalog.update()
+
+        if counts['new'] or counts['updated'] or counts['removed'] or not catalog.catalog_file.exists():
+            catalog.save()
+
+        print(f"✓ Catálogo: {len(catalog.entries)} extracciones "
+              f"({counts['new']} nuevas, {counts['updated']} actualizadas, {counts['removed']} eliminadas)")
+
+        return catalog
+
+    def find(self, region=None, product=None, start=None, end=None):
+        """
+        Extracciones que cubren una región, producto y rango de fechas
+
+        Args:
+            region (str): Nombre de la región (sin distinguir mayúsculas)
+            product (str): Producto con o sin versión ('MOD13Q1' o 'MOD13Q1.061')
+            start (str): Inicio del rango (las extracciones deben traslaparlo)
+            end (str): Fin del rango
+
+        Returns:
+            list: Entradas del catálogo que cumplen los filtros
+        """
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        matches = []
+
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+
+            if region is not None and (entry.get('region') or '').lower() != region.lower():
+                continue
+            if product is not None and product not in (entry.get('product'), entry.get('product_name')):
+                continue
+            if start is not None and entry.get('end_date') and pd.Timestamp(entry['end_date']) < start:
+                continue
+            if end is not None and entry.get('start_date') and pd.Timestamp(entry['start_date']) > end:
+                continue
+
+            matches.append(entry)
+
+        return matches
+
+    def results_files(self, region=None, product=None, start=None, end=None):
+        """
+        Archivos de resultados (con su región) que cubren la consulta
+
+        Returns:
+            list: Pares (región, ruta del CSV de resultados)
+        """
+        return [
+            (entry['region'], self.datasets_root / entry['files']['results']['path'])
+            for entry in self.find(region, product, start, end)
+            if 'results' in entry['files']
+        ]
+
+    def summary(self):
+        """
+        Tabla resumen del catálogo (una fila por extracción)
+
+        Returns:
+            pd.DataFrame: Producto, región, fechas, gránulos y tamaño de resultados
+        """
+        rows = []
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            rows.append({
+                'Product': entry.get('product'),
+                'Region': entry.get('region'),
+                'Start': entry.get('start_date'),
+                'End': entry.get('end_date'),
+                'Granules': entry.get('granule_count'),
+                'Coordinates': len(entry.get('coordinates', [])),
+                'Results_Bytes': entry['files'].get('results', {}).get('size')
+            })
+        return pd.DataFrame(rows)
+
+
+def main():
+    """
+    Construye o actualiza el catálogo de datasets
+    """
+    print("🗂️ CATÁLOGO DE DATASETS APPEEARS")
+    print("="*50)
+
+    catalog = DatasetCatalog.load_or_build()
+    print(catalog.summary().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+import warnings
+warnings.filterwarnings('ignore')
+
+from ndvi_panel import COMPOSITES_PER_YEAR, composite_dates, load_panel_data, prediction_frame, row_metrics
+
+# Composiciones de 16 días por año (periodo estacional). El calendario se
+# reinicia cada 1 de enero, así que la posición t % m de una columna del
+# panel es siempre la misma composición del año
+SEASONAL_PERIOD = COMPOSITES_PER_YEAR
+
+# Malla inicial de parámetros. beta y gamma se expresan como fracción de su
+# cota (beta < alpha, gamma < 1 - alpha), así toda la malla es admisible
+ALPHA_GRID = np.array([0.05, 0.2, 0.4, 0.6, 0.8, 0.95])
+BETA_FRACTION_GRID = np.array([0.01, 0.1, 0.3, 0.6])
+GAMMA_FRACTION_GRID = np.array([0.01, 0.1, 0.3, 0.6])
+
+# Rondas de refinamiento alrededor del mejor punto de cada serie
+REFINE_ROUNDS = 4
+PARAM_MIN = 0.001
+PARAM_MAX = 0.999
+
+
+def initial_states(values, m=SEASONAL_PERIOD):
+    """
+    Estados iniciales de Holt-Winters a partir de los dos primeros ciclos
+
+    Args:
+        values (np.ndarray): Series (series × períodos), al menos 2·m períodos
+        m (int): Periodo estacional
+
+    Returns:
+        tuple: (nivel (series,), tendencia (series,), estacionalidad (m, series))
+    """
+    first = values[:, :m].mean(axis=1)
+    second = values[:, m:2 * m].mean(axis=1)
+    level = first
+    trend = (second - first) / m
+    season = (values[:, :m] - first[:, None]).T
+    return level, trend, season
+
+
+def to_smoothing(params):
+    """
+    Convierte (alpha, fracción de beta, fracción de gamma) en (alpha, beta, gamma)
+    """
+    alpha = params[..., 0]
+    beta = params[..., 1] * alpha
+    gamma = params[..., 2] * (1 - alpha)
+    return alpha, beta, gamma
+
+
+def holt_winters_filter(values, params, m=SEASONAL_PERIOD):
+    """
+    Recursión Holt-Winters aditiva (forma de corrección de error) para
+    todas las series y todos los candidatos de parámetros a la vez
+
+    y_t = l + b + s_{t-m} + e_t
+    l_t = l + b + alpha·e_t,  b_t = b + beta·e_t,  s_t = s_{t-m} + gamma·e_t
+
+    Args:
+        values (np.ndarray): Series (series × períodos)
+        params (np.ndarray): Parámetros (series × candidatos × 3) en la
+            parametrización de to_smoothing
+        m (int): Periodo estacional
+
+    Returns:
+        tuple: (SSE (series × candidatos), nivel, tendencia y estacionalidad
+            finales; la estacionalidad tiene forma (m, series, candidatos))
+    """
+    n_series, n_periods = values.shape
+    n_candidates = params.shape[1]
+    alpha, beta, gamma = to_smoothing(params)
+
+    level0, trend0, season0 = initial_states(values, m)
+    level = np.repeat(level0[:, None], n_candidates, axis=1)
+    trend = np.repeat(trend0[:, None], n_candidates, axis=1)
+    season = np.repeat(season0[:, :, None], n_candidates, axis=2)
+    sse = np.zeros((n_series, n_candidates))
+
+    # Operaciones en el lugar: la recursión es secuencial en el tiempo y
+    # este ciclo domina el costo del ajuste
+    error = np.empty_like(level)
+    step = np.empty_like(level)
+    values_t = np.ascontiguousarray(values.T)
+
+    for t in range(n_periods):
+        s = t % m
+        np.add(level, trend, out=level)
+        np.subtract(values_t[t][:, None], level, out=error)
+        error -= season[s]
+        np.multiply(error, error, out=step)
+        sse += step
+        np.multiply(alpha, error, out=step)
+        level += step
+        np.multiply(beta, error, out=step)
+        trend += step
+        np.multiply(gamma, error, out=step)
+        season[s] += step
+
+    return sse, level, trend, season
+
+
+def fit_holt_winters(values, m=SEASONAL_PERIOD, rounds=REFINE_ROUNDS):
+    """
+    Ajusta Holt-Winters aditivo a varias series con un optimizador por lotes
+
+    Primero evalúa una malla común de parámetros para todas las series y
+    después refina, en cada ronda, una vecindad 3×3×3 alrededor del mejor
+    punto de cada serie reduciendo el paso a la mitad. Cada ronda es una
+    sola pasada vectorizada de la recursión.
+
+    Args:
+        values (np.ndarray): Series (series × períodos)
+        m (int): Periodo estacional
+        rounds (int): Rondas de refinamiento
+
+    Returns:
+        dict: params (series × 3), alpha, beta, gamma, sigma2, sse y los
+            estados finales (level, trend, season con forma (m, series))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_series, n_periods = values.shape
+    if n_periods < 2 * m:
+        raise ValueError(f"Se requieren al menos {2 * m} períodos para Holt-Winters con m={m}")
+
+    grid = np.stack(np.meshgrid(ALPHA_GRID, BETA_FRACTION_GRID, GAMMA_FRACTION_GRID, indexing='ij'), axis=-1)
+    candidates = np.broadcast_to(grid.reshape(1, -1, 3), (n_series, grid[..., 0].size, 3))
+
+    sse, *_ = holt_winters_filter(values, candidates, m)
+    best = candidates[np.arange(n_series), sse.argmin(axis=1)]
+
+    offsets = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij'), axis=-1).reshape(-1, 3)
+    step = np.array([0.1, 0.1, 0.1])
+
+    for _ in range(rounds):
+        step = step / 2
+        candidates = np.clip(best[:, None, :] + offsets[None, :, :] * step, PARAM_MIN, PARAM_MAX)
+        sse, *_ = holt_winters_filter(values, candidates, m)
+        best = candidates[np.arange(n_series), sse.argmin(axis=1)]
+
+    sse, level, trend, season = holt_winters_filter(values, best[:, None, :], m)
+    alpha, beta, gamma = to_smoothing(best)
+
+    return {
+        'params': best,
+        'alpha': alpha,
+        'beta': beta,
+        'gamma': gamma,
+        'sse': sse[:, 0],
+        'sigma2': sse[:, 0] / (n_periods - 3),
+        'level': level[:, 0],
+        'trend': trend[:, 0],
+        'season': season[:, :, 0],
+        'n_periods': n_periods
+    }
+
+
+def forecast_holt_winters(fit, horizon, m=SEASONAL_PERIOD, interval_width=0.95):
+    """
+    Pronóstico e intervalo analítico de Holt-Winters aditivo
+
+    La varianza a h pasos es sigma² · (1 + Σ_{j<h} c_j²) con
+    c_j = alpha + beta·j + gamma·[j múltiplo de m].
+
+    Args:
+        fit (dict): Resultado de fit_holt_winters
+        horizon (int): Períodos a pronosticar
+        m (int): Periodo estacional
+        interval_width (float): Cobertura del intervalo
+
+    Returns:
+        tuple: (pronóstico, límite inferior, límite superior), cada uno de
+            forma (series × horizonte)
+    """
+    h = np.arange(1, horizon + 1)
+    season_index = (fit['n_periods'] + h - 1) % m
+
+    mean = fit['level'][:, None] + h[None, :] * fit['trend'][:, None] + fit['season'][season_index].T
+
+    j = np.arange(1, horizon)
+    c = fit['alpha'][:, None] + fit['beta'][:, None] * j[None, :] + fit['gamma'][:, None] * (j % m == 0)[None, :]
+    variance = fit['sigma2'][:, None] * (1 + np.concatenate([np.zeros((len(c), 1)), np.cumsum(c ** 2, axis=1)], axis=1))
+
+    half_width = NormalDist().inv_cdf(0.5 + interval_width / 2) * np.sqrt(variance)
+    return mean, mean - half_width, mean + half_width
+
+
+class ETSPredictor:
+    """
+    Clase para predicción usando Holt-Winters aditivo (ETS(A,A,A))
+
+    Modelo rápido con tendencia y ciclo anual: todas las regiones se ajustan
+    y pronostican juntas sobre el panel región × tiempo.
+    """
+
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", seasonal_period=SEASONAL_PERIOD,
+                 interval_width=0.95):
+        """
+        Inicializa el predictor ETS
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+            seasonal_period (int): Composiciones por ciclo estacional
+            interval_width (float): Cobertura de los intervalos de predicción
+        """
+        self.data_file = data_file
+        self.data = None
+        self.panel = None
+        self.seasonal_period = seasonal_period
+        self.interval_width = interval_width
+        self.models = {}
+
+    def load_data(self):
+        """
+        Carga los datos procesados y el panel región × tiempo
+        """
+        self.data, self.panel = load_panel_data(self.data_file, "ETS")
+        return self.data
+
+    def predict_all_regions(self, periods=12):
+        """
+        Predice NDVI para todas las regiones usando Holt-Winters
+
+        Las métricas se calculan ajustando sobre el 80 % inicial de cada
+        serie y pronosticando el 20 % restante; el pronóstico futuro usa la
+        serie completa.
+
+        Args:
+            periods (int): Número de períodos a predecir
+
+        Returns:
+            dict: Predicciones para todas las regiones y métricas
+        """
+        print(f"\n🎯 Prediciendo NDVI para todas las regiones usando ETS (m={self.seasonal_period})...")
+
+        all_predictions = []
+        all_metrics = {}
+        m = self.seasonal_period
+
+        for positions, values, dates in self.panel.group_values():
+            regions = [str(region) for region in self.panel.regions[positions]]
+
+            if values.shape[1] < 2 * m:
+                print(f"  ⚠️ Serie demasiado corta para {regions}: {values.shape[1]} períodos")
+                continue
+
+            # Validación: ajustar con el 80 % y pronosticar el resto
+            train_size = int(values.shape[1] * 0.8)
+            validation_fit = fit_holt_winters(values[:, :train_size], m)
+            test_predictions, _, _ = forecast_holt_winters(validation_fit, values.shape[1] - train_size, m)
+            metrics = row_metrics(values[:, train_size:], test_predictions)
+
+            # Pronóstico futuro con la serie completa
+            fit = fit_holt_winters(values, m)
+            mean, lower, upper = forecast_holt_winters(fit, periods, m, self.interval_width)
+            future_dates = composite_dates(dates[-1], periods)
+
+            for row, region in enumerate(regions):
+                all_metrics[region] = metrics[row]
+                self.models[region] = {key: fit[key][row] for key in ('alpha', 'beta', 'gamma', 'sigma2')}
+
+                params = f"HW(α={fit['alpha'][row]:.3f}, β={fit['beta'][row]:.3f}, γ={fit['gamma'][row]:.3f})"
+                all_predictions.append(prediction_frame(future_dates, mean[row], region, 'ETS', params,
+                                                        lower[row], upper[row]))
+
+                print(f"  {region}: RMSE={metrics[row]['RMSE']:.4f}, MAPE={metrics[row]['MAPE']:.2f}%")
+
+        if all_predictions:
+            combined_predictions = pd.concat(all_predictions, ignore_index=True)
+
+            print(f"\n✅ Predicciones ETS completadas para {len(all_metrics)} regiones")
+
+            return {
+                'predictions': combined_predictions,
+                'metrics': all_metrics
+            }
+        else:
+            print("❌ No se pudieron generar predicciones")
+            return None
+
+    def export_predictions(self, predictions, output_file="data/predictions/ndvi_predictions_ets.csv"):
+        """
+        Exporta las predicciones a un archivo CSV
+
+        Args:
+            predictions (pd.DataFrame): DataFrame con predicciones
+            output_file (str): Nombre del archivo de salida
+        """
+        predictions.to_csv(output_file, index=False)
+        print(f"✓ Predicciones ETS exportadas a: {output_file}")
+
+        return output_file
+
+def main():
+    """
+    Función principal para ejecutar el predictor ETS
+    """
+    print("🔮 PREDICTOR ETS (HOLT-WINTERS) - MONTERREY")
+    print("="*50)
+
+    # Crear instancia del predictor
+    predictor = ETSPredictor()
+
+    try:
+        # Cargar datos
+        predictor.load_data()
+
+        # Predicciones usando Holt-Winters
+        print("\n" + "="*50)
+        print("PREDICCIONES USANDO HOLT-WINTERS ADITIVO")
+        print("="*50)
+
+        ets_results = predictor.predict_all_regions(periods=12)
+
+        if ets_results is not None:
+            predictor.export_predictions(ets_results['predictions'])
+
+        print("\n" + "="*50)
+        print("✅ PREDICCIONES ETS COMPLETADAS")
+        print("="*50)
+
+    except Exception as e:
+        print(f"❌ Error durante la predicción ETS: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+import warnings
+warnings.filterwarnings('ignore')
+
+from ndvi_panel import composite_dates, load_panel_data, prediction_frame, row_metrics
+
+# Duración media del año para la fase del ciclo anual
+DAYS_PER_YEAR = 365.25
+
+
+def harmonic_design(dates, origin, harmonics=3):
+    """
+    Matriz de diseño compartida: intercepto, tendencia lineal y K armónicos anuales
+
+    La fase se calcula con la fecha real (no con el número de período),
+    de modo que el ciclo queda anclado al calendario aunque la malla de 16
+    días se desfase respecto al año.
+
+    Args:
+        dates (pd.DatetimeIndex): Fechas de las filas
+        origin (pd.Timestamp): Fecha de referencia de la tendencia
+        harmonics (int): Número de pares seno/coseno
+
+    Returns:
+        np.ndarray: Matriz (fechas × (2 + 2·harmonics))
+    """
+    years = (pd.DatetimeIndex(dates) - origin).days.to_numpy() / DAYS_PER_YEAR
+    columns = [np.ones_like(years), years]
+
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * years
+        columns.append(np.sin(angle))
+        columns.append(np.cos(angle))
+
+    return np.column_stack(columns)
+
+
+def fit_harmonic(design, values):
+    """
+    Ajusta todas las series con un único sistema de mínimos cuadrados
+
+    Args:
+        design (np.ndarray): Matriz de diseño (períodos × parámetros)
+        values (np.ndarray): Series (series × períodos)
+
+    Returns:
+        dict: coefs (series × parámetros), sigma2 (series,) y la inversa de
+            XᵀX (compartida por todas las series)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_periods, n_params = design.shape
+
+    # Una sola llamada para todas las series (una columna de Y por serie)
+    coefs, _, _, _ = np.linalg.lstsq(design, values.T, rcond=None)
+    residuals = values.T - design @ coefs
+
+    return {
+        'coefs': coefs.T,
+        'sigma2': (residuals ** 2).sum(axis=0) / (n_periods - n_params),
+        'xtx_inv': np.linalg.pinv(design.T @ design)
+    }
+
+
+def forecast_harmonic(fit, design, interval_width=0.95):
+    """
+    Pronóstico e intervalo de predicción de la regresión armónica
+
+    La varianza de predicción es sigma² · (1 + xᵀ(XᵀX)⁻¹x); el factor entre
+    paréntesis depende solo de las fechas y se comparte entre series.
+
+    Args:
+        fit (dict): Resultado de fit_harmonic
+        design (np.ndarray): Matriz de diseño de las fechas a predecir
+        interval_width (float): Cobertura del intervalo
+
+    Returns:
+        tuple: (pronóstico, límite inferior, límite superior), cada uno de
+            forma (series × fechas)
+    """
+    mean = fit['coefs'] @ design.T
+    leverage = np.einsum('ij,jk,ik->i', design, fit['xtx_inv'], design)
+
+    half_width = (NormalDist().inv_cdf(0.5 + interval_width / 2) *
+                  np.sqrt(fit['sigma2'][:, None] * (1 + leverage[None, :])))
+    return mean, mean - half_width, mean + half_width
+
+
+class HarmonicPredictor:
+    """
+    Clase para predicción usando regresión armónica (tendencia + ciclo anual)
+
+    Todas las regiones comparten la matriz de diseño y se ajustan con un
+    solo sistema de mínimos cuadrados sobre el panel región × tiempo.
+    """
+
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", harmonics=3, interval_width=0.95):
+        """
+        Inicializa el predictor armónico
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+            harmonics (int): Número de armónicos anuales (pares seno/coseno)
+            interval_width (float): Cobertura de los intervalos de predicción
+        """
+        self.data_file = data_file
+        self.data = None
+        self.panel = None
+        self.harmonics = harmonics
+        self.interval_width = interval_width
+        self.models = {}
+
+    def load_data(self):
+        """
+        Carga los datos procesados y el panel región × tiempo
+        """
+        self.data, self.panel = load_panel_data(self.data_file, "armónico")
+        return self.data
+
+    def predict_all_regions(self, periods=12):
+        """
+        Predice NDVI para todas las regiones usando regresión armónica
+
+        Las métricas se calculan ajustando sobre el 80 % inicial de cada
+        serie y pronosticando el 20 % restante; el pronóstico futuro usa la
+        serie completa.
+
+        Args:
+            periods (int): Número de períodos a predecir
+
+        Returns:
+            dict: Predicciones para todas las regiones y métricas
+        """
+        print(f"\n🎯 Prediciendo NDVI para todas las regiones usando regresión armónica (K={self.harmonics})...")
+
+        all_predictions = []
+        all_metrics = {}
+
+        for positions, values, dates in self.panel.group_values():
+            regions = [str(region) for region in self.panel.regions[positions]]
+            origin = dates[0]
+
+            # Validación: ajustar con el 80 % y pronosticar el resto
+            train_size = int(values.shape[1] * 0.8)
+            design = harmonic_design(dates, origin, self.harmonics)
+            validation_fit = fit_harmonic(design[:train_size], values[:, :train_size])
+            test_predictions, _, _ = forecast_harmonic(validation_fit, design[train_size:])
+            metrics = row_metrics(values[:, train_size:], test_predictions)
+
+            # Pronóstico futuro con la serie completa
+            fit = fit_harmonic(design, values)
+            future_dates = composite_dates(dates[-1], periods)
+            mean, lower, upper = forecast_harmonic(fit, harmonic_design(future_dates, origin, self.harmonics),
+                                                   self.interval_width)
+
+            for row, region in enumerate(regions):
+                all_metrics[region] = metrics[row]
+                self.models[region] = {'coefs': fit['coefs'][row], 'sigma2': fit['sigma2'][row]}
+
+                params = f"Tendencia + {self.harmonics} armónicos"
+                all_predictions.append(prediction_frame(future_dates, mean[row], region, 'Harmonic', params,
+                                                        lower[row], upper[row]))
+
+                print(f"  {region}: RMSE={metrics[row]['RMSE']:.4f}, MAPE={metrics[row]['MAPE']:.2f}%")
+
+        if all_predictions:
+            combined_predictions = pd.concat(all_predictions, ignore_index=True)
+
+            print(f"\n✅ Predicciones armónicas completadas para {len(all_metrics)} regiones")
+
+            return {
+                'predictions': combined_predictions,
+                'metrics': all_metrics
+            }
+        else:
+            print("❌ No se pudieron generar predicciones")
+            return None
+
+    def export_predictions(self, predictions, output_file="data/predictions/ndvi_predictions_harmonic.csv"):
+        """
+        Exporta las predicciones a un archivo CSV
+
+        Args:
+            predictions (pd.DataFrame): DataFrame con predicciones
+            output_file (str): Nombre del archivo de salida
+        """
+        predictions.to_csv(output_file, index=False)
+        print(f"✓ Predicciones armónicas exportadas a: {output_file}")
+
+        return output_file
+
+def main():
+    """
+    Función principal para ejecutar el predictor armónico
+    """
+    print("🔮 PREDICTOR ARMÓNICO - MONTERREY")
+    print("="*50)
+
+    # Crear instancia del predictor
+    predictor = HarmonicPredictor()
+
+    try:
+        # Cargar datos
+        predictor.load_data()
+
+        # Predicciones usando regresión armónica
+        print("\n" + "="*50)
+        print("PREDICCIONES USANDO REGRESIÓN ARMÓNICA")
+        print("="*50)
+
+        harmonic_results = predictor.predict_all_regions(periods=12)
+
+        if harmonic_results is not None:
+            predictor.export_predictions(harmonic_results['predictions'])
+
+        print("\n" + "="*50)
+        print("✅ PREDICCIONES ARMÓNICAS COMPLETADAS")
+        print("="*50)
+
+    except Exception as e:
+        print(f"❌ Error durante la predicción armónica: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+import numpy as np
+import pandas as pd
+
+# Cobertura por defecto del intervalo Lower_Bound–Upper_Bound (igual que Prophet)
+DEFAULT_INTERVAL_LEVEL = 0.95
+
+# Cuantiles intermedios que se exportan además de los límites, como columnas
+# Q<porcentaje> (por ejemplo (0.1, 0.5, 0.9)); ninguno por defecto
+DEFAULT_QUANTILES = ()
+
+# Métodos disponibles: 'conformal' usa el cuantil conforme del error
+# absoluto; 'bootstrap' remuestrea los errores absolutos
+INTERVAL_METHODS = ('conformal', 'bootstrap')
+
+# Horizontes vecinos (a cada lado) cuyos errores se usan para un horizonte;
+# 11 composiciones a cada lado ≈ un año de errores por horizonte
+DEFAULT_RADIUS = 11
+
+# Elementos máximos del arreglo de muestras (regiones × horizontes × muestras)
+# que se crean a la vez (~40 MB en float64)
+MAX_SAMPLE_ELEMENTS = 5_000_000
+
+
+def residual_matrix(residuals, regions):
+    """
+    Apila los errores de validación de varias regiones en un arreglo
+
+    Los errores de cada región pueden venir de un solo origen (arreglo 1-D
+    ordenado por horizonte, como el 20 % de validación de los predictores)
+    o de varios orígenes del backtest (arreglo orígenes × horizontes, ver
+    backtest_residuals).
+
+    Args:
+        residuals (dict): Errores (real - predicho) por región
+        regions (list): Regiones en el orden de las filas
+
+    Returns:
+        tuple: (arreglo regiones × orígenes × horizontes con NaN de relleno,
+            número de horizontes por región)
+    """
+    rows = [np.atleast_2d(np.asarray(residuals.get(region, []), dtype=np.float64)) for region in regions]
+    origins = max((row.shape[0] for row in rows), default=0)
+    width = max((row.shape[1] for row in rows), default=0)
+
+    matrix = np.full((len(rows), origins, width), np.nan)
+    for position, row in enumerate(rows):
+        matrix[position, :row.shape[0], :row.shape[1]] = row
+
+    return matrix, np.array([row.shape[1] for row in rows], dtype=np.intp)
+
+
+def horizon_windows(lengths, horizon, radius=DEFAULT_RADIUS):
+    """
+    Ventana de errores de validación que se usa para cada horizonte
+
+    Para el horizonte h se toman los errores de los horizontes h ± radius;
+    la ventana se desplaza para no salir de los errores disponibles y se
+    acorta solo si la región tiene menos errores que el ancho de ventana.
+
+    Args:
+        lengths (np.ndarray): Horizontes con errores por región
+        horizon (int): Horizontes a cubrir
+        radius (int): Horizontes vecinos a cada lado
+
+    Returns:
+        tuple: (inicio, ancho), arreglos enteros de forma (regiones × horizon)
+    """
+    lengths = np.asarray(lengths)[:, None]
+    steps = np.arange(horizon)[None, :]
+
+    width = np.minimum(2 * radius + 1, lengths)
+    start = np.clip(steps - radius, 0, np.maximum(lengths - width, 0))
+    return start, np.broadcast_to(width, start.shape)
+
+
+def absolute_error_windows(matrix, lengths, horizon, radius=DEFAULT_RADIUS):
+    """
+    Errores absolutos de la ventana de cada región y horizonte, de todos los
+    orígenes, ordenados de menor a mayor (NaN al final)
+
+    Args:
+        matrix (np.ndarray): Errores (regiones × orígenes × horizontes)
+        lengths (np.ndarray): Horizontes con errores por región
+        horizon (int): Horizontes a cubrir
+        radius (int): Horizontes vecinos a cada lado
+
+    Returns:
+        tuple: (ventanas regiones × horizon × errores, errores válidos por
+            región y horizonte)
+    """
+    start, width = horizon_windows(lengths, horizon, radius)
+    offsets = np.arange(2 * radius + 1)
+
+    # (regiones × horizon × orígenes × ancho máximo), NaN fuera del ancho
+    columns = np.minimum(start[..., None] + offsets, matrix.shape[2] - 1)
+    windows = np.take_along_axis(np.abs(matrix)[:, None, :, :], columns[:, :, None, :], axis=3)
+    windows = np.where(offsets < width[..., None, None], windows, np.nan)
+
+    windows = np.sort(windows.reshape(start.shape + (-1,)), axis=-1)
+    return windows, (~np.isnan(windows)).sum(axis=-1)
+
+
+def symmetric_levels(quantiles):
+    """
+    Cobertura y lado de cada cuantil del intervalo simétrico
+
+    El cuantil q se ubica a ±Q_{|2q - 1|}(|error|) de la predicción puntual
+    (negativo si q < 0.5), de modo que los límites quedan a la misma
+    distancia a ambos lados y siempre contienen la predicción.
+
+    Returns:
+        tuple: (coberturas, signos)
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    return np.abs(2 * quantiles - 1), np.sign(quantiles - 0.5)
+
+
+def conformal_quantiles(matrix, lengths, horizon, quantiles, radius=DEFAULT_RADIUS):
+    """
+    Cuantiles conformes simétricos para todas las regiones y horizontes
+
+    Para una cobertura c el radio del intervalo es el estadístico de orden
+    ⌈(n + 1)·c⌉ de los n errores absolutos de la ventana (acotado a n).
+
+    Args:
+        matrix (np.ndarray): Errores (regiones × orígenes × horizontes)
+        lengths (np.ndarray): Horizontes con errores por región
+        horizon (int): Horizontes a cubrir
+        quantiles (tuple): Niveles de los cuantiles
+        radius (int): Horizontes vecinos a cada lado
+
+    Returns:
+        np.ndarray: Cuantiles del error (regiones × horizon × cuantiles)
+    """
+    if matrix.shape[2] == 0:
+        return np.full((len(matrix), horizon, len(quantiles)), np.nan)
+
+    windows, counts = absolute_error_windows(matrix, lengths, horizon, radius)
+    coverage, sign = symmetric_levels(quantiles)
+
+    n = counts[..., None]
+    rank = np.clip(np.ceil((n + 1) * coverage), 1, np.maximum(n, 1)).astype(np.intp)
+    result = np.take_along_axis(windows, rank - 1, axis=-1)
+    result = np.where(coverage > 0, result, 0.0) * sign
+
+    return np.where(n > 0, result, np.nan)
+
+
+def bootstrap_quantiles(matrix, lengths, horizon, quantiles, radius=DEFAULT_RADIUS,
+                        samples=1000, max_elements=MAX_SAMPLE_ELEMENTS, seed=42):
+    """
+    Cuantiles bootstrap simétricos para todas las regiones y horizontes
+
+    Remuestrea los errores absolutos de cada ventana y toma el cuantil de
+    cada cobertura. Las muestras se extraen como arreglos (regiones ×
+    horizontes × muestras) por bloques de regiones, de modo que la memoria
+    no supera max_elements sin importar el número de regiones.
+
+    Args:
+        matrix (np.ndarray): Errores (regiones × orígenes × horizontes)
+        lengths (np.ndarray): Horizontes con errores por región
+        horizon (int): Horizontes a cubrir
+        quantiles (tuple): Niveles de los cuantiles
+        radius (int): Horizontes vecinos a cada lado
+        samples (int): Remuestras por región y horizonte
+        max_elements (int): Tamaño máximo de cada bloque de muestras
+        seed (int): Semilla del generador aleatorio
+
+    Returns:
+        np.ndarray: Cuantiles del error (regiones × horizon × cuantiles)
+    """
+    result = np.full((len(matrix), horizon, len(quantiles)), np.nan)
+    if matrix.shape[2] == 0:
+        return result
+
+    windows, counts = absolute_error_windows(matrix, lengths, horizon, radius)
+    coverage, sign = symmetric_levels(quantiles)
+    rng = np.random.default_rng(seed)
+    block = max(1, max_elements // max(horizon * samples, 1))
+
+    for first in range(0, len(matrix), block):
+        rows = slice(first, first + block)
+        valid = counts[rows, 0] > 0
+        if not valid.any():
+            continue
+
+        block_counts = counts[rows][valid]
+
+        # Posición de cada remuestra entre los errores válidos (al inicio de
+        # la ventana ordenada)
+        draws = (rng.random(block_counts.shape + (samples,)) * block_counts[..., None]).astype(np.intp)
+        sampled = np.take_along_axis(windows[rows][valid], draws, axis=-1)
+
+        block_result = np.moveaxis(np.quantile(sampled, coverage, axis=-1), 0, -1)
+        result[np.flatnonzero(valid) + first] = block_result * sign
+
+    return result
+
+
+def error_quantiles(residuals, regions, horizon, quantiles, method='conformal', radius=DEFAULT_RADIUS, **kwargs):
+    """
+    Cuantiles simétricos del error de pronóstico por región y horizonte
+
+    Args:
+        residuals (dict): Errores de validación por región (1-D o
+            orígenes × horizontes)
+        regions (list): Regiones en el orden de las filas
+        horizon (int): Horizontes a cubrir
+        quantiles (tuple): Niveles de los cuantiles
+        method (str): 'conformal' o 'bootstrap' (ver INTERVAL_METHODS)
+        radius (int): Horizontes vecinos a cada lado
+        **kwargs: Opciones de bootstrap_quantiles (samples, max_elements, seed)
+
+    Returns:
+        np.ndarray: Cuantiles del error (regiones × horizon × cuantiles)
+    """
+    if method not in INTERVAL_METHODS:
+        raise ValueError(f"Método de intervalo {method} no soportado")
+
+    matrix, lengths = residual_matrix(residuals, regions)
+    if method == 'bootstrap':
+        return bootstrap_quantiles(matrix, lengths, horizon, quantiles, radius, **kwargs)
+    return conformal_quantiles(matrix, lengths, horizon, quantiles, radius)
+
+
+def backtest_residuals(errors, model):
+    """
+    Errores de varios orígenes de un modelo del backtest
+
+    Args:
+        errors (pd.DataFrame | str): Resultado de BacktestEngine.run o ruta
+            del CSV exportado por ModelValidator.export_backtest_errors
+        model (str): Nombre del modelo en el backtest (por ejemplo 'arima')
+
+    Returns:
+        dict: Errores (orígenes × horizontes, NaN si la composición no se
+            observó) por región; vacío si el modelo no está en el backtest
+    """
+    if isinstance(errors, str):
+        errors = pd.read_csv(errors)
+
+    errors = errors[errors['Model'] == model]
+    if errors.empty:
+        return {}
+
+    table = errors.pivot_table(index=['Region', 'Cutoff'], columns='Horizon', values='Error', aggfunc='first')
+    table = table.reindex(columns=range(1, int(table.columns.max()) + 1))
+
+    return {str(region): group.to_numpy() for region, group in table.groupby(level='Region', sort=False)}
+
+
+def calibration_residuals(residuals, calibration_errors, model):
+    """
+    Errores con los que se calibran los intervalos de un predictor
+
+    Usa los errores de varios orígenes del backtest cuando los hay para la
+    región y, si no, los errores de la validación 80/20 del predictor.
+
+    Args:
+        residuals (dict): Errores de validación del predictor por región
+        calibration_errors (pd.DataFrame | str): Errores del backtest (None
+            = solo la validación)
+        model (str): Nombre del modelo en el backtest
+
+    Returns:
+        dict: Errores por región
+    """
+    if calibration_errors is None:
+        return residuals
+    return {**residuals, **backtest_residuals(calibration_errors, model)}
+
+
+def quantile_column(level):
+    """
+    Nombre de la columna de un cuantil (por ejemplo 0.1 -> 'Q10')
+    """
+    return f"Q{level * 100:g}"
+
+
+def add_prediction_intervals(predictions, residuals, level=DEFAULT_INTERVAL_LEVEL, quantiles=DEFAULT_QUANTILES,
+                             method='conformal', radius=DEFAULT_RADIUS, **kwargs):
+    """
+    Agrega los intervalos de predicción a una tabla de predicciones
+
+    El horizonte de cada fila es su posición (por fecha) dentro de su
+    región. Los límites son simétricos alrededor de la predicción puntual:
+    Lower_Bound y Upper_Bound quedan a ±Q_level(|error|) y cada cuantil
+    intermedio q se agrega como columna Q<porcentaje> a ±Q_{|2q - 1|}(|error|).
+    Así la predicción siempre queda dentro de su intervalo, aunque el modelo
+    tenga sesgo (que ensancha el intervalo en lugar de desplazarlo).
+
+    Args:
+        predictions (pd.DataFrame): Predicciones con Date, Predicted_NDVI y Region
+        residuals (dict): Errores (real - predicho) por región: 1-D de la
+            validación o orígenes × horizontes del backtest
+        level (float): Cobertura del intervalo Lower_Bound–Upper_Bound
+        quantiles (tuple): Cuantiles intermedios adicionales
+        method (str): 'conformal' o 'bootstrap'
+        radius (int): Horizontes vecinos a cada lado
+        **kwargs: Opciones de bootstrap_quantiles
+
+    Returns:
+        pd.DataFrame: Copia de predictions con las columnas de intervalo
+    """
+    if not 0 < level < 1:
+        raise ValueError(f"La cobertura del intervalo debe estar entre 0 y 1 (se recibió {level})")
+
+    inner = tuple(sorted(quantiles))
+    levels = ((1 - level) / 2,) + inner + ((1 + level) / 2,)
+
+    predictions = predictions.copy()
+    codes, regions = pd.factorize(predictions['Region'])
+    steps = predictions.assign(_code=codes).sort_values('Date', kind='stable').groupby('_code').cumcount()
+    steps = steps.reindex(predictions.index).to_numpy()
+
+    errors = error_quantiles(residuals, list(regions), int(steps.max()) + 1 if len(steps) else 0,
+                             levels, method, radius, **kwargs)
+    point = predictions['Predicted_NDVI'].to_numpy(dtype=np.float64)
+    bounds = point[:, None] + errors[codes, steps]
+
+    # Columnas de intervalo justo después de Predicted_NDVI
+    columns = ['Lower_Bound'] + [quantile_column(q) for q in inner] + ['Upper_Bound']
+    predictions = predictions.drop(columns=[column for column in columns if column in predictions])
+    position = predictions.columns.get_loc('Predicted_NDVI') + 1
+    for offset, column in enumerate(columns):
+        predictions.insert(position + offset, column, bounds[:, offset])
+
+    return predictions
@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+class JobPool:
+    """
+    Pool de procesos persistente que ejecuta trabajos en orden
+
+    Base común de los ejecutores de ajustes (candidatos ARIMA, modelos
+    Prophet y orígenes del backtest). El pool se crea la primera vez que se
+    usa y se reutiliza entre llamadas; con un solo trabajador, o con un solo
+    trabajo, los trabajos se ejecutan en el proceso actual. Una falla del
+    proceso trabajador (no del ajuste) se convierte en el resultado que
+    devuelve failure_result, de modo que siempre hay un resultado por
+    trabajo.
+    """
+
+    def __init__(self, workers=None, initializer=None):
+        """
+        Inicializa el pool sin crear procesos
+
+        Args:
+            workers (int): Procesos del pool (None = número de núcleos,
+                1 = secuencial)
+            initializer (callable): Función que se ejecuta al iniciar cada
+                proceso trabajador
+        """
+        self.workers = workers or os.cpu_count()
+        self.initializer = initializer
+        self._pool = None
+
+    def map(self, function, jobs, failure_result):
+        """
+        Ejecuta function(**job) para cada trabajo
+
+        Args:
+            function (callable): Función de módulo (serializable)
+            jobs (list): Diccionarios con los argumentos de cada trabajo
+            failure_result (callable): (trabajo, excepción) -> resultado
+                cuando falla el proceso trabajador
+
+        Returns:
+            list: Resultados en el mismo orden que los trabajos
+        """
+        if self.workers <= 1 or len(jobs) <= 1:
+            return [function(**job) for job in jobs]
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+
+        futures = [self._pool.submit(function, **job) for job in jobs]
+
+        results = []
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(failure_result(job, e))
+        return results
+
+    def shutdown(self):
+        """
+        Cierra el pool de procesos (se vuelve a crear si se usa otra vez)
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.shutdown()
@@ -0,0 +1,551 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from statistics import NormalDist
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+from data_cache import load_processed_data
+from quality_flags import cloud_mask, quality_weights
+from ndvi_panel import composite_dates
+
+# Versión del formato del estado guardado; se incrementa si cambian los campos
+STATE_VERSION = 1
+
+# Días por composición MOD13Q1 y por año (para la tendencia y los armónicos)
+COMPOSITE_DAYS = 16
+DAYS_PER_YEAR = 365.25
+
+# Varianza inicial (difusa) de los estados, en unidades de la varianza de observación
+DIFFUSE_VARIANCE = 1e6
+
+# Malla de relaciones señal/ruido por composición: (nivel, pendiente, estacionalidad)
+LEVEL_RATIOS = [1e-3, 1e-2, 1e-1, 1.0]
+SLOPE_RATIOS = [0.0, 1e-5, 1e-3]
+SEASON_RATIOS = [1e-4, 1e-3, 1e-2]
+
+
+def observation_matrix(data, target_column='NDVI'):
+    """
+    Observaciones crudas (sin interpolar) por región y fecha de adquisición
+
+    Las composiciones nubladas o de relleno quedan como NaN y las demás
+    llevan su peso de calidad, que escala la varianza de observación. El
+    peso sale de la columna Quality_Weight del cargador (modo 'weight') y,
+    si no existe, se calcula a partir de VI_Quality y Pixel_Reliability.
+
+    Args:
+        data (pd.DataFrame): Datos procesados con Region, Date, la columna
+            objetivo y Quality_Weight/Cloudy o VI_Quality/Pixel_Reliability
+        target_column (str): Columna objetivo
+
+    Returns:
+        tuple: (regiones, fechas, valores (regiones × fechas), pesos)
+    """
+    regions = pd.Index(sorted(data['Region'].astype(str).unique()))
+    dates = pd.DatetimeIndex(sorted(data['Date'].unique()))
+
+    rows = regions.get_indexer(data['Region'].astype(str))
+    columns = dates.get_indexer(data['Date'])
+
+    values = np.full((len(regions), len(dates)), np.nan)
+    weights = np.zeros((len(regions), len(dates)))
+    values[rows, columns] = data[target_column].to_numpy(dtype=np.float64)
+
+    if 'Quality_Weight' in data.columns:
+        quality = data['Quality_Weight'].to_numpy(dtype=np.float64)
+        if 'Cloudy' in data.columns:
+            quality = np.where(data['Cloudy'].to_numpy(dtype=bool), 0.0, quality)
+        weights[rows, columns] = quality
+    elif 'Pixel_Reliability' in data.columns and 'MOD13Q1_061__250m_16_days_VI_Quality' in data.columns:
+        vi_quality = data['MOD13Q1_061__250m_16_days_VI_Quality'].to_numpy()
+        reliability = data['Pixel_Reliability'].to_numpy()
+        weights[rows, columns] = np.where(cloud_mask(vi_quality, reliability), 0.0,
+                                          quality_weights(vi_quality, reliability))
+    else:
+        weights[rows, columns] = 1.0
+
+    weights[np.isnan(values)] = 0.0
+    return regions, dates, values, weights
+
+
+def day_deltas(dates, previous=None):
+    """
+    Días entre fechas consecutivas (0 para la primera si no hay fecha previa)
+
+    Args:
+        dates (pd.DatetimeIndex): Fechas de los pasos
+        previous (pd.Timestamp): Fecha del último paso ya filtrado
+
+    Returns:
+        np.ndarray: Días desde el paso anterior
+    """
+    stamps = pd.DatetimeIndex(dates).to_numpy().astype('datetime64[s]')
+    start = stamps[:1] if previous is None else np.array([np.datetime64(previous, 's')])
+    return np.diff(np.concatenate([start, stamps])).astype(np.float64) / 86_400
+
+
+def state_dimension(harmonics):
+    """
+    Dimensión del estado: nivel, pendiente y un par por armónico
+    """
+    return 2 + 2 * harmonics
+
+
+def observation_vector(harmonics):
+    """
+    y = nivel + suma de los primeros componentes de cada armónico
+    """
+    z = np.zeros(state_dimension(harmonics))
+    z[0] = 1.0
+    z[2::2] = 1.0
+    return z
+
+
+def transition_matrix(delta_days, harmonics):
+    """
+    Matriz de transición para un paso de delta_days días
+
+    La pendiente se expresa por composición de 16 días y cada armónico
+    rota 2πk·Δt/365.25, de modo que los pasos irregulares (fin de año,
+    composiciones faltantes) se manejan sin interpolar.
+    """
+    transition = np.eye(state_dimension(harmonics))
+    transition[0, 1] = delta_days / COMPOSITE_DAYS
+
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * delta_days / DAYS_PER_YEAR
+        i = 2 * k
+        transition[i:i + 2, i:i + 2] = [[np.cos(angle), np.sin(angle)], [-np.sin(angle), np.cos(angle)]]
+
+    return transition
+
+
+def process_variance(ratios, delta_days, harmonics):
+    """
+    Diagonal de la covarianza del ruido de estado (proporcional al paso)
+
+    Args:
+        ratios (np.ndarray): (series × 3) relaciones nivel, pendiente, estacionalidad
+        delta_days (float): Días del paso
+        harmonics (int): Número de armónicos
+
+    Returns:
+        np.ndarray: (series × dimensión del estado)
+    """
+    scale = delta_days / COMPOSITE_DAYS
+    return np.column_stack([ratios[:, 0], ratios[:, 1]] + [ratios[:, 2]] * (2 * harmonics)) * scale
+
+
+def initial_state(values, ratios, harmonics):
+    """
+    Estado inicial difuso: nivel en la primera observación válida de cada serie
+
+    Returns:
+        dict: Estado con a, P, ratios y estadísticas de verosimilitud en cero
+    """
+    n_series = len(values)
+    dimension = state_dimension(harmonics)
+
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), 0)
+    a = np.zeros((n_series, dimension))
+    a[:, 0] = np.nan_to_num(values[np.arange(n_series), first])
+
+    return {
+        'a': a,
+        'P': np.repeat(np.eye(dimension)[None] * DIFFUSE_VARIANCE, n_series, axis=0),
+        'ratios': np.asarray(ratios, dtype=np.float64),
+        'sum_v2f': np.zeros(n_series),
+        'sum_log_f': np.zeros(n_series),
+        'n_used': np.zeros(n_series),
+        'n_seen': np.zeros(n_series)
+    }
+
+
+def kalman_filter(state, values, weights, deltas, harmonics):
+    """
+    Filtro de Kalman vectorizado sobre todas las series
+
+    Cada columna es un paso predicción/actualización. Las observaciones con
+    peso 0 (faltantes o nubladas) solo se predicen; las demás se actualizan
+    con varianza de observación 1/peso (en unidades de sigma²). La
+    verosimilitud concentrada se acumula en el estado, omitiendo las
+    primeras observaciones de cada serie (periodo difuso).
+
+    Args:
+        state (dict): Estado de initial_state o de un filtrado anterior
+        values (np.ndarray): Observaciones (series × pasos)
+        weights (np.ndarray): Pesos de calidad (series × pasos)
+        deltas (np.ndarray): Días desde el paso anterior (pasos,)
+        harmonics (int): Número de armónicos
+
+    Returns:
+        tuple: (estado actualizado, predicción a un paso (series × pasos))
+    """
+    a = state['a'].copy()
+    P = state['P'].copy()
+    sum_v2f = state['sum_v2f'].copy()
+    sum_log_f = state['sum_log_f'].copy()
+    n_used = state['n_used'].copy()
+    n_seen = state['n_seen'].copy()
+
+    z = observation_vector(harmonics)
+    burn_in = state_dimension(harmonics)
+    predicted = np.empty(values.shape)
+
+    for t, delta in enumerate(deltas):
+        # Predicción
+        if delta > 0:
+            transition = transition_matrix(delta, harmonics)
+            a = a @ transition.T
+            P = transition @ P @ transition.T
+            P += np.einsum('ni,ij->nij', process_variance(state['ratios'], delta, harmonics), np.eye(len(z)))
+
+        y_hat = a @ z
+        predicted[:, t] = y_hat
+
+        # Actualización solo donde hay observación confiable
+        observed = weights[:, t] > 0
+        if not observed.any():
+            continue
+
+        pz = P[observed] @ z
+        f = pz @ z + 1.0 / weights[observed, t]
+        v = values[observed, t] - y_hat[observed]
+        gain = pz / f[:, None]
+
+        a[observed] += gain * v[:, None]
+        P[observed] -= np.einsum('ni,nj->nij', gain, pz)
+
+        counted = n_seen[observed] >= burn_in
+        rows = np.flatnonzero(observed)[counted]
+        sum_v2f[rows] += v[counted] ** 2 / f[counted]
+        sum_log_f[rows] += np.log(f[counted])
+        n_used[rows] += 1
+        n_seen[observed] += 1
+
+    updated = dict(state, a=a, P=P, sum_v2f=sum_v2f, sum_log_f=sum_log_f, n_used=n_used, n_seen=n_seen)
+    return updated, predicted
+
+
+def concentrated_loglik(state):
+    """
+    Log-verosimilitud con sigma² concentrado y estimación de sigma²
+
+    Returns:
+        tuple: (log-verosimilitud (series,), sigma² (series,))
+    """
+    n_used = np.maximum(state['n_used'], 1)
+    sigma2 = state['sum_v2f'] / n_used
+    loglik = -0.5 * (n_used * np.log(np.maximum(sigma2, 1e-300)) + state['sum_log_f'])
+    return loglik, sigma2
+
+
+def fit_kalman(values, weights, deltas, harmonics):
+    """
+    Filtra desde cero eligiendo las relaciones de varianza por verosimilitud
+
+    Todas las series y todos los candidatos de la malla se filtran en una
+    sola pasada; para cada serie se conserva el estado final del candidato
+    con mayor verosimilitud concentrada.
+
+    Returns:
+        tuple: (estado, predicción a un paso del candidato elegido)
+    """
+    n_series = len(values)
+    grid = np.array([(level, slope, season)
+                     for level in LEVEL_RATIOS for slope in SLOPE_RATIOS for season in SEASON_RATIOS])
+    n_candidates = len(grid)
+
+    ratios = np.tile(grid, (n_series, 1))
+    repeated_values = np.repeat(values, n_candidates, axis=0)
+    repeated_weights = np.repeat(weights, n_candidates, axis=0)
+
+    state, predicted = kalman_filter(initial_state(repeated_values, ratios, harmonics),
+                                     repeated_values, repeated_weights, deltas, harmonics)
+
+    loglik, _ = concentrated_loglik(state)
+    best = np.arange(n_series) * n_candidates + loglik.reshape(n_series, n_candidates).argmax(axis=1)
+
+    return {key: value[best] for key, value in state.items()}, predicted[best]
+
+
+def forecast_kalman(state, deltas, harmonics, interval_width=0.95):
+    """
+    Pronóstico e intervalo propagando el estado sin observaciones
+
+    Args:
+        state (dict): Estado filtrado
+        deltas (np.ndarray): Días de cada paso futuro desde el anterior
+        harmonics (int): Número de armónicos
+        interval_width (float): Cobertura del intervalo
+
+    Returns:
+        tuple: (pronóstico, límite inferior, límite superior), cada uno de
+            forma (series × pasos)
+    """
+    _, sigma2 = concentrated_loglik(state)
+    z = observation_vector(harmonics)
+    a = state['a']
+    P = state['P']
+
+    mean = np.empty((len(a), len(deltas)))
+    variance = np.empty((len(a), len(deltas)))
+
+    for h, delta in enumerate(deltas):
+        transition = transition_matrix(delta, harmonics)
+        a = a @ transition.T
+        P = transition @ P @ transition.T
+        P = P + np.einsum('ni,ij->nij', process_variance(state['ratios'], delta, harmonics), np.eye(len(z)))
+        mean[:, h] = a @ z
+        variance[:, h] = sigma2 * ((P @ z) @ z + 1.0)
+
+    half_width = NormalDist().inv_cdf(0.5 + interval_width / 2) * np.sqrt(variance)
+    return mean, mean - half_width, mean + half_width
+
+
+def save_state(path, state, regions, last_date, harmonics):
+    """
+    Guarda el estado del filtro como .npz (sin objetos de Python)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_name(path.stem + '.tmp.npz')
+
+    np.savez(temp_file, version=STATE_VERSION, regions=np.array(regions, dtype=str),
+             last_date=np.datetime64(last_date, 'ns'), harmonics=harmonics, **state)
+    temp_file.replace(path)
+
+
+def load_state(path, harmonics):
+    """
+    Carga el estado guardado
+
+    Returns:
+        tuple: (estado, regiones, última fecha) o None si no existe o no es compatible
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    with np.load(path, allow_pickle=False) as stored:
+        if int(stored['version']) != STATE_VERSION or int(stored['harmonics']) != harmonics:
+            return None
+        state = {key: stored[key] for key in ('a', 'P', 'ratios', 'sum_v2f', 'sum_log_f', 'n_used', 'n_seen')}
+        return state, [str(region) for region in stored['regions']], pd.Timestamp(stored['last_date'][()])
+
+
+class KalmanPredictor:
+    """
+    Clase para predicción con un modelo estructural (tendencia lineal local
+    + estacionalidad trigonométrica) y un filtro de Kalman vectorizado
+
+    El estado del filtro se guarda entre ejecuciones: cada composición
+    nueva cuesta un paso de predicción/actualización por región en lugar de
+    reajustar toda la historia. Las composiciones faltantes o nubladas se
+    omiten en la actualización (sin interpolar).
+    """
+
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", harmonics=2,
+                 state_file="data/models/kalman_state.npz", interval_width=0.95):
+        """
+        Inicializa el predictor Kalman
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+            harmonics (int): Número de armónicos anuales
+            state_file (str): Archivo .npz del estado del filtro (None = no guardar)
+            interval_width (float): Cobertura de los intervalos de predicción
+        """
+        self.data_file = data_file
+        self.data = None
+        self.harmonics = harmonics
+        self.state_file = state_file
+        self.interval_width = interval_width
+        self.state = None
+        self.regions = None
+        self.last_date = None
+
+    def load_data(self):
+        """
+        Carga los datos procesados
+        """
+        print("📊 Cargando datos para modelo Kalman...")
+
+        try:
+            self.data = load_processed_data(self.data_file)
+
+            print(f"✓ Datos cargados: {len(self.data)} registros")
+            print(f"✓ Período: {self.data['Date'].min()} a {self.data['Date'].max()}")
+
+            return self.data
+
+        except Exception as e:
+            print(f"❌ Error cargando datos: {e}")
+            raise
+
+    def update_state(self, rebuild=False):
+        """
+        Lleva el estado del filtro hasta la última composición disponible
+
+        Si hay un estado guardado con las mismas regiones, solo se filtran
+        las composiciones posteriores a su última fecha; si no, se filtra
+        toda la historia eligiendo las varianzas por verosimilitud.
+
+        Args:
+            rebuild (bool): Ignorar el estado guardado
+
+        Returns:
+            dict: Estado actualizado
+        """
+        regions, dates, values, weights = observation_matrix(self.data)
+        stored = None if rebuild or self.state_file is None else load_state(self.state_file, self.harmonics)
+
+        if stored is not None and stored[1] == list(regions):
+            state, _, last_date = stored
+            new = dates > last_date
+
+            if not new.any():
+                print(f"♻️ Estado del filtro al día ({last_date.date()})")
+            else:
+                deltas = day_deltas(dates[new], last_date)
+                state, _ = kalman_filter(state, values[:, new], weights[:, new], deltas, self.harmonics)
+                print(f"⏩ Filtro actualizado con {new.sum()} composiciones nuevas")
+        else:
+            deltas = day_deltas(dates)
+            state, _ = fit_kalman(values, weights, deltas, self.harmonics)
+            print(f"✓ Filtro ajustado sobre {len(dates)} composiciones")
+
+        self.state = state
+        self.regions = list(regions)
+        self.last_date = dates[-1]
+
+        if self.state_file is not None:
+            save_state(self.state_file, state, self.regions, self.last_date, self.harmonics)
+
+        return state
+
+    def evaluate(self):
+        """
+        Métricas de validación: filtro sobre el 80 % inicial de las fechas y
+        pronóstico (sin actualizar) sobre el resto, comparado con las
+        observaciones confiables
+
+        Returns:
+            dict: Métricas por región
+        """
+        regions, dates, values, weights = observation_matrix(self.data)
+        deltas = day_deltas(dates)
+        train_size = int(len(dates) * 0.8)
+
+        masked = weights.copy()
+        masked[:, train_size:] = 0.0
+        _, predicted = fit_kalman(values, masked, deltas, self.harmonics)
+
+        actual = np.where(weights[:, train_size:] > 0, values[:, train_size:], np.nan)
+        errors = actual - predicted[:, train_size:]
+        mae = np.nanmean(np.abs(errors), axis=1)
+        mse = np.nanmean(errors ** 2, axis=1)
+        mape = np.nanmean(np.abs(errors / actual), axis=1) * 100
+
+        return {
+            region: {'MAE': mae[i], 'MSE': mse[i], 'RMSE': np.sqrt(mse[i]), 'MAPE': mape[i]}
+            for i, region in enumerate(regions)
+        }
+
+    def predict_all_regions(self, periods=12, evaluate=False):
+        """
+        Predice NDVI para todas las regiones desde el estado del filtro
+
+        El pronóstico solo usa el estado guardado; las métricas de validación
+        se calculan únicamente si se piden, porque requieren volver a filtrar
+        toda la historia (ver evaluate).
+
+        Args:
+            periods (int): Número de períodos a predecir
+            evaluate (bool): Si calcular métricas de validación
+
+        Returns:
+            dict: Predicciones para todas las regiones y métricas
+        """
+        print(f"\n🎯 Prediciendo NDVI para todas las regiones usando filtro de Kalman...")
+
+        state = self.update_state()
+
+        # Siguientes composiciones (el calendario se reinicia el 1 de enero)
+        future_dates = composite_dates(self.last_date, periods)
+        deltas = day_deltas(future_dates, previous=self.last_date)
+        mean, lower, upper = forecast_kalman(state, deltas, self.harmonics, self.interval_width)
+
+        all_metrics = self.evaluate() if evaluate else {}
+
+        all_predictions = []
+        for row, region in enumerate(self.regions):
+            all_predictions.append(pd.DataFrame({
+                'Date': future_dates,
+                'Predicted_NDVI': mean[row],
+                'Lower_Bound': lower[row],
+                'Upper_Bound': upper[row],
+                'Region': region,
+                'Model': 'Kalman',
+                'Params': f"LLT + {self.harmonics} armónicos"
+            }))
+
+            if region in all_metrics:
+                print(f"  {region}: RMSE={all_metrics[region]['RMSE']:.4f}, MAPE={all_metrics[region]['MAPE']:.2f}%")
+
+        print(f"\n✅ Predicciones Kalman completadas para {len(all_predictions)} regiones")
+
+        return {
+            'predictions': pd.concat(all_predictions, ignore_index=True),
+            'metrics': all_metrics
+        }
+
+    def export_predictions(self, predictions, output_file="data/predictions/ndvi_predictions_kalman.csv"):
+        """
+        Exporta las predicciones a un archivo CSV
+
+        Args:
+            predictions (pd.DataFrame): DataFrame con predicciones
+            output_file (str): Nombre del archivo de salida
+        """
+        predictions.to_csv(output_file, index=False)
+        print(f"✓ Predicciones Kalman exportadas a: {output_file}")
+
+        return output_file
+
+def main():
+    """
+    Función principal para ejecutar el predictor Kalman
+    """
+    print("🔮 PREDICTOR KALMAN - MONTERREY")
+    print("="*50)
+
+    # Crear instancia del predictor
+    predictor = KalmanPredictor()
+
+    try:
+        # Cargar datos
+        predictor.load_data()
+
+        # Predicciones desde el estado del filtro (con --evaluate también
+        # se calculan las métricas de validación, que refiltran la historia)
+        print("\n" + "="*50)
+        print("PREDICCIONES USANDO FILTRO DE KALMAN")
+        print("="*50)
+
+        kalman_results = predictor.predict_all_regions(periods=12, evaluate="--evaluate" in sys.argv)
+        predictor.export_predictions(kalman_results['predictions'])
+
+        print("\n" + "="*50)
+        print("✅ PREDICCIONES KALMAN COMPLETADAS")
+        print("="*50)
+
+    except Exception as e:
+        print(f"❌ Error durante la predicción Kalman: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Versión del formato de los registros; se incrementa si cambian los campos guardados
+REGISTRY_VERSION = 1
+
+
+def config_hash(config):
+    """
+    Hash corto y estable de una configuración de modelo
+
+    Args:
+        config (dict): Parámetros que afectan la selección o el ajuste
+
+    Returns:
+        str: Primeros 16 caracteres del SHA-256 del JSON ordenado
+    """
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def series_fingerprint(ts_data):
+    """
+    Huella de una serie temporal (fechas y valores)
+
+    Solo cambia si cambia la serie de la región, de modo que agregar datos
+    de otra región no invalida sus modelos.
+
+    Args:
+        ts_data (pd.Series): Serie con índice de fecha
+
+    Returns:
+        str: Primeros 16 caracteres del SHA-256 de fechas y valores
+    """
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(ts_data.index).asi8).tobytes())
+    digest.update(np.ascontiguousarray(ts_data.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class ModelRegistry:
+    """
+    Registro en disco de modelos ajustados
+
+    Cada registro se identifica por (región, tipo de modelo, hash de
+    configuración, huella de datos) y guarda el orden elegido, los
+    parámetros ajustados y los diagnósticos del ajuste, para que las etapas
+    y ejecuciones siguientes reutilicen órdenes y ajustes mientras no
+    cambien los datos ni la configuración.
+    """
+
+    def __init__(self, registry_dir="data/models"):
+        """
+        Inicializa el registro
+
+        Args:
+            registry_dir (str): Carpeta donde se guardan los registros JSON
+        """
+        self.registry_dir = Path(registry_dir)
+
+    def _path(self, region, model_type, config_key, data_fingerprint):
+        return self.registry_dir / f"{model_type}_{region}_{config_key}_{data_fingerprint}.json"
+
+    def get(self, region, model_type, config_key, data_fingerprint):
+        """
+        Registro guardado para la clave indicada
+
+        Returns:
+            dict: Registro o None si no existe (o es de otra versión)
+        """
+        path = self._path(region, model_type, config_key, data_fingerprint)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return record if record.get('version') == REGISTRY_VERSION else None
+
+    def put(self, region, model_type, config_key, data_fingerprint, record):
+        """
+        Guarda un registro de forma atómica
+
+        Si el registro indica su etapa ('stage'), se eliminan los registros
+        anteriores de la misma región, tipo de modelo, configuración y etapa
+        con otra huella de datos: el nuevo ajuste los reemplaza (en modo
+        incremental, el anterior ya se usó como punto de partida). Los
+        registros sin etapa (por ejemplo, uno por origen del backtest) se
+        conservan todos.
+
+        Args:
+            region (str): Nombre de la región
+            model_type (str): Tipo de modelo (por ejemplo 'ARIMA')
+            config_key (str): Hash de la configuración
+            data_fingerprint (str): Huella de la serie de entrenamiento
+            record (dict): Orden, parámetros y diagnósticos
+
+        Returns:
+            Path: Ruta del registro
+        """
+        self.registry_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(region, model_type, config_key, data_fingerprint)
+
+        record = {
+            **record,
+            'version': REGISTRY_VERSION,
+            'region': region,
+            'model_type': model_type,
+            'config_hash': config_key,
+            'data_fingerprint': data_fingerprint,
+            'created': datetime.now().isoformat(timespec='seconds')
+        }
+
+        temp_file = path.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(record, f, indent=2)
+        os.replace(temp_file, path)
+
+        if record.get('stage') is not None:
+            self._prune(region, model_type, config_key, record['stage'], keep=path)
+
+        return path
+
+    def _prune(self, region, model_type, config_key, stage, keep):
+        """
+        Elimina los registros de la misma etapa reemplazados por keep
+        """
+        for path in self.registry_dir.glob(f"{model_type}_{region}_{config_key}_*.json"):
+            if path == keep:
+                continue
+            try:
+                with open(path) as f:
+                    previous = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if previous.get('region') == region and previous.get('stage') == stage:
+                path.unlink(missing_ok=True)
+
+    def records(self, region, model_type, config_key):
+        """
+        Registros de una región, tipo de modelo y configuración (cualquier
+        huella de datos), del más reciente al más antiguo
+        """
+        records = []
+        for path in self.registry_dir.glob(f"{model_type}_{region}_{config_key}_*.json"):
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if record.get('version') == REGISTRY_VERSION and record.get('region') == region:
+                records.append(record)
+
+        return sorted(records, key=lambda record: (record['created'], record.get('series_length', 0)), reverse=True)
@@ -1,21 +1,30 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_cache import load_processed_data
+from backtest_engine import BacktestEngine, summarize_errors
+
 class ModelValidator:
     """
     Clase para validar modelos de predicción con datos históricos
     """
     
-    def __init__(self):
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv"):
         """
         Inicializa el validador de modelos
+        
+        Args:
+            data_file (str): Archivo CSV con datos procesados
         """
+        self.data_file = data_file
         self.historical_data = None
         self.predictions = {}
         self.validation_results = {}
+        self.backtest_errors = None
         
     def load_data(self):
         """
@@ -25,16 +34,22 @@ class ModelValidator:
         
         try:
             # Cargar datos históricos
-            self.historical_data = pd.read_csv("data/processed/processed_ndvi_data.csv")
-            self.historical_data['Date'] = pd.to_datetime(self.historical_data['Date'])
+            self.historical_data = load_processed_data(self.data_file)
             
-            # Cargar predicciones de diferentes modelos
-            self.predictions = {
-                'linear': pd.read_csv("data/predictions/ndvi_predictions_linear.csv"),
-                'seasonal': pd.read_csv("data/predictions/ndvi_predictions_seasonal.csv"),
-                'prophet_additive': pd.read_csv("data/predictions/ndvi_predictions_prophet_additive.csv"),
-                'prophet_multiplicative': pd.read_csv("data/predictions/ndvi_predictions_prophet_multiplicative.csv")
+            # Cargar predicciones de diferentes modelos (el backtest no las
+            # necesita, así que los archivos faltantes se omiten)
+            prediction_files = {
+                'linear': "data/predictions/ndvi_predictions_linear.csv",
+                'seasonal': "data/predictions/ndvi_predictions_seasonal.csv",
+                'prophet_additive': "data/predictions/ndvi_predictions_prophet_additive.csv",
+                'prophet_multiplicative': "data/predictions/ndvi_predictions_prophet_multiplicative.csv"
             }
+            self.predictions = {}
+            for model_name, prediction_file in prediction_files.items():
+                if Path(prediction_file).exists():
+                    self.predictions[model_name] = pd.read_csv(prediction_file)
+                else:
+                    print(f"⚠️ Predicciones {model_name} no encontradas: {prediction_file}")
             
             # Convertir fechas en predicciones
             for model_name, pred_data in self.predictions.items():
@@ -177,6 +192,92 @@ class ModelValidator:
         self.validation_results = validation_results
         return validation_results
     
+    def backtest_all_models(self, models=None, horizon=12, step=23, min_train=69, workers=None):
+        """
+        Valida los modelos con un backtest de orígenes móviles
+        
+        Cada modelo se vuelve a ajustar en varios orígenes históricos y sus
+        pronósticos a varios horizontes se comparan con las adquisiciones
+        observadas de historical_data (ver backtest_engine). Los resultados quedan en el mismo
+        formato que validate_all_models para el reporte y la exportación.
+        
+        Args:
+            models (list): Modelos a evaluar (None = todos los disponibles)
+            horizon (int): Horizonte máximo de pronóstico
+            step (int): Períodos entre orígenes consecutivos
+            min_train (int): Períodos de historia del primer origen
+            workers (int): Procesos del pool (None = número de núcleos)
+            
+        Returns:
+            dict: Métricas por región y modelo
+        """
+        print(f"\n🎯 BACKTEST DE TODOS LOS MODELOS")
+        print("="*60)
+        print(f"Horizonte: {horizon} adquisiciones, paso entre orígenes: {step} adquisiciones")
+        
+        engine = BacktestEngine(self.historical_data, models, horizon, step, min_train, workers)
+        errors = engine.run()
+        self.backtest_errors = errors
+        
+        if errors.empty:
+            print("❌ El backtest no produjo resultados")
+            self.validation_results = {}
+            return self.validation_results
+        
+        metrics = summarize_errors(errors)
+        
+        # R² y dirección de la tendencia (primer a último horizonte observado
+        # de cada origen)
+        residual = errors.assign(_sq=errors['Error'] ** 2,
+                                 _dev=(errors['Actual'] - errors.groupby(['Model', 'Region'])['Actual'].transform('mean')) ** 2)
+        fit = residual.groupby(['Model', 'Region']).agg(SSE=('_sq', 'sum'), SST=('_dev', 'sum'))
+        folds = errors.groupby(['Model', 'Region', 'Cutoff']).agg(
+            actual_first=('Actual', 'first'), actual_last=('Actual', 'last'),
+            predicted_first=('Predicted', 'first'), predicted_last=('Predicted', 'last'),
+            horizon_first=('Horizon', 'first'), horizon_last=('Horizon', 'last'))
+        span = (folds['horizon_last'] - folds['horizon_first']).clip(lower=1)
+        folds['Actual_Trend'] = (folds['actual_last'] - folds['actual_first']) / span
+        folds['Predicted_Trend'] = (folds['predicted_last'] - folds['predicted_first']) / span
+        folds['Trend_Correct'] = np.sign(folds['Actual_Trend']) == np.sign(folds['Predicted_Trend'])
+        trends = folds.groupby(['Model', 'Region'])[['Actual_Trend', 'Predicted_Trend', 'Trend_Correct']].mean()
+        
+        validation_results = {}
+        for row in metrics.itertuples(index=False):
+            key = (row.Model, row.Region)
+            validation_results.setdefault(row.Region, {})[row.Model] = {
+                'MAE': row.MAE,
+                'MSE': row.MSE,
+                'RMSE': row.RMSE,
+                'MAPE': row.MAPE,
+                'R2': 1 - fit.loc[key, 'SSE'] / fit.loc[key, 'SST'],
+                # Fracción de orígenes con la dirección correcta
+                'Trend_Direction_Correct': trends.loc[key, 'Trend_Correct'],
+                'Actual_Trend': trends.loc[key, 'Actual_Trend'],
+                'Predicted_Trend': trends.loc[key, 'Predicted_Trend'],
+                'Samples_Used': row.Samples
+            }
+        
+        # Error por horizonte (promedio de regiones y orígenes)
+        print("\n📈 RMSE POR HORIZONTE:")
+        by_horizon = summarize_errors(errors, by=('Model', 'Horizon')).pivot(index='Horizon', columns='Model', values='RMSE')
+        print(by_horizon.round(4).to_string())
+        
+        self.validation_results = validation_results
+        return validation_results
+    
+    def export_backtest_errors(self, output_file="data/predictions/model_backtest_errors.csv"):
+        """
+        Exporta los errores del backtest (un registro por modelo, región,
+        origen y horizonte) a un archivo CSV
+        """
+        if self.backtest_errors is None or self.backtest_errors.empty:
+            print("❌ No hay resultados de backtest para exportar")
+            return
+        
+        self.backtest_errors.to_csv(output_file, index=False)
+        print(f"✓ Errores del backtest exportados a: {output_file}")
+        return output_file
+    
     def generate_validation_report(self):
         """
         Genera un reporte de validación completo
@@ -383,8 +484,8 @@ def main():
         if not validator.load_data():
             return
         
-        # Validar todos los modelos
-        validation_results = validator.validate_all_models(validation_periods=12)
+        # Validar todos los modelos con orígenes móviles
+        validation_results = validator.backtest_all_models(horizon=12, step=23)
         
         # Generar reporte de validación
         validator.generate_validation_report()
@@ -394,6 +495,7 @@ def main():
         
         # Exportar resultados
         validator.export_validation_results()
+        validator.export_backtest_errors()
         
         print("\n" + "="*60)
         print("✅ VALIDACIÓN COMPLETADA EXITOSAMENTE")
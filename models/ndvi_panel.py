@@ -0,0 +1,428 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_cache import load_processed_data, source_fingerprint
+
+# Calendario de MOD13Q1: una composición cada 16 días que se reinicia el 1 de
+# enero de cada año (días del año 1, 17, ..., 353; la última es más corta)
+COMPOSITE_DAYS = 16
+COMPOSITES_PER_YEAR = 23
+
+# Identificador del eje temporal del panel (se guarda en el .json para
+# reconstruir los paneles creados con otra malla)
+COMPOSITE_FREQ = 'MOD13Q1-16D'
+
+
+def panel_path_for(data_file, target_column='NDVI'):
+    """
+    Ruta base del panel asociado a un CSV procesado (sin extensión)
+
+    Args:
+        data_file (str): Archivo CSV con datos procesados
+        target_column (str): Columna del panel
+
+    Returns:
+        Path: Ruta base; el panel se guarda como <ruta>.npy y <ruta>.json
+    """
+    data_file = Path(data_file)
+    return data_file.with_name(f"{data_file.stem}_panel_{target_column}")
+
+
+def composite_slots(dates):
+    """
+    Fecha de inicio de la composición de 16 días que contiene cada fecha
+
+    Args:
+        dates (array-like): Fechas
+
+    Returns:
+        pd.DatetimeIndex: Inicio de la composición de cada fecha
+    """
+    dates = pd.DatetimeIndex(dates).normalize()
+    return dates - pd.to_timedelta((dates.dayofyear - 1) % COMPOSITE_DAYS, unit='D')
+
+
+def composite_calendar(start, end):
+    """
+    Fechas de inicio de todas las composiciones entre dos fechas (inclusive)
+
+    Args:
+        start (pd.Timestamp): Primera fecha
+        end (pd.Timestamp): Última fecha
+
+    Returns:
+        pd.DatetimeIndex: Composiciones en orden cronológico
+    """
+    start = composite_slots([start])[0]
+    end = pd.Timestamp(end)
+    years = pd.to_datetime([f"{year}-01-01" for year in range(start.year, end.year + 1)])
+    offsets = pd.to_timedelta(np.arange(COMPOSITES_PER_YEAR) * COMPOSITE_DAYS, unit='D')
+    calendar = pd.DatetimeIndex((years.to_numpy()[:, None] + offsets.to_numpy()[None, :]).ravel())
+    return calendar[(calendar >= start) & (calendar <= end)]
+
+
+def composite_dates(last_date, periods):
+    """
+    Composiciones siguientes a una fecha (fechas de un pronóstico)
+
+    Args:
+        last_date (pd.Timestamp): Última fecha observada
+        periods (int): Composiciones a generar
+
+    Returns:
+        pd.DatetimeIndex: Las `periods` composiciones posteriores a last_date
+    """
+    last_date = pd.Timestamp(last_date)
+    horizon_end = last_date + pd.Timedelta(days=COMPOSITE_DAYS * (periods + COMPOSITES_PER_YEAR))
+    calendar = composite_calendar(last_date, horizon_end)
+    return calendar[calendar > last_date][:periods]
+
+
+def composite_cells(df, regions, dates):
+    """
+    Celda (fila de región, columna de composición) de cada observación
+
+    Args:
+        df (pd.DataFrame): Datos con columnas Region y Date
+        regions (pd.Index): Regiones del panel
+        dates (pd.DatetimeIndex): Composiciones del panel
+
+    Returns:
+        tuple: (filas, columnas); -1 si la región o la composición no están
+            en el panel
+    """
+    rows = pd.Index(regions).get_indexer(df['Region'].astype(str))
+    columns = pd.DatetimeIndex(dates).get_indexer(composite_slots(df['Date']))
+    return rows, columns
+
+
+def aligned_groups(values):
+    """
+    Agrupa las filas de una matriz (series × períodos) que tienen el mismo
+    rango observado (sin NaN en los extremos)
+
+    Los modelos vectorizados procesan cada grupo como una matriz sin huecos
+    en los extremos.
+
+    Args:
+        values (np.ndarray): Matriz con NaN fuera del rango de cada serie
+
+    Returns:
+        list: Tuplas (posiciones de las filas, slice de columnas)
+    """
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=1)
+    first = np.where(has_data, valid.argmax(axis=1), -1)
+    last = np.where(has_data, valid.shape[1] - 1 - valid[:, ::-1].argmax(axis=1), -1)
+
+    groups = {}
+    for position in np.flatnonzero(has_data):
+        groups.setdefault((first[position], last[position]), []).append(position)
+
+    return [(np.array(positions), slice(start, stop + 1)) for (start, stop), positions in groups.items()]
+
+
+def row_metrics(actual, predicted):
+    """
+    Métricas de evaluación por fila para los predictores vectorizados
+
+    El MAPE se promedia solo sobre los valores reales distintos de cero
+    (NaN si una fila no tiene ninguno).
+
+    Args:
+        actual (np.ndarray): Valores reales (series × períodos)
+        predicted (np.ndarray): Valores predichos (series × períodos)
+
+    Returns:
+        list: Diccionario de métricas por serie
+    """
+    actual = np.asarray(actual, dtype=np.float64)
+    errors = actual - predicted
+    mae = np.mean(np.abs(errors), axis=1)
+    mse = np.mean(errors ** 2, axis=1)
+    rmse = np.sqrt(mse)
+
+    nonzero = actual != 0
+    percent = np.abs(errors) / np.where(nonzero, np.abs(actual), 1.0)
+    counts = nonzero.sum(axis=1)
+    mape = np.where(counts > 0, np.where(nonzero, percent, 0.0).sum(axis=1) / np.maximum(counts, 1), np.nan) * 100
+
+    return [{'MAE': mae[i], 'MSE': mse[i], 'RMSE': rmse[i], 'MAPE': mape[i]} for i in range(len(actual))]
+
+
+def load_panel_data(data_file, model_name):
+    """
+    Carga los datos procesados y el panel región × tiempo de un predictor
+
+    Args:
+        data_file (str): Archivo CSV con datos procesados
+        model_name (str): Nombre del modelo para los mensajes
+
+    Returns:
+        tuple: (datos procesados, NDVIPanel)
+    """
+    print(f"📊 Cargando datos para modelo {model_name}...")
+
+    try:
+        data = load_processed_data(data_file)
+        panel = NDVIPanel.load_or_build(data_file)
+
+        print(f"✓ Datos cargados: {len(data)} registros")
+        print(f"✓ Panel: {len(panel)} regiones × {len(panel.dates)} períodos")
+
+        return data, panel
+
+    except Exception as e:
+        print(f"❌ Error cargando datos: {e}")
+        raise
+
+
+def prediction_frame(dates, predicted, region, model, params, lower=None, upper=None):
+    """
+    Tabla de predicciones de una región con las columnas de exportación
+
+    Args:
+        dates (pd.DatetimeIndex): Fechas pronosticadas
+        predicted (np.ndarray): Predicción puntual
+        region (str): Nombre de la región
+        model (str): Nombre del modelo
+        params (str): Descripción de los parámetros
+        lower (np.ndarray): Límite inferior (None = sin intervalo)
+        upper (np.ndarray): Límite superior (None = sin intervalo)
+
+    Returns:
+        pd.DataFrame: Date, Predicted_NDVI, [Lower_Bound, Upper_Bound],
+            Region, Model y Params
+    """
+    frame = {'Date': dates, 'Predicted_NDVI': predicted}
+    if lower is not None and upper is not None:
+        frame['Lower_Bound'] = lower
+        frame['Upper_Bound'] = upper
+    frame.update({'Region': region, 'Model': model, 'Params': params})
+
+    return pd.DataFrame(frame)
+
+
+class NDVIPanel:
+    """
+    Panel denso región × tiempo sobre el calendario de composiciones MOD13Q1
+
+    Cada columna es una composición de 16 días (el calendario se reinicia el
+    1 de enero), así que cada adquisición ocupa exactamente una celda y solo
+    se interpolan las composiciones faltantes. Los valores se guardan en un arreglo contiguo de forma (regiones, periodos)
+    que puede guardarse como .npy y abrirse con memmap, de modo que los
+    modelos reciben vistas sin copia y los procesos trabajadores comparten los
+    datos sin serializar DataFrames.
+    """
+
+    def __init__(self, values, dates, regions, target_column='NDVI', freq=COMPOSITE_FREQ, fingerprint=None):
+        """
+        Inicializa el panel
+
+        Args:
+            values (np.ndarray): Arreglo (regiones, periodos)
+            dates (pd.DatetimeIndex): Fechas del eje temporal
+            regions (pd.Index): Nombres de las regiones
+            target_column (str): Columna de origen de los valores
+            freq (str): Identificador del eje temporal
+            fingerprint (dict): Huella del CSV procesado de origen
+        """
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.regions = pd.Index(regions)
+        self.target_column = target_column
+        self.freq = freq
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_frame(cls, df, target_column='NDVI', dtype=np.float32):
+        """
+        Construye el panel a partir de datos en formato largo
+
+        Cada observación se coloca en la composición que la contiene; las
+        composiciones faltantes dentro del rango de una región se interpolan
+        linealmente y fuera de ese rango el valor es NaN. Si los datos traen
+        la columna Cloudy (modos de calidad 'drop' y 'weight'), las
+        composiciones nubladas se tratan como faltantes.
+
+        Args:
+            df (pd.DataFrame): Datos con columnas Region, Date y target_column
+                (y opcionalmente Cloudy)
+            target_column (str): Columna a pivotear
+            dtype: Tipo del arreglo de valores
+
+        Returns:
+            NDVIPanel: Panel construido
+
+        Raises:
+            ValueError: Si alguna observación no ocupa exactamente una celda
+                (por ejemplo, dos filas de la misma región en la misma
+                composición)
+        """
+        regions = pd.Index(np.unique(df['Region'].astype(str)))
+        slots = composite_slots(df['Date'])
+        grid = composite_calendar(slots.min(), slots.max())
+        rows, columns = composite_cells(df, regions, grid)
+
+        # Cada observación en exactamente una celda
+        cells = rows.astype(np.int64) * len(grid) + columns
+        if (rows < 0).any() or (columns < 0).any() or len(np.unique(cells)) != len(cells):
+            raise ValueError("Cada observación debe ocupar exactamente una celda del panel "
+                             "(hay filas repetidas por región y composición)")
+
+        # Solo las composiciones despejadas aportan valores
+        clear = ~df['Cloudy'].to_numpy(dtype=bool) if 'Cloudy' in df.columns else np.ones(len(df), dtype=bool)
+        rows, columns = rows[clear], columns[clear]
+
+        values = np.full((len(regions), len(grid)), np.nan, dtype=np.float64)
+        values[rows, columns] = df[target_column].to_numpy(dtype=np.float64)[clear]
+
+        # Interpolación lineal de las composiciones faltantes, todas las
+        # regiones a la vez (sin extrapolar fuera del rango de cada región)
+        values = pd.DataFrame(values.T).interpolate(method='linear', limit_area='inside').to_numpy().T
+
+        # Enmascarar fuera del rango observado de cada región
+        first = np.full(len(regions), len(grid))
+        last = np.full(len(regions), -1)
+        np.minimum.at(first, rows, columns)
+        np.maximum.at(last, rows, columns)
+        positions = np.arange(len(grid))
+        outside = (positions[None, :] < first[:, None]) | (positions[None, :] > last[:, None])
+        values = np.where(outside, np.nan, values)
+
+        return cls(np.ascontiguousarray(values, dtype=dtype), grid, regions, target_column, COMPOSITE_FREQ)
+
+    @classmethod
+    def load_or_build(cls, data_file="data/processed/processed_ndvi_data.csv", target_column='NDVI', mmap_mode='r'):
+        """
+        Abre el panel guardado si corresponde al CSV procesado actual; si no,
+        lo construye y lo guarda
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+            target_column (str): Columna del panel
+            mmap_mode (str): Modo de memmap al abrir el .npy
+
+        Returns:
+            NDVIPanel: Panel listo para usar
+        """
+        path = panel_path_for(data_file, target_column)
+        fingerprint = source_fingerprint(data_file)
+
+        if path.with_suffix('.npy').exists() and path.with_suffix('.json').exists():
+            panel = cls.load(path, mmap_mode=mmap_mode)
+            if panel.fingerprint == fingerprint and panel.freq == COMPOSITE_FREQ:
+                return panel
+
+        panel = cls.from_frame(load_processed_data(data_file), target_column)
+        panel.fingerprint = fingerprint
+        panel.save(path)
+        return panel
+
+    def save(self, path):
+        """
+        Guarda el panel como <ruta>.npy (valores) y <ruta>.json (ejes)
+
+        Args:
+            path (str): Ruta base sin extensión
+        """
+        path = Path(path)
+        np.save(path.with_suffix('.npy'), np.ascontiguousarray(self.values))
+
+        meta = {
+            'dates': [str(date.date()) for date in self.dates],
+            'freq': self.freq,
+            'regions': [str(region) for region in self.regions],
+            'target_column': self.target_column,
+            'fingerprint': self.fingerprint
+        }
+        with open(path.with_suffix('.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        return path
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        Abre un panel guardado (por defecto como memmap de solo lectura)
+
+        Args:
+            path (str): Ruta base sin extensión
+            mmap_mode (str): Modo de np.load (None para cargar en memoria)
+
+        Returns:
+            NDVIPanel: Panel cargado
+        """
+        path = Path(path)
+        with open(path.with_suffix('.json')) as f:
+            meta = json.load(f)
+
+        values = np.load(path.with_suffix('.npy'), mmap_mode=mmap_mode)
+        if 'dates' in meta:
+            dates = pd.DatetimeIndex(pd.to_datetime(meta['dates']))
+        else:
+            # Paneles anteriores con malla regular (load_or_build los reconstruye)
+            dates = pd.date_range(start=meta['start'], periods=meta['periods'], freq=meta['freq'])
+
+        return cls(values, dates, meta['regions'], meta['target_column'], meta['freq'], meta.get('fingerprint'))
+
+    def region_position(self, region):
+        """
+        Fila del panel correspondiente a una región
+        """
+        return self.regions.get_loc(region)
+
+    def row(self, region):
+        """
+        Vista (sin copia) de los valores de una región
+        """
+        return self.values[self.region_position(region)]
+
+    def series(self, region, dropna=True):
+        """
+        Serie temporal de una región sobre el índice compartido
+
+        Args:
+            region (str): Nombre de la región
+            dropna (bool): Si recortar los extremos fuera del rango observado
+
+        Returns:
+            pd.Series: Serie con índice de fecha (vista del panel si no se recorta)
+        """
+        values = self.row(region)
+        series = pd.Series(values, index=self.dates, name=self.target_column, copy=False)
+
+        if dropna:
+            valid = np.flatnonzero(~np.isnan(values))
+            if len(valid) == 0:
+                return series.iloc[:0]
+            series = series.iloc[valid[0]:valid[-1] + 1]
+
+        return series
+
+    def aligned_groups(self):
+        """
+        Agrupa las filas que tienen el mismo rango observado (con los datos
+        actuales hay un solo grupo)
+
+        Returns:
+            list: Tuplas (posiciones de las filas, slice de columnas)
+        """
+        return aligned_groups(self.values)
+
+    def group_values(self):
+        """
+        Valores de cada grupo alineado listos para los modelos vectorizados
+
+        Returns:
+            list: Tuplas (posiciones de las filas, valores float64
+                series × períodos, fechas)
+        """
+        return [(positions, np.asarray(self.values[positions, columns], dtype=np.float64), self.dates[columns])
+                for positions, columns in self.aligned_groups()]
+
+    def __len__(self):
+        return len(self.regions)
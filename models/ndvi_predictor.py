@@ -1,25 +1,93 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_cache import load_processed_data
+from ndvi_panel import composite_dates, row_metrics
+from series_provider import RegionSeriesProvider
+from interval_engine import DEFAULT_INTERVAL_LEVEL, DEFAULT_QUANTILES, add_prediction_intervals, calibration_residuals
+
+def fit_linear_trend(values):
+    """
+    Ajusta una recta por serie con un solo polyfit sobre una y bidimensional
+    (un único sistema de mínimos cuadrados)
+    
+    Args:
+        values (np.ndarray): Series (series × períodos)
+        
+    Returns:
+        np.ndarray: Coeficientes (2, series): pendiente y ordenada
+    """
+    return np.polyfit(np.arange(values.shape[1]), values.T, 1)
+
+def linear_trend_values(coeffs, positions):
+    """
+    Valores de las rectas ajustadas en las posiciones indicadas
+    
+    Args:
+        coeffs (np.ndarray): Resultado de fit_linear_trend
+        positions (np.ndarray): Posiciones (índices de período)
+        
+    Returns:
+        np.ndarray: Valores (series × posiciones)
+    """
+    return np.outer(coeffs[0], positions) + coeffs[1][:, None]
+
+def fit_monthly_pattern(values, dates):
+    """
+    Promedio de cada mes por serie: (series × períodos) @ (períodos × 12)
+    
+    Args:
+        values (np.ndarray): Series (series × períodos)
+        dates (pd.DatetimeIndex): Fechas de los períodos
+        
+    Returns:
+        tuple: (patrón (series × 12, NaN en meses sin datos), conteo por mes)
+    """
+    months = dates.month.to_numpy() - 1
+    indicator = np.zeros((len(dates), 12))
+    indicator[np.arange(len(dates)), months] = 1.0
+    counts = indicator.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pattern = (values.astype(np.float64) @ indicator) / counts
+    return pattern.astype(values.dtype), counts
+
+def monthly_pattern_values(pattern, dates):
+    """
+    Valores del patrón mensual en las fechas indicadas
+    """
+    return pattern[:, dates.month.to_numpy() - 1]
+
 class NDVIPredictor:
     """
     Clase para análisis temporal y predicción de datos NDVI
     """
     
-    def __init__(self, data_file="data/processed/processed_ndvi_data.csv"):
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", interval_level=DEFAULT_INTERVAL_LEVEL,
+                 quantiles=DEFAULT_QUANTILES, interval_method='conformal', calibration_errors=None):
         """
         Inicializa el predictor con los datos procesados
         
         Args:
             data_file (str): Archivo CSV con datos procesados
+            interval_level (float): Cobertura de Lower_Bound–Upper_Bound
+            quantiles (tuple): Cuantiles intermedios adicionales (columnas Q<porcentaje>)
+            interval_method (str): 'conformal' o 'bootstrap' (ver interval_engine)
+            calibration_errors (pd.DataFrame | str): Errores del backtest (o ruta
+                del CSV exportado) con los que se calibran los intervalos; None =
+                errores de la validación 80/20
         """
         self.data_file = data_file
         self.data = None
+        self.panel = None
+        self.series_provider = RegionSeriesProvider(data_file)
         self.models = {}
         self.predictions = {}
+        self.interval_level = interval_level
+        self.quantiles = quantiles
+        self.interval_method = interval_method
+        self.calibration_errors = calibration_errors
         
     def load_data(self):
         """
@@ -28,13 +96,14 @@ class NDVIPredictor:
         print("📊 Cargando datos procesados...")
         
         try:
-            self.data = pd.read_csv(self.data_file)
-            self.data['Date'] = pd.to_datetime(self.data['Date'])
+            self.data = load_processed_data(self.data_file)
             self.data = self.data.sort_values(['Region', 'Date'])
+            self.panel = self.series_provider.panel()
             
             print(f"✓ Datos cargados: {len(self.data)} registros")
             print(f"✓ Período: {self.data['Date'].min()} a {self.data['Date'].max()}")
             print(f"✓ Regiones: {sorted(self.data['Region'].unique())}")
+            print(f"✓ Panel: {len(self.panel)} regiones × {len(self.panel.dates)} composiciones")
             
             return self.data
             
@@ -100,23 +169,10 @@ class NDVIPredictor:
             target_column (str): Columna objetivo para predicción
             
         Returns:
-            pd.Series: Serie temporal con índice de fecha
+            pd.Series: Serie temporal con índice de fecha (una composición
+                de 16 días por período)
         """
-        region_data = self.data[self.data['Region'] == region].copy()
-        region_data = region_data.sort_values('Date')
-        
-        # Crear serie temporal con índice de fecha
-        ts_data = region_data.set_index('Date')[target_column]
-        
-        # Reindexar para tener fechas consecutivas (llenar gaps con interpolación)
-        date_range = pd.date_range(start=ts_data.index.min(), 
-                                 end=ts_data.index.max(), 
-                                 freq='16D')  # Cada 16 días
-        
-        ts_data = ts_data.reindex(date_range)
-        ts_data = ts_data.interpolate(method='linear')
-        
-        return ts_data
+        return self.series_provider.series(region, target_column)
     
     def calculate_forecast_metrics(self, actual, predicted):
         """
@@ -129,77 +185,166 @@ class NDVIPredictor:
         Returns:
             dict: Diccionario con métricas
         """
-        mae = np.mean(np.abs(actual - predicted))
-        mse = np.mean((actual - predicted) ** 2)
-        rmse = np.sqrt(mse)
-        mape = np.mean(np.abs((actual - predicted) / actual)) * 100
-        
-        return {
-            'MAE': mae,
-            'MSE': mse,
-            'RMSE': rmse,
-            'MAPE': mape
-        }
+        return row_metrics(np.atleast_2d(actual), np.atleast_2d(predicted))[0]
     
-    def simple_linear_trend_prediction(self, region, periods=12):
+    def _series_panels(self, regions, target_column='NDVI'):
         """
-        Predicción simple usando tendencia lineal
+        Agrupa las series de las regiones en matrices (regiones × períodos)
+        
+        Las matrices salen directamente de los grupos alineados del panel
+        (filas con el mismo rango observado), sin reconstruir cada serie.
         
         Args:
-            region (str): Nombre de la región
-            periods (int): Número de períodos a predecir
+            regions (list): Regiones a incluir
+            target_column (str): Columna objetivo
             
         Returns:
-            dict: Predicciones y métricas
+            list: Tuplas (regiones, índice de fechas, matriz de valores)
         """
-        print(f"\n📊 Predicción lineal para {region}...")
+        panel = self.series_provider.panel(target_column)
+        wanted = {panel.region_position(region) for region in regions}
         
-        ts_data = self.prepare_time_series_data(region)
+        panels = []
+        for positions, values, dates in panel.group_values():
+            rows = [row for row, position in enumerate(positions) if position in wanted]
+            if rows:
+                panels.append((list(panel.regions[positions[rows]]), dates, values[rows]))
         
-        # Dividir en entrenamiento y prueba
-        train_size = int(len(ts_data) * 0.8)
-        train_data = ts_data[:train_size]
-        test_data = ts_data[train_size:]
+        return panels
+    
+    def _long_predictions(self, regions, future_dates, future_predictions):
+        """
+        Tabla larga (Date, Predicted_NDVI, Region) de una matriz de predicciones
+        """
+        return pd.DataFrame({
+            'Date': np.tile(future_dates, len(regions)),
+            'Predicted_NDVI': future_predictions.ravel(),
+            'Region': np.repeat(regions, len(future_dates))
+        })
+    
+    def _combine_panels(self, regions, frames, metrics):
+        """
+        Une las predicciones de todas las matrices respetando el orden de regiones
+        """
+        predictions = pd.concat(frames, ignore_index=True)
+        order = {region: i for i, region in enumerate(regions)}
+        predictions = predictions.sort_values('Region', key=lambda column: column.map(order), kind='stable')
+        
+        return predictions.reset_index(drop=True), {region: metrics[region] for region in regions}
+    
+    def batch_linear_trend(self, regions=None, periods=12):
+        """
+        Predicción por tendencia lineal de varias regiones a la vez
         
-        # Ajustar modelo lineal
-        x = np.arange(len(train_data))
-        y = train_data.values
+        Todas las rectas de una matriz se ajustan con un solo polyfit sobre
+        una y bidimensional (un único sistema de mínimos cuadrados).
         
-        # Regresión lineal simple
-        coeffs = np.polyfit(x, y, 1)
-        trend_line = np.poly1d(coeffs)
+        Args:
+            regions (list): Regiones a predecir (None = todas)
+            periods (int): Número de períodos a predecir
+            
+        Returns:
+            dict: Predicciones (formato largo), métricas, errores de validación
+                y coeficientes por región
+        """
+        if regions is None:
+            regions = list(self.data['Region'].unique())
+        
+        frames = []
+        metrics = {}
+        residuals = {}
+        coeffs_by_region = {}
+        
+        for group_regions, index, values in self._series_panels(regions):
+            # Dividir en entrenamiento y prueba
+            train_size = int(values.shape[1] * 0.8)
+            train_values = values[:, :train_size]
+            
+            # Una recta por fila: coeffs tiene forma (2, regiones)
+            coeffs = fit_linear_trend(train_values)
+            
+            train_predictions = linear_trend_values(coeffs, np.arange(train_size))
+            test_errors = values[:, train_size:] - linear_trend_values(coeffs, np.arange(train_size, values.shape[1]))
+            future_predictions = linear_trend_values(coeffs, np.arange(train_size, train_size + periods))
+            
+            future_dates = composite_dates(index[-1], periods)
+            frames.append(self._long_predictions(group_regions, future_dates, future_predictions))
+            
+            for region, region_metrics, region_coeffs, region_errors in zip(group_regions,
+                                                                           row_metrics(train_values, train_predictions),
+                                                                           coeffs.T, test_errors):
+                metrics[region] = region_metrics
+                residuals[region] = region_errors
+                coeffs_by_region[region] = region_coeffs
         
-        # Predicciones
-        train_predictions = trend_line(x)
+        predictions, metrics = self._combine_panels(regions, frames, metrics)
         
-        # Predicciones futuras
-        future_x = np.arange(len(train_data), len(train_data) + periods)
-        future_predictions = trend_line(future_x)
+        return {
+            'predictions': predictions,
+            'metrics': metrics,
+            'residuals': residuals,
+            'trend_coeffs': coeffs_by_region
+        }
+    
+    def batch_seasonal_naive(self, regions=None, periods=12):
+        """
+        Predicción naive estacional (promedio mensual) de varias regiones a la vez
         
-        # Calcular métricas
-        metrics = self.calculate_forecast_metrics(train_data.values, train_predictions)
+        Los promedios por mes se obtienen con una matriz indicadora de meses
+        y los pronósticos se leen con un arreglo de índices de mes, sin
+        recorrer fechas en Python.
         
-        # Crear fechas futuras
-        last_date = ts_data.index[-1]
-        future_dates = pd.date_range(start=last_date + timedelta(days=16), 
-                                   periods=periods, 
-                                   freq='16D')
+        Args:
+            regions (list): Regiones a predecir (None = todas)
+            periods (int): Número de períodos a predecir
+            
+        Returns:
+            dict: Predicciones (formato largo), métricas, errores de validación
+                y patrón mensual por región
+        """
+        if regions is None:
+            regions = list(self.data['Region'].unique())
+        
+        frames = []
+        metrics = {}
+        residuals = {}
+        patterns = {}
+        
+        for group_regions, index, values in self._series_panels(regions):
+            # Dividir en entrenamiento y prueba
+            train_size = int(values.shape[1] * 0.8)
+            train_values = values[:, :train_size]
+            
+            # Promedio por mes con una matriz indicadora de meses
+            seasonal_pattern, counts = fit_monthly_pattern(train_values, index[:train_size])
+            
+            train_predictions = monthly_pattern_values(seasonal_pattern, index[:train_size])
+            test_errors = values[:, train_size:] - monthly_pattern_values(seasonal_pattern, index[train_size:])
+            
+            future_dates = composite_dates(index[-1], periods)
+            future_predictions = monthly_pattern_values(seasonal_pattern, future_dates)
+            frames.append(self._long_predictions(group_regions, future_dates, future_predictions))
+            
+            months = np.flatnonzero(counts > 0)
+            for row, (region, region_metrics) in enumerate(zip(group_regions,
+                                                             row_metrics(train_values, train_predictions))):
+                metrics[region] = region_metrics
+                residuals[region] = test_errors[row]
+                patterns[region] = pd.Series(seasonal_pattern[row, months], index=pd.Index(months + 1, name='Month'),
+                                             name='NDVI')
         
-        predictions_df = pd.DataFrame({
-            'Date': future_dates,
-            'Predicted_NDVI': future_predictions,
-            'Region': region
-        })
+        predictions, metrics = self._combine_panels(regions, frames, metrics)
         
         return {
-            'predictions': predictions_df,
+            'predictions': predictions,
             'metrics': metrics,
-            'trend_coeffs': coeffs
+            'residuals': residuals,
+            'seasonal_pattern': patterns
         }
     
-    def seasonal_naive_prediction(self, region, periods=12):
+    def simple_linear_trend_prediction(self, region, periods=12):
         """
-        Predicción usando método naive estacional
+        Predicción simple usando tendencia lineal
         
         Args:
             region (str): Nombre de la región
@@ -208,51 +353,35 @@ class NDVIPredictor:
         Returns:
             dict: Predicciones y métricas
         """
-        print(f"\n🔄 Predicción estacional naive para {region}...")
-        
-        ts_data = self.prepare_time_series_data(region)
-        
-        # Dividir en entrenamiento y prueba
-        train_size = int(len(ts_data) * 0.8)
-        train_data = ts_data[:train_size]
-        test_data = ts_data[train_size:]
-        
-        # Calcular patrón estacional (promedio por mes)
-        train_df = pd.DataFrame({'Date': train_data.index, 'NDVI': train_data.values})
-        train_df['Month'] = train_df['Date'].dt.month
-        
-        seasonal_pattern = train_df.groupby('Month')['NDVI'].mean()
-        
-        # Predicciones usando patrón estacional
-        train_predictions = []
-        for date in train_data.index:
-            month = date.month
-            train_predictions.append(seasonal_pattern[month])
+        print(f"\n📊 Predicción lineal para {region}...")
         
-        # Predicciones futuras
-        last_date = ts_data.index[-1]
-        future_dates = pd.date_range(start=last_date + timedelta(days=16), 
-                                   periods=periods, 
-                                   freq='16D')
+        result = self.batch_linear_trend([region], periods)
         
-        future_predictions = []
-        for date in future_dates:
-            month = date.month
-            future_predictions.append(seasonal_pattern[month])
+        return {
+            'predictions': result['predictions'],
+            'metrics': result['metrics'][region],
+            'trend_coeffs': result['trend_coeffs'][region]
+        }
+    
+    def seasonal_naive_prediction(self, region, periods=12):
+        """
+        Predicción usando método naive estacional
         
-        # Calcular métricas
-        metrics = self.calculate_forecast_metrics(train_data.values, train_predictions)
+        Args:
+            region (str): Nombre de la región
+            periods (int): Número de períodos a predecir
+            
+        Returns:
+            dict: Predicciones y métricas
+        """
+        print(f"\n🔄 Predicción estacional naive para {region}...")
         
-        predictions_df = pd.DataFrame({
-            'Date': future_dates,
-            'Predicted_NDVI': future_predictions,
-            'Region': region
-        })
+        result = self.batch_seasonal_naive([region], periods)
         
         return {
-            'predictions': predictions_df,
-            'metrics': metrics,
-            'seasonal_pattern': seasonal_pattern
+            'predictions': result['predictions'],
+            'metrics': result['metrics'][region],
+            'seasonal_pattern': result['seasonal_pattern'][region]
         }
     
     def predict_all_regions(self, method='linear', periods=12):
@@ -264,35 +393,33 @@ class NDVIPredictor:
             periods (int): Número de períodos a predecir
             
         Returns:
-            dict: Predicciones para todas las regiones
+            dict: Predicciones (con intervalos) para todas las regiones
         """
         print(f"\n🎯 Prediciendo NDVI para todas las regiones usando método {method}...")
         
-        all_predictions = []
-        all_metrics = {}
-        
-        for region in self.data['Region'].unique():
-            print(f"\nProcesando región: {region}")
-            
-            if method == 'linear':
-                result = self.simple_linear_trend_prediction(region, periods)
-            elif method == 'seasonal':
-                result = self.seasonal_naive_prediction(region, periods)
-            else:
-                raise ValueError(f"Método {method} no soportado")
-            
-            all_predictions.append(result['predictions'])
-            all_metrics[region] = result['metrics']
-            
-            print(f"  ✓ RMSE: {result['metrics']['RMSE']:.4f}")
-            print(f"  ✓ MAPE: {result['metrics']['MAPE']:.2f}%")
-        
-        # Combinar todas las predicciones
-        combined_predictions = pd.concat(all_predictions, ignore_index=True)
+        # Una sola llamada vectorizada para todas las regiones
+        if method == 'linear':
+            result = self.batch_linear_trend(periods=periods)
+        elif method == 'seasonal':
+            result = self.batch_seasonal_naive(periods=periods)
+        else:
+            raise ValueError(f"Método {method} no soportado")
+        
+        for region, metrics in result['metrics'].items():
+            print(f"\nRegión: {region}")
+            print(f"  ✓ RMSE: {metrics['RMSE']:.4f}")
+            print(f"  ✓ MAPE: {metrics['MAPE']:.2f}%")
+        
+        # Intervalos a partir de los errores del backtest o de validación
+        # (sin reajustar); el backtest usa el mismo nombre de método
+        predictions = add_prediction_intervals(
+            result['predictions'], calibration_residuals(result['residuals'], self.calibration_errors, method),
+            self.interval_level, self.quantiles, self.interval_method
+        )
         
         return {
-            'predictions': combined_predictions,
-            'metrics': all_metrics
+            'predictions': predictions,
+            'metrics': result['metrics']
         }
     
     def export_predictions(self, predictions, output_file="data/predictions/ndvi_predictions.csv"):
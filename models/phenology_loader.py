@@ -0,0 +1,285 @@
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from appeears_reader import read_appeears_csv
+
+# Fechas fenológicas de MCD12Q2 en orden cronológico dentro de un ciclo
+PHENOLOGY_METRICS = ['Greenup', 'Maturity', 'Peak', 'Senescence', 'Dormancy']
+
+# Posición (bit inicial) de cada métrica en QA_Detailed; 2 bits por métrica
+QA_DETAILED_SHIFTS = {
+    'Greenup': 0,
+    'MidGreenup': 2,
+    'Maturity': 4,
+    'Peak': 6,
+    'Senescence': 8,
+    'MidGreendown': 10,
+    'Dormancy': 12
+}
+
+# Valor de relleno de MCD12Q2 (ciclo no detectado)
+PHENOLOGY_FILL = 32767
+
+# Duración media del año para promediar días del año sobre el círculo
+DAYS_PER_YEAR = 365.25
+
+# Calidad para valores de relleno al decodificar QA
+QA_MISSING = 255
+
+
+def decode_phenology_days(days):
+    """
+    Convierte días desde 1970-01-01 a datetime64 y día del año
+
+    Args:
+        days (np.ndarray): Días desde 1970-01-01 (32767 o negativo = relleno)
+
+    Returns:
+        tuple: (fechas datetime64[D] con NaT, día del año float32 con NaN)
+    """
+    days = np.asarray(days).astype(np.int64)
+    missing = (days == PHENOLOGY_FILL) | (days < 0)
+
+    dates = np.where(missing, np.iinfo(np.int64).min, days).view('datetime64[D]')
+    day_of_year = (dates - dates.astype('datetime64[Y]')).astype(np.float32) + 1
+    day_of_year[missing] = np.nan
+
+    return dates, day_of_year
+
+
+def circular_mean_doy(day_of_year, groups):
+    """
+    Día del año medio por grupo, promediado sobre el círculo anual
+
+    Cada día del año se convierte en un ángulo y se promedian sus senos y
+    cosenos, de modo que fechas a ambos lados del 1 de enero (por ejemplo,
+    una dormancia en el día 346 y otra en el 17) promedian cerca del cambio
+    de año (día 364) y no a mitad de año (181.5).
+
+    Args:
+        day_of_year (pd.DataFrame): Días del año (NaN = sin ciclo)
+        groups (pd.Series): Grupo de cada fila
+
+    Returns:
+        pd.DataFrame: Día del año medio (1 a 366) por grupo y columna, NaN si
+            el grupo no tiene valores
+    """
+    angles = 2 * np.pi * (day_of_year.astype(float) - 1) / DAYS_PER_YEAR
+    sines = np.sin(angles).groupby(groups, observed=True).mean()
+    cosines = np.cos(angles).groupby(groups, observed=True).mean()
+
+    mean_angle = np.arctan2(sines, cosines) % (2 * np.pi)
+    return mean_angle * DAYS_PER_YEAR / (2 * np.pi) + 1
+
+
+def decode_qa_detailed(qa_detailed):
+    """
+    Extrae la calidad de 2 bits de cada métrica desde QA_Detailed
+
+    Args:
+        qa_detailed (np.ndarray): Valores enteros de QA_Detailed
+
+    Returns:
+        dict: Métrica -> calidad uint8 (0 mejor ... 3 pobre, 255 relleno)
+    """
+    qa = np.asarray(qa_detailed).astype(np.uint16)
+    missing = qa == PHENOLOGY_FILL
+
+    flags = {}
+    for metric, shift in QA_DETAILED_SHIFTS.items():
+        values = ((qa >> shift) & 0b11).astype(np.uint8)
+        flags[metric] = np.where(missing, QA_MISSING, values).astype(np.uint8)
+
+    return flags
+
+
+def decode_qa_overall(qa_overall):
+    """
+    Calidad general del ciclo (2 bits inferiores de QA_Overall)
+
+    Args:
+        qa_overall (np.ndarray): Valores enteros de QA_Overall
+
+    Returns:
+        np.ndarray: Calidad uint8 (0 mejor ... 3 pobre, 255 relleno)
+    """
+    qa = np.asarray(qa_overall).astype(np.uint16)
+    return np.where(qa == PHENOLOGY_FILL, QA_MISSING, qa & 0b11).astype(np.uint8)
+
+
+class PhenologyDataLoader:
+    """
+    Clase para cargar y preparar datos de fenología MCD12Q2 de las regiones de Monterrey
+    """
+
+    def __init__(self, data_folder="../extractors/datasets/MCD12Q2"):
+        """
+        Inicializa el cargador de fenología
+
+        Args:
+            data_folder (str): Carpeta con las subcarpetas mty-<zona> de AppEEARS
+        """
+        self.data_folder = Path(data_folder)
+        self.data = {}
+        self.phenology_data = None
+
+    def load_all_csv_files(self, sources=None):
+        """
+        Carga los resultados MCD12Q2 de todas las regiones
+
+        Args:
+            sources (list): Pares (región, archivo) a leer en lugar de buscar
+                en la carpeta de datos (ver load_from_catalog)
+        """
+        print("Cargando archivos de fenología...")
+
+        if sources is None:
+            # monterrey-<Región>-phenology-2005-2024-MCD12Q2-061-results.csv
+            sources = [(file_path.name.split('-')[1], file_path)
+                       for file_path in sorted(self.data_folder.glob("*/*-results.csv"))]
+
+        if not sources:
+            raise FileNotFoundError(f"No se encontraron resultados MCD12Q2 en {self.data_folder}")
+
+        for region_name, file_path in sources:
+            try:
+                df = read_appeears_csv(file_path, product='MCD12Q2', region=region_name)
+                self.data[region_name] = df
+                print(f"  ✓ {region_name}: {len(df)} años")
+
+            except Exception as e:
+                print(f"  ✗ Error cargando {file_path.name}: {e}")
+
+        print(f"\nTotal de regiones cargadas: {len(self.data)}")
+        return self.data
+
+    def load_from_catalog(self, catalog, regions=None, start=None, end=None):
+        """
+        Carga los resultados MCD12Q2 indicados por el catálogo de datasets
+
+        Args:
+            catalog (DatasetCatalog): Catálogo ya construido
+            regions (list): Regiones a cargar (por defecto todas)
+            start (str): Inicio del periodo consultado
+            end (str): Fin del periodo consultado
+        """
+        sources = []
+        for region in (regions or [None]):
+            sources.extend(catalog.results_files(region=region, product='MCD12Q2', start=start, end=end))
+
+        return self.load_all_csv_files(sources)
+
+    def prepare_data(self):
+        """
+        Construye una tabla compacta región/año/ciclo con fechas decodificadas
+
+        Las conversiones se hacen vectorizadas sobre todas las regiones: días
+        desde 1970 a datetime64 y día del año, enmascarado del valor de relleno
+        y desempaquetado de los bits de QA_Overall/QA_Detailed. Los ciclos sin
+        ninguna fecha detectada se descartan.
+
+        Returns:
+            pd.DataFrame: Una fila por región, año y ciclo (0 o 1)
+        """
+        if not self.data:
+            raise ValueError("Primero debe cargar los datos")
+
+        print("\nPreparando datos de fenología...")
+
+        raw = pd.concat(self.data.values(), ignore_index=True)
+        cycles = []
+
+        for cycle in [0, 1]:
+            table = pd.DataFrame({
+                'Region': raw['Region'].astype(str),
+                'Year': raw['Date'].dt.year.astype(np.int16),
+                'Cycle': np.full(len(raw), cycle, dtype=np.int8),
+                'Latitude': raw['Latitude'],
+                'Longitude': raw['Longitude']
+            })
+
+            detected = np.zeros(len(raw), dtype=bool)
+            qa_detailed = decode_qa_detailed(raw[f'MCD12Q2_061_QA_Detailed_{cycle}'].to_numpy())
+
+            for metric in PHENOLOGY_METRICS:
+                dates, day_of_year = decode_phenology_days(raw[f'MCD12Q2_061_{metric}_{cycle}'].to_numpy())
+                table[metric] = dates.astype('datetime64[s]')
+                table[f'{metric}_DOY'] = day_of_year
+                table[f'{metric}_QA'] = qa_detailed[metric]
+                detected |= ~np.isnan(day_of_year)
+
+            table['QA_Overall'] = decode_qa_overall(raw[f'MCD12Q2_061_QA_Overall_{cycle}'].to_numpy())
+            cycles.append(table[detected])
+
+        self.phenology_data = pd.concat(cycles, ignore_index=True)
+        self.phenology_data['Region'] = self.phenology_data['Region'].astype('category')
+        self.phenology_data = self.phenology_data.sort_values(['Region', 'Year', 'Cycle']).reset_index(drop=True)
+
+        print(f"✓ Ciclos detectados: {len(self.phenology_data)}")
+        if len(self.phenology_data):
+            print(f"✓ Años: {self.phenology_data['Year'].min()} a {self.phenology_data['Year'].max()}")
+
+        return self.phenology_data
+
+    def get_bloom_summary(self):
+        """
+        Resumen por región del calendario fenológico (día del año promedio)
+
+        El promedio es circular (ver circular_mean_doy): las métricas que
+        caen cerca del cambio de año, como la dormancia, no se promedian a
+        mitad de año.
+
+        Returns:
+            pd.DataFrame: Día del año medio de cada métrica y número de ciclos
+        """
+        if self.phenology_data is None:
+            raise ValueError("Primero debe cargar y preparar los datos")
+
+        doy_columns = [f'{metric}_DOY' for metric in PHENOLOGY_METRICS]
+        summary = circular_mean_doy(self.phenology_data[doy_columns], self.phenology_data['Region']).round(1)
+        summary['Cycles'] = self.phenology_data.groupby('Region', observed=True).size()
+
+        print("\nCalendario fenológico promedio (día del año):")
+        print(summary)
+
+        return summary
+
+    def export_processed_data(self, output_file="data/processed/phenology_data.csv"):
+        """
+        Exporta la tabla de fenología a un archivo CSV
+        """
+        if self.phenology_data is None:
+            raise ValueError("Primero debe cargar y preparar los datos")
+
+        self.phenology_data.to_csv(output_file, index=False)
+        print(f"✓ Datos de fenología exportados a: {output_file}")
+
+        return output_file
+
+
+def main():
+    """
+    Función principal para ejecutar el cargador de fenología
+    """
+    print("🌸 CARGADOR DE FENOLOGÍA MCD12Q2 - MONTERREY")
+    print("="*50)
+
+    loader = PhenologyDataLoader()
+
+    try:
+        loader.load_all_csv_files()
+        loader.prepare_data()
+        loader.get_bloom_summary()
+        loader.export_processed_data()
+
+        print("\n" + "="*50)
+        print("✅ FENOLOGÍA PROCESADA EXITOSAMENTE")
+        print("="*50)
+
+    except Exception as e:
+        print(f"❌ Error durante el procesamiento: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
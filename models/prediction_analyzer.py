@@ -4,6 +4,8 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from data_cache import load_processed_data
+
 class PredictionAnalyzer:
     """
     Clase para analizar las predicciones generadas
@@ -33,8 +35,7 @@ class PredictionAnalyzer:
             self.seasonal_predictions['Date'] = pd.to_datetime(self.seasonal_predictions['Date'])
             
             # Cargar datos históricos para comparación
-            self.historical_data = pd.read_csv("data/processed/processed_ndvi_data.csv")
-            self.historical_data['Date'] = pd.to_datetime(self.historical_data['Date'])
+            self.historical_data = load_processed_data("data/processed/processed_ndvi_data.csv")
             
             print(f"✓ Predicciones lineales: {len(self.linear_predictions)} registros")
             print(f"✓ Predicciones estacionales: {len(self.seasonal_predictions)} registros")
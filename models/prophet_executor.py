@@ -0,0 +1,216 @@
+import logging
+import time
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from job_pool import JobPool
+from ndvi_panel import composite_dates
+
+try:
+    from prophet import Prophet
+    PROPHET_AVAILABLE = True
+except ImportError:
+    PROPHET_AVAILABLE = False
+
+# Configuración común de los modelos Prophet (el modo de estacionalidad se
+# indica en cada trabajo)
+PROPHET_PARAMS = {
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,   # Deshabilitar estacionalidad semanal
+    'daily_seasonality': False,    # Deshabilitar estacionalidad diaria
+    'changepoint_prior_scale': 0.05,  # Sensibilidad a cambios de tendencia
+    'seasonality_prior_scale': 10.0,  # Sensibilidad a estacionalidad
+    'holidays_prior_scale': 10.0,     # Sensibilidad a días festivos
+    'interval_width': 0.95            # Intervalo de confianza
+}
+
+# Tipos de trabajo: validación (80 % de los datos, métricas sobre el 20 %
+# restante) y pronóstico (100 % de los datos, períodos futuros)
+SPLIT_VALIDATION = 'validation'
+SPLIT_FORECAST = 'forecast'
+
+# Modos de intervalo: 'sampling' simula la incertidumbre de tendencia y
+# ruido (uncertainty_samples trayectorias); 'analytic' no simula y usa una
+# aproximación normal con el ruido de observación ajustado
+INTERVAL_MODES = ('sampling', 'analytic')
+
+# Columnas del pronóstico que devuelve cada trabajo (como arreglos NumPy,
+# sin serializar DataFrames entre procesos)
+FORECAST_COLUMNS = ('ds', 'yhat', 'yhat_lower', 'yhat_upper')
+
+# Estados posibles de un trabajo
+JOB_OK = 'ok'
+JOB_FAILED = 'failed'
+
+
+def _init_worker():
+    """
+    Inicializa un proceso trabajador: importa Prophet (y el backend de
+    cmdstan) una sola vez y silencia sus mensajes de progreso
+    """
+    warnings.filterwarnings('ignore')
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    logging.getLogger('prophet').setLevel(logging.WARNING)
+
+
+def analytic_interval(model, forecast, interval_width=0.95):
+    """
+    Agrega yhat_lower y yhat_upper con una aproximación normal
+    
+    Usa el ruido de observación estimado por Prophet (sigma_obs, en la
+    escala original de y) y no la incertidumbre de la tendencia, por lo que
+    el intervalo no se ensancha con el horizonte.
+    
+    Args:
+        model (Prophet): Modelo ajustado
+        forecast (pd.DataFrame): Resultado de model.predict con yhat
+        interval_width (float): Cobertura del intervalo
+        
+    Returns:
+        pd.DataFrame: forecast con los límites del intervalo
+    """
+    sigma = float(np.mean(model.params['sigma_obs'])) * model.y_scale
+    half_width = NormalDist().inv_cdf(0.5 + interval_width / 2) * sigma
+    
+    forecast = forecast.copy()
+    forecast['yhat_lower'] = forecast['yhat'] - half_width
+    forecast['yhat_upper'] = forecast['yhat'] + half_width
+    return forecast
+
+
+def prophet_job(region, seasonality_mode, split, ds, y, periods=12, interval_mode='sampling',
+                uncertainty_samples=1000, return_model=False):
+    """
+    Ajusta un modelo Prophet y devuelve un resultado estructurado
+
+    Función de módulo para poder ejecutarse en un pool de procesos. Por
+    defecto no devuelve el modelo (para no serializarlo entre procesos),
+    solo los pronósticos (arreglos de FORECAST_COLUMNS) y las métricas. Los
+    períodos futuros son las composiciones de 16 días siguientes.
+
+    Args:
+        region (str): Nombre de la región
+        seasonality_mode (str): 'additive' o 'multiplicative'
+        split (str): SPLIT_VALIDATION o SPLIT_FORECAST
+        ds (np.ndarray): Fechas de la serie
+        y (np.ndarray): Valores de la serie
+        periods (int): Composiciones futuras (solo para SPLIT_FORECAST)
+        interval_mode (str): 'sampling' o 'analytic' (ver INTERVAL_MODES)
+        uncertainty_samples (int): Trayectorias simuladas en modo 'sampling'
+        return_model (bool): Si incluir el modelo ajustado en 'model'
+
+    Returns:
+        dict: region, seasonality_mode, split, status, error, metrics,
+            forecast (arreglos por columna, solo las fechas de prueba o
+            futuras) y seconds
+    """
+    result = {
+        'region': region,
+        'seasonality_mode': seasonality_mode,
+        'split': split,
+        'status': JOB_FAILED,
+        'error': None,
+        'metrics': None,
+        'forecast': None,
+        'seconds': 0.0
+    }
+    start = time.perf_counter()
+
+    try:
+        prophet_data = pd.DataFrame({'ds': ds, 'y': y})
+        analytic = interval_mode == 'analytic'
+        model = Prophet(seasonality_mode=seasonality_mode,
+                        uncertainty_samples=0 if analytic else uncertainty_samples,
+                        **PROPHET_PARAMS)
+
+        if split == SPLIT_VALIDATION:
+            # Dividir en entrenamiento y prueba
+            train_size = int(len(prophet_data) * 0.8)
+            train_data = prophet_data[:train_size]
+            test_data = prophet_data[train_size:]
+
+            model.fit(train_data)
+
+            # Predecir solo las fechas de prueba (no todo el historial)
+            forecast = model.predict(test_data[['ds']].reset_index(drop=True))
+
+            actual = test_data['y'].values
+            predicted = forecast['yhat'].values
+            mse = np.mean((actual - predicted) ** 2)
+            result['metrics'] = {
+                'MAE': np.mean(np.abs(actual - predicted)),
+                'MSE': mse,
+                'RMSE': np.sqrt(mse),
+                'MAPE': np.mean(np.abs((actual - predicted) / actual)) * 100
+            }
+        else:
+            # Ajustar modelo con todos los datos
+            model.fit(prophet_data)
+            future = pd.DataFrame({'ds': composite_dates(prophet_data['ds'].iloc[-1], periods)})
+            forecast = model.predict(future)
+
+        if analytic:
+            forecast = analytic_interval(model, forecast, PROPHET_PARAMS['interval_width'])
+
+        result['forecast'] = {column: forecast[column].to_numpy() for column in FORECAST_COLUMNS}
+        result['status'] = JOB_OK
+        if return_model:
+            result['model'] = model
+
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class ProphetFitExecutor(JobPool):
+    """
+    Ejecuta trabajos de ajuste Prophet en un pool de procesos persistente
+
+    Los procesos se crean la primera vez que se usa el pool y se reutilizan
+    entre regiones, modos y llamadas, de modo que Prophet y cmdstan se
+    importan una sola vez por proceso. Con un solo trabajador los trabajos
+    se ejecutan en el proceso actual.
+    """
+
+    def __init__(self, workers=None):
+        """
+        Inicializa el ejecutor
+
+        Args:
+            workers (int): Procesos del pool (None = número de núcleos,
+                1 = secuencial)
+        """
+        super().__init__(workers, initializer=_init_worker)
+
+    def run(self, jobs):
+        """
+        Ejecuta todos los trabajos
+
+        Args:
+            jobs (list): Diccionarios con los argumentos de prophet_job
+
+        Returns:
+            list: Resultados en el mismo orden que los trabajos
+        """
+        return self.map(prophet_job, jobs, _failed_job)
+
+
+def _failed_job(job, error):
+    """
+    Resultado de un trabajo cuyo proceso trabajador falló (no el ajuste)
+    """
+    return {
+        'region': job['region'],
+        'seasonality_mode': job['seasonality_mode'],
+        'split': job['split'],
+        'status': JOB_FAILED,
+        'error': f"{type(error).__name__}: {error}",
+        'metrics': None,
+        'forecast': None,
+        'seconds': 0.0
+    }
@@ -1,14 +1,14 @@
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-try:
-    from prophet import Prophet
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
+from data_cache import load_processed_data
+from series_provider import RegionSeriesProvider
+from prophet_executor import (ProphetFitExecutor, prophet_job, JOB_OK, PROPHET_AVAILABLE, PROPHET_PARAMS,
+                              INTERVAL_MODES, SPLIT_VALIDATION, SPLIT_FORECAST)
+from model_registry import config_hash, series_fingerprint
+
+if not PROPHET_AVAILABLE:
     print("⚠️ Prophet no disponible. Instala con: pip install prophet")
 
 class ProphetPredictor:
@@ -16,17 +16,33 @@ class ProphetPredictor:
     Clase para predicción usando modelos Prophet
     """
     
-    def __init__(self, data_file="data/processed/processed_ndvi_data.csv"):
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", workers=None,
+                 interval_mode='sampling', uncertainty_samples=1000):
         """
         Inicializa el predictor Prophet
         
         Args:
             data_file (str): Archivo CSV con datos procesados
+            workers (int): Procesos para ajustar regiones y modos en paralelo
+                (None = número de núcleos, 1 = secuencial)
+            interval_mode (str): 'sampling' (simulación de Prophet) o
+                'analytic' (aproximación normal rápida, sin simulación)
+            uncertainty_samples (int): Trayectorias simuladas en modo 'sampling'
         """
+        if interval_mode not in INTERVAL_MODES:
+            raise ValueError(f"Modo de intervalo {interval_mode} no soportado")
+        
         self.data_file = data_file
         self.data = None
+        self.panel = None
+        self.series_provider = RegionSeriesProvider(data_file)
         self.models = {}
         self.predictions = {}
+        self.fit_executor = ProphetFitExecutor(workers)
+        self.interval_mode = interval_mode
+        self.uncertainty_samples = uncertainty_samples
+        self.fit_cache = {}
+        self.cache_stats = {'hits': 0, 'misses': 0}
         
     def load_data(self):
         """
@@ -35,12 +51,13 @@ class ProphetPredictor:
         print("📊 Cargando datos para modelo Prophet...")
         
         try:
-            self.data = pd.read_csv(self.data_file)
-            self.data['Date'] = pd.to_datetime(self.data['Date'])
+            self.data = load_processed_data(self.data_file)
             self.data = self.data.sort_values(['Region', 'Date'])
+            self.panel = self.series_provider.panel()
             
             print(f"✓ Datos cargados: {len(self.data)} registros")
             print(f"✓ Período: {self.data['Date'].min()} a {self.data['Date'].max()}")
+            print(f"✓ Panel: {len(self.panel)} regiones × {len(self.panel.dates)} composiciones")
             
             return self.data
             
@@ -58,40 +75,87 @@ class ProphetPredictor:
         Returns:
             pd.DataFrame: Datos en formato Prophet (ds, y)
         """
-        region_data = self.data[self.data['Region'] == region].copy()
-        region_data = region_data.sort_values('Date')
+        # Fila del panel (una composición de 16 días por período)
+        ts_data = self.series_provider.series(region)
         
         # Crear DataFrame en formato Prophet
         prophet_data = pd.DataFrame({
-            'ds': region_data['Date'],  # Prophet requiere columna 'ds' para fechas
-            'y': region_data['NDVI']    # Prophet requiere columna 'y' para valores
+            'ds': ts_data.index,          # Prophet requiere columna 'ds' para fechas
+            'y': ts_data.to_numpy()       # Prophet requiere columna 'y' para valores
         })
         
-        # Reindexar para fechas consecutivas
-        date_range = pd.date_range(start=prophet_data['ds'].min(), 
-                                 end=prophet_data['ds'].max(), 
-                                 freq='16D')
+        return prophet_data
+    
+    def _job(self, region, seasonality_mode, split, periods=12):
+        """
+        Argumentos de prophet_job para una región, modo y tipo de ajuste
+        """
+        prophet_data = self.prepare_prophet_data(region)
         
-        prophet_data = prophet_data.set_index('ds').reindex(date_range)
-        prophet_data = prophet_data.interpolate(method='linear')
-        prophet_data = prophet_data.reset_index()
-        prophet_data.columns = ['ds', 'y']
+        return {
+            'region': region,
+            'seasonality_mode': seasonality_mode,
+            'split': split,
+            'ds': prophet_data['ds'].to_numpy(),
+            'y': prophet_data['y'].to_numpy(),
+            'periods': periods,
+            'interval_mode': self.interval_mode,
+            'uncertainty_samples': self.uncertainty_samples
+        }
+    
+    def _cache_key(self, job):
+        """
+        Clave del caché de ajustes: región, modo, tipo de ajuste, ventana de
+        entrenamiento (fechas y huella de los valores), horizonte predicho e
+        hiperparámetros (incluida la configuración de intervalos)
+        """
+        ds = job['ds']
+        if job['split'] == SPLIT_VALIDATION:
+            train_size = int(len(ds) * 0.8)
+            horizon = len(ds) - train_size
+        else:
+            train_size = len(ds)
+            horizon = job['periods']
         
-        return prophet_data
+        train_window = pd.Series(job['y'][:train_size], index=ds[:train_size])
+        
+        return (job['region'], job['seasonality_mode'], job['split'],
+                str(ds[0]), str(ds[train_size - 1]), series_fingerprint(train_window), horizon,
+                config_hash({**PROPHET_PARAMS,
+                             'interval_mode': job['interval_mode'],
+                             'uncertainty_samples': job['uncertainty_samples']}))
     
-    def fit_prophet_model(self, region, seasonality_mode='additive'):
+    def _run_cached(self, jobs):
         """
-        Ajusta modelo Prophet para una región
+        Ejecuta los trabajos que no están en el caché y guarda los exitosos
         
         Args:
-            region (str): Nombre de la región
-            seasonality_mode (str): Modo de estacionalidad ('additive' o 'multiplicative')
+            jobs (list): Argumentos de prophet_job
             
         Returns:
-            dict: Modelo ajustado y métricas
+            list: Resultados en el mismo orden que los trabajos
         """
-        print(f"\n📊 Ajustando modelo Prophet para {region}...")
+        keys = [self._cache_key(job) for job in jobs]
+        
+        pending = {}
+        for key, job in zip(keys, jobs):
+            if key not in self.fit_cache and key not in pending:
+                pending[key] = job
+        
+        self.cache_stats['misses'] += len(pending)
+        self.cache_stats['hits'] += len(jobs) - len(pending)
+        
+        fresh = dict(zip(pending, self.fit_executor.run(list(pending.values()))))
+        for key, result in fresh.items():
+            if result['status'] == JOB_OK:
+                self.fit_cache[key] = result
         
+        return [self.fit_cache.get(key) or fresh[key] for key in keys]
+    
+    def _validation_result(self, region, result):
+        """
+        Resultado de fit_prophet_model a partir de un trabajo de validación
+        """
         prophet_data = self.prepare_prophet_data(region)
         
         # Dividir en entrenamiento y prueba
@@ -99,58 +163,68 @@ class ProphetPredictor:
         train_data = prophet_data[:train_size]
         test_data = prophet_data[train_size:]
         
-        # Configurar modelo Prophet
-        model = Prophet(
-            seasonality_mode=seasonality_mode,
-            yearly_seasonality=True,
-            weekly_seasonality=False,  # Deshabilitar estacionalidad semanal
-            daily_seasonality=False,   # Deshabilitar estacionalidad diaria
-            changepoint_prior_scale=0.05,  # Sensibilidad a cambios de tendencia
-            seasonality_prior_scale=10.0,   # Sensibilidad a estacionalidad
-            holidays_prior_scale=10.0,      # Sensibilidad a días festivos
-            interval_width=0.95             # Intervalo de confianza
-        )
-        
-        # Ajustar modelo
-        try:
-            model.fit(train_data)
-            
-            # Predicciones en el conjunto de prueba
-            future_test = model.make_future_dataframe(periods=len(test_data), freq='16D')
-            forecast_test = model.predict(future_test)
-            
-            # Obtener predicciones para el período de prueba
-            test_predictions = forecast_test['yhat'].tail(len(test_data))
-            
-            # Calcular métricas
-            mae = np.mean(np.abs(test_data['y'].values - test_predictions.values))
-            mse = np.mean((test_data['y'].values - test_predictions.values) ** 2)
-            rmse = np.sqrt(mse)
-            mape = np.mean(np.abs((test_data['y'].values - test_predictions.values) / test_data['y'].values)) * 100
-            
-            metrics = {
-                'MAE': mae,
-                'MSE': mse,
-                'RMSE': rmse,
-                'MAPE': mape
-            }
-            
-            print(f"  ✓ Modo de estacionalidad: {seasonality_mode}")
-            print(f"  ✓ RMSE: {rmse:.4f}")
-            print(f"  ✓ MAPE: {mape:.2f}%")
-            
-            return {
-                'model': model,
-                'metrics': metrics,
-                'train_data': train_data,
-                'test_data': test_data,
-                'predictions': test_predictions,
-                'forecast': forecast_test
-            }
+        forecast_test = result['forecast']
+        
+        return {
+            'model': result.get('model'),
+            'metrics': result['metrics'],
+            'train_data': train_data,
+            'test_data': test_data,
+            'predictions': pd.Series(forecast_test['yhat'], index=test_data.index, name='yhat'),
+            'forecast': pd.DataFrame(forecast_test)
+        }
+    
+    def _future_predictions(self, region, result, periods):
+        """
+        Tabla de predicciones futuras a partir de un trabajo de pronóstico
+        """
+        # Obtener solo las predicciones futuras
+        future_predictions = {column: values[-periods:] for column, values in result['forecast'].items()}
+        
+        return pd.DataFrame({
+            'Date': future_predictions['ds'],
+            'Predicted_NDVI': future_predictions['yhat'],
+            'Lower_Bound': future_predictions['yhat_lower'],
+            'Upper_Bound': future_predictions['yhat_upper'],
+            'Region': region,
+            'Model': 'Prophet',
+            'Seasonality_Mode': result['seasonality_mode']
+        })
+    
+    def fit_prophet_model(self, region, seasonality_mode='additive'):
+        """
+        Ajusta modelo Prophet para una región
+        
+        Args:
+            region (str): Nombre de la región
+            seasonality_mode (str): Modo de estacionalidad ('additive' o 'multiplicative')
             
-        except Exception as e:
-            print(f"  ❌ Error ajustando modelo: {e}")
+        Returns:
+            dict: Modelo ajustado y métricas
+        """
+        print(f"\n📊 Ajustando modelo Prophet para {region}...")
+        
+        job = self._job(region, seasonality_mode, SPLIT_VALIDATION)
+        key = self._cache_key(job)
+        
+        if key in self.fit_cache:
+            self.cache_stats['hits'] += 1
+            result = self.fit_cache[key]
+        else:
+            self.cache_stats['misses'] += 1
+            result = prophet_job(**job, return_model=True)
+            if result['status'] == JOB_OK:
+                self.fit_cache[key] = result
+        
+        if result['status'] != JOB_OK:
+            print(f"  ❌ Error ajustando modelo: {result['error']}")
             return None
+        
+        print(f"  ✓ Modo de estacionalidad: {seasonality_mode}")
+        print(f"  ✓ RMSE: {result['metrics']['RMSE']:.4f}")
+        print(f"  ✓ MAPE: {result['metrics']['MAPE']:.2f}%")
+        
+        return self._validation_result(region, result)
     
     def predict_future(self, region, periods=12, seasonality_mode='additive'):
         """
@@ -166,92 +240,115 @@ class ProphetPredictor:
         """
         print(f"\n🔮 Prediciendo {periods} períodos futuros para {region} usando Prophet...")
         
-        # Preparar datos
-        prophet_data = self.prepare_prophet_data(region)
-        
-        # Configurar modelo Prophet
-        model = Prophet(
-            seasonality_mode=seasonality_mode,
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05,
-            seasonality_prior_scale=10.0,
-            holidays_prior_scale=10.0,
-            interval_width=0.95
-        )
-        
-        # Ajustar modelo con todos los datos
-        model.fit(prophet_data)
-        
-        # Crear DataFrame futuro
-        future = model.make_future_dataframe(periods=periods, freq='16D')
+        result = self._run_cached([self._job(region, seasonality_mode, SPLIT_FORECAST, periods)])[0]
         
-        # Generar predicciones
-        forecast = model.predict(future)
+        if result['status'] != JOB_OK:
+            raise RuntimeError(f"Error prediciendo {region}: {result['error']}")
         
-        # Obtener solo las predicciones futuras
-        future_predictions = forecast.tail(periods)
+        print(f"  ✓ Predicciones generadas para {periods} períodos")
+        print(f"  ✓ Intervalo de confianza: 95% ({self.interval_mode})")
         
-        # Crear DataFrame con predicciones
-        predictions_df = pd.DataFrame({
-            'Date': future_predictions['ds'],
-            'Predicted_NDVI': future_predictions['yhat'],
-            'Lower_Bound': future_predictions['yhat_lower'],
-            'Upper_Bound': future_predictions['yhat_upper'],
-            'Region': region,
-            'Model': 'Prophet',
-            'Seasonality_Mode': seasonality_mode
-        })
+        return self._future_predictions(region, result, periods)
+    
+    def run_jobs(self, regions, modes, periods=12):
+        """
+        Ajusta validación y pronóstico de varias regiones y modos en paralelo
         
-        print(f"  ✓ Predicciones generadas para {periods} períodos")
-        print(f"  ✓ Intervalo de confianza: 95%")
+        Todos los trabajos (región, modo, tipo de ajuste) que no están en el
+        caché de ajustes se envían juntos al pool persistente y los
+        resultados vuelven en el orden de envío.
         
-        return predictions_df
+        Args:
+            regions (list): Regiones a ajustar
+            modes (list): Modos de estacionalidad
+            periods (int): Número de períodos a predecir
+            
+        Returns:
+            dict: {(región, modo): (resultado de validación, resultado de pronóstico)}
+        """
+        jobs = [
+            self._job(region, mode, split, periods)
+            for mode in modes
+            for region in regions
+            for split in (SPLIT_VALIDATION, SPLIT_FORECAST)
+        ]
+        
+        results = self._run_cached(jobs)
+        
+        return {
+            (validation['region'], validation['seasonality_mode']): (validation, forecast)
+            for validation, forecast in zip(results[::2], results[1::2])
+        }
     
-    def predict_all_regions(self, periods=12, seasonality_mode='additive'):
+    def predict_all_modes(self, periods=12, modes=('additive', 'multiplicative')):
         """
-        Predice NDVI para todas las regiones usando Prophet
+        Predice NDVI para todas las regiones en varios modos de estacionalidad
         
         Args:
             periods (int): Número de períodos a predecir
-            seasonality_mode (str): Modo de estacionalidad
+            modes (tuple): Modos de estacionalidad
             
         Returns:
-            dict: Predicciones para todas las regiones
+            dict: {modo: resultado como el de predict_all_regions}
         """
-        print(f"\n🎯 Prediciendo NDVI para todas las regiones usando Prophet...")
-        print(f"📊 Modo de estacionalidad: {seasonality_mode}")
+        regions = list(self.data['Region'].unique())
         
-        all_predictions = []
-        all_metrics = {}
+        print(f"\n⚙️ Ajustando {len(regions) * len(modes) * 2} modelos Prophet "
+              f"con {self.fit_executor.workers} procesos...")
+        job_results = self.run_jobs(regions, modes, periods)
+        print(f"♻️ Caché de ajustes: {self.cache_stats['hits']} reutilizados, "
+              f"{self.cache_stats['misses']} ajustados")
         
-        for region in self.data['Region'].unique():
-            print(f"\nProcesando región: {region}")
+        mode_results = {}
+        for mode in modes:
+            print(f"\n🎯 Prediciendo NDVI para todas las regiones usando Prophet...")
+            print(f"📊 Modo de estacionalidad: {mode}")
             
-            # Ajustar modelo y obtener métricas
-            model_result = self.fit_prophet_model(region, seasonality_mode)
+            all_predictions = []
+            all_metrics = {}
             
-            if model_result is not None:
-                all_metrics[region] = model_result['metrics']
+            for region in regions:
+                print(f"\nProcesando región: {region}")
+                validation, forecast = job_results[(region, mode)]
                 
-                # Generar predicciones futuras
-                future_predictions = self.predict_future(region, periods, seasonality_mode)
-                all_predictions.append(future_predictions)
-        
-        # Combinar todas las predicciones
-        if all_predictions:
-            combined_predictions = pd.concat(all_predictions, ignore_index=True)
+                if validation['status'] != JOB_OK:
+                    print(f"  ❌ Error ajustando modelo: {validation['error']}")
+                    continue
+                if forecast['status'] != JOB_OK:
+                    print(f"  ❌ Error prediciendo: {forecast['error']}")
+                    continue
+                
+                all_metrics[region] = validation['metrics']
+                all_predictions.append(self._future_predictions(region, forecast, periods))
+                
+                print(f"  ✓ RMSE: {validation['metrics']['RMSE']:.4f}")
+                print(f"  ✓ MAPE: {validation['metrics']['MAPE']:.2f}%")
             
-            print(f"\n✅ Predicciones Prophet completadas para {len(all_predictions)} regiones")
+            # Combinar todas las predicciones
+            if all_predictions:
+                print(f"\n✅ Predicciones Prophet completadas para {len(all_predictions)} regiones")
+                mode_results[mode] = {
+                    'predictions': pd.concat(all_predictions, ignore_index=True),
+                    'metrics': all_metrics
+                }
+            else:
+                print("❌ No se pudieron generar predicciones")
+                mode_results[mode] = None
+        
+        return mode_results
+    
+    def predict_all_regions(self, periods=12, seasonality_mode='additive'):
+        """
+        Predice NDVI para todas las regiones usando Prophet
+        
+        Args:
+            periods (int): Número de períodos a predecir
+            seasonality_mode (str): Modo de estacionalidad
             
-            return {
-                'predictions': combined_predictions,
-                'metrics': all_metrics
-            }
-        else:
-            print("❌ No se pudieron generar predicciones")
-            return None
+        Returns:
+            dict: Predicciones para todas las regiones
+        """
+        return self.predict_all_modes(periods, (seasonality_mode,))[seasonality_mode]
     
     def compare_seasonality_modes(self, region, periods=12):
         """
@@ -267,21 +364,16 @@ class ProphetPredictor:
         print(f"\n⚖️ Comparando modos de estacionalidad para {region}...")
         
         modes = ['additive', 'multiplicative']
+        job_results = self.run_jobs([region], modes, periods)
         results = {}
         
         for mode in modes:
-            print(f"\nProbando modo: {mode}")
+            validation, forecast = job_results[(region, mode)]
             
-            # Ajustar modelo
-            model_result = self.fit_prophet_model(region, mode)
-            
-            if model_result is not None:
-                # Generar predicciones futuras
-                future_predictions = self.predict_future(region, periods, mode)
-                
+            if validation['status'] == JOB_OK and forecast['status'] == JOB_OK:
                 results[mode] = {
-                    'metrics': model_result['metrics'],
-                    'predictions': future_predictions
+                    'metrics': validation['metrics'],
+                    'predictions': self._future_predictions(region, forecast, periods)
                 }
         
         return results
@@ -318,12 +410,15 @@ def main():
         # Cargar datos
         predictor.load_data()
         
+        # Ajustar ambos modos de estacionalidad en un solo lote paralelo
+        mode_results = predictor.predict_all_modes(periods=12, modes=('additive', 'multiplicative'))
+        
         # Predicciones usando Prophet (modo aditivo)
         print("\n" + "="*50)
         print("PREDICCIONES USANDO PROPHET (MODO ADITIVO)")
         print("="*50)
         
-        additive_results = predictor.predict_all_regions(periods=12, seasonality_mode='additive')
+        additive_results = mode_results['additive']
         
         if additive_results is not None:
             predictor.export_predictions(additive_results['predictions'], "data/predictions/ndvi_predictions_prophet_additive.csv")
@@ -341,7 +436,7 @@ def main():
         print("PREDICCIONES USANDO PROPHET (MODO MULTIPLICATIVO)")
         print("="*50)
         
-        multiplicative_results = predictor.predict_all_regions(periods=12, seasonality_mode='multiplicative')
+        multiplicative_results = mode_results['multiplicative']
         
         if multiplicative_results is not None:
             predictor.export_predictions(multiplicative_results['predictions'], "data/predictions/ndvi_predictions_prophet_multiplicative.csv")
@@ -369,6 +464,9 @@ def main():
                 metrics = result['metrics']
                 print(f"  {mode.capitalize()}: RMSE={metrics['RMSE']:.4f}, MAPE={metrics['MAPE']:.2f}%")
         
+        print(f"\n♻️ Caché de ajustes: {predictor.cache_stats['hits']} reutilizados, "
+              f"{predictor.cache_stats['misses']} ajustados")
+        
         print("\n" + "="*50)
         print("✅ PREDICCIONES PROPHET COMPLETADAS")
         print("="*50)
@@ -379,6 +477,9 @@ def main():
     except Exception as e:
         print(f"❌ Error durante la predicción Prophet: {e}")
         raise
+    
+    finally:
+        predictor.fit_executor.shutdown()
 
 if __name__ == "__main__":
     main()
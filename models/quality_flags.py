@@ -0,0 +1,96 @@
+import numpy as np
+
+# Campos de bits de MOD13Q1 _250m_16_days_VI_Quality: (nombre, bit inicial, ancho)
+VI_QUALITY_FIELDS = [
+    ('QA_MODLAND', 0, 2),         # 00 bueno, 01 revisar otros QA, 10 probablemente nublado, 11 no producido
+    ('QA_Usefulness', 2, 4),      # 0000 máxima calidad ... 1111 no útil
+    ('QA_Aerosol', 6, 2),         # 00 climatología, 01 bajo, 10 intermedio, 11 alto
+    ('QA_Adjacent_Cloud', 8, 1),
+    ('QA_BRDF_Correction', 9, 1),
+    ('QA_Mixed_Clouds', 10, 1),
+    ('QA_Land_Water', 11, 3),
+    ('QA_Snow_Ice', 14, 1),
+    ('QA_Shadow', 15, 1)
+]
+
+# Valores de _250m_16_days_pixel_reliability
+RELIABILITY_FILL = -1
+RELIABILITY_GOOD = 0
+RELIABILITY_MARGINAL = 1
+RELIABILITY_SNOW_ICE = 2
+RELIABILITY_CLOUDY = 3
+
+# Valor de relleno del lector de AppEEARS para VI_Quality vacío
+VI_QUALITY_FILL = 65535
+
+# Peso por nivel de confiabilidad, indexado por pixel_reliability + 1
+RELIABILITY_WEIGHTS = np.array([0.0, 1.0, 0.5, 0.25, 0.1], dtype=np.float32)
+
+
+def decode_vi_quality(vi_quality):
+    """
+    Decodifica los bits de VI_Quality a arreglos por campo
+
+    Args:
+        vi_quality (np.ndarray): Valores enteros de VI_Quality
+
+    Returns:
+        dict: Campo -> arreglo (bool para campos de 1 bit, uint8 en otro caso)
+    """
+    qa = np.asarray(vi_quality).astype(np.uint16)
+    flags = {}
+
+    for name, shift, width in VI_QUALITY_FIELDS:
+        values = (qa >> shift) & ((1 << width) - 1)
+        flags[name] = values.astype(bool) if width == 1 else values.astype(np.uint8)
+
+    return flags
+
+
+def cloud_mask(vi_quality, pixel_reliability):
+    """
+    Composiciones nubladas o no utilizables
+
+    Se considera nublada una composición con confiabilidad 'cloudy', con
+    MODLAND 'probablemente nublado' o con nubes mezcladas; también se marcan
+    los valores de relleno y los píxeles no producidos.
+
+    Args:
+        vi_quality (np.ndarray): Valores enteros de VI_Quality
+        pixel_reliability (np.ndarray): Valores de pixel_reliability
+
+    Returns:
+        np.ndarray: Máscara booleana
+    """
+    flags = decode_vi_quality(vi_quality)
+    reliability = np.asarray(pixel_reliability)
+
+    return (
+        (reliability == RELIABILITY_CLOUDY) |
+        (reliability == RELIABILITY_FILL) |
+        (flags['QA_MODLAND'] >= 2) |
+        flags['QA_Mixed_Clouds'] |
+        (np.asarray(vi_quality) == VI_QUALITY_FILL)
+    )
+
+
+def quality_weights(vi_quality, pixel_reliability):
+    """
+    Peso de calidad por composición (1.0 = buena, 0.0 = relleno)
+
+    El peso base depende de pixel_reliability y se reduce a la mitad si hay
+    sombra o nubes adyacentes.
+
+    Args:
+        vi_quality (np.ndarray): Valores enteros de VI_Quality
+        pixel_reliability (np.ndarray): Valores de pixel_reliability
+
+    Returns:
+        np.ndarray: Pesos float32
+    """
+    flags = decode_vi_quality(vi_quality)
+    reliability = np.clip(np.asarray(pixel_reliability, dtype=np.int16), RELIABILITY_FILL, RELIABILITY_CLOUDY)
+
+    weights = RELIABILITY_WEIGHTS[reliability + 1]
+    penalized = flags['QA_Shadow'] | flags['QA_Adjacent_Cloud']
+    return np.where(penalized, weights * np.float32(0.5), weights).astype(np.float32)
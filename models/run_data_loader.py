@@ -3,8 +3,26 @@
 Script de ejemplo para ejecutar el cargador de datos NDVI
 """
 
-from data_loader import NDVIDataLoader
+from data_loader import NDVIDataLoader, QUALITY_MODES, DEFAULT_QUALITY_MODE
 import os
+import sys
+
+def quality_mode_argument(argv):
+    """
+    Modo de limpieza por calidad indicado con --quality-mode <modo>
+    
+    Args:
+        argv (list): Argumentos de la línea de comandos
+        
+    Returns:
+        str: Modo de calidad ('range', 'drop' o 'weight')
+    """
+    for position, argument in enumerate(argv):
+        if argument.startswith("--quality-mode="):
+            return argument.split("=", 1)[1]
+        if argument == "--quality-mode" and position + 1 < len(argv):
+            return argv[position + 1]
+    return DEFAULT_QUALITY_MODE
 
 def main():
     """
@@ -19,15 +37,33 @@ def main():
         print("   Asegúrate de ejecutar este script desde la carpeta 'models'")
         return
     
+    # Modo de limpieza por calidad (por defecto 'weight': las composiciones
+    # nubladas no entrenan los modelos del panel)
+    quality_mode = quality_mode_argument(sys.argv)
+    if quality_mode not in QUALITY_MODES:
+        print(f"❌ Error: modo de calidad '{quality_mode}' no soportado "
+              f"(opciones: {', '.join(QUALITY_MODES)})")
+        return
+    print(f"🧹 Modo de calidad: {quality_mode}")
+    
     # Crear instancia del cargador
-    loader = NDVIDataLoader()
+    loader = NDVIDataLoader(quality_mode=quality_mode)
+    
+    # Modo incremental: solo agrega las composiciones nuevas
+    if "--incremental" in sys.argv:
+        loader.run_incremental()
+        return
     
     try:
-        # Cargar todos los archivos CSV
-        loader.load_all_csv_files()
-        
-        # Preparar los datos
-        loader.prepare_data()
+        if "--stream" in sys.argv:
+            # Extracciones de área: agregar por zona leyendo por bloques
+            loader.stream_aggregate()
+        else:
+            # Cargar todos los archivos CSV
+            loader.load_all_csv_files()
+            
+            # Preparar los datos
+            loader.prepare_data()
         
         # Obtener resumen estadístico
         loader.get_data_summary()
@@ -38,6 +74,9 @@ def main():
         # Exportar datos procesados
         loader.export_processed_data()
         
+        # Guardar el panel región × tiempo compartido por los predictores
+        loader.export_panel()
+        
         print("\n" + "="*50)
         print("✅ PROCESAMIENTO COMPLETADO EXITOSAMENTE")
         print("="*50)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from data_cache import source_fingerprint
+from ndvi_panel import NDVIPanel
+
+
+class RegionSeriesProvider:
+    """
+    Proveedor compartido de series temporales por región
+
+    Las series salen de NDVIPanel (una fila por región sobre el calendario
+    de composiciones MODIS), que es la única implementación de la malla
+    temporal. El proveedor memoriza un panel por columna objetivo, indexado
+    por la huella del CSV procesado, de modo que la primera consulta abre o
+    construye el panel y las siguientes se responden desde memoria; si el
+    CSV cambia, el panel se vuelve a abrir automáticamente.
+    """
+
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv"):
+        """
+        Inicializa el proveedor sin paneles abiertos
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+        """
+        self.data_file = data_file
+        self._panels = {}
+
+    def panel(self, target_column='NDVI'):
+        """
+        Panel de una columna objetivo (memorizado por huella de datos)
+
+        Args:
+            target_column (str): Columna objetivo
+
+        Returns:
+            NDVIPanel: Panel regiones × composiciones
+        """
+        fingerprint = source_fingerprint(self.data_file)
+        cached = self._panels.get(target_column)
+
+        if cached is None or cached.fingerprint != fingerprint:
+            cached = NDVIPanel.load_or_build(self.data_file, target_column)
+            self._panels[target_column] = cached
+
+        return cached
+
+    def series(self, region, target_column='NDVI'):
+        """
+        Serie de una región
+
+        Args:
+            region (str): Nombre de la región
+            target_column (str): Columna objetivo
+
+        Returns:
+            pd.Series: Serie float64 con índice de fecha (una composición de
+                16 días por período; copia que el llamador puede modificar)
+        """
+        return self.panel(target_column).series(region).astype(np.float64)
@@ -0,0 +1,329 @@
+import pandas as pd
+import numpy as np
+import warnings
+warnings.filterwarnings('ignore')
+
+from ndvi_panel import composite_dates, load_panel_data, prediction_frame, row_metrics
+from interval_engine import DEFAULT_INTERVAL_LEVEL, DEFAULT_QUANTILES, add_prediction_intervals, calibration_residuals
+
+try:
+    import xgboost as xgb
+    XGBOOST_AVAILABLE = True
+except ImportError:
+    XGBOOST_AVAILABLE = False
+    print("⚠️ XGBoost no disponible. Instala con: pip install xgboost")
+
+# Rezagos (en composiciones de 16 días); 23 composiciones = un año del
+# calendario MODIS
+LAGS = (1, 2, 3, 6, 23)
+
+# Ventanas de las medias móviles sobre los valores anteriores
+WINDOWS = (3, 6, 23)
+
+# Configuración común del modelo global
+XGB_PARAMS = {
+    'n_estimators': 400,
+    'max_depth': 4,
+    'learning_rate': 0.05,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'tree_method': 'hist',        # Necesario para variables categóricas
+    'enable_categorical': True,
+    'random_state': 42
+}
+
+
+def history_length(lags=LAGS, windows=WINDOWS):
+    """
+    Períodos previos necesarios para calcular todas las variables
+    """
+    return max(max(lags), max(windows))
+
+
+def lag_features(values, targets, target_dates, region_codes, categories, lags=LAGS, windows=WINDOWS):
+    """
+    Matriz de variables para todas las series y posiciones a la vez
+
+    Cada fila describe la posición t de una serie usando solo valores
+    anteriores a t: rezagos, medias móviles (con sumas acumuladas) y el día
+    del año como seno/coseno. Las filas quedan ordenadas por serie y luego
+    por posición.
+
+    Args:
+        values (np.ndarray): Series (series × períodos)
+        targets (np.ndarray): Posiciones a describir (todas >= history_length)
+        target_dates (pd.DatetimeIndex): Fechas de esas posiciones
+        region_codes (np.ndarray): Código de región de cada serie
+        categories (pd.Index): Todas las regiones (categorías fijas)
+        lags (tuple): Rezagos a incluir
+        windows (tuple): Ventanas de las medias móviles
+
+    Returns:
+        pd.DataFrame: Variables (series · posiciones filas)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    targets = np.asarray(targets)
+    n_series = values.shape[0]
+
+    # cumsum[:, t] = suma de los valores anteriores a t
+    cumsum = np.zeros((n_series, values.shape[1] + 1))
+    np.cumsum(values, axis=1, out=cumsum[:, 1:])
+
+    features = {}
+    for lag in lags:
+        features[f'lag_{lag}'] = values[:, targets - lag].ravel()
+    for window in windows:
+        features[f'mean_{window}'] = ((cumsum[:, targets] - cumsum[:, targets - window]) / window).ravel()
+
+    angle = 2 * np.pi * pd.DatetimeIndex(target_dates).dayofyear.to_numpy() / 365.25
+    features['doy_sin'] = np.tile(np.sin(angle), n_series)
+    features['doy_cos'] = np.tile(np.cos(angle), n_series)
+
+    features['Region'] = pd.Categorical.from_codes(np.repeat(region_codes, len(targets)), categories=categories)
+
+    return pd.DataFrame(features)
+
+
+def recursive_forecast(model, values, last_date, horizon, region_codes, categories, dates=None):
+    """
+    Pronóstico recursivo de todas las series en lote
+
+    En cada paso se predice el siguiente período de todas las series con una
+    sola llamada al modelo y la predicción se usa como historia del paso
+    siguiente.
+
+    Args:
+        model: Modelo entrenado con lag_features
+        values (np.ndarray): Historia de las series (series × períodos)
+        last_date (pd.Timestamp): Fecha del último período observado
+        horizon (int): Períodos a predecir
+        region_codes (np.ndarray): Código de región de cada serie
+        categories (pd.Index): Todas las regiones
+        dates (pd.DatetimeIndex): Fechas a predecir (None = composiciones
+            siguientes a last_date)
+
+    Returns:
+        tuple: (pronóstico series × horizon, fechas pronosticadas)
+    """
+    n_series, n_periods = values.shape
+    buffer = np.empty((n_series, n_periods + horizon))
+    buffer[:, :n_periods] = values
+    if dates is None:
+        dates = composite_dates(last_date, horizon)
+
+    for step in range(horizon):
+        position = n_periods + step
+        features = lag_features(buffer[:, :position + 1], np.array([position]), dates[step:step + 1],
+                                region_codes, categories)
+        buffer[:, position] = model.predict(features)
+
+    return buffer[:, n_periods:], dates
+
+
+def fit_global(groups, ends, categories, model_params=None):
+    """
+    Entrena un único modelo con las filas de todas las series
+
+    Función de módulo para que el backtest entrene exactamente como
+    XGBoostPredictor.
+
+    Args:
+        groups (list): Tuplas (códigos de región, valores, fechas) como las
+            de NDVIPanel.group_values
+        ends (list): Períodos de entrenamiento de cada grupo
+        categories (pd.Index): Todas las regiones (categorías fijas)
+        model_params (dict): Parámetros de XGBRegressor (None = XGB_PARAMS)
+
+    Returns:
+        XGBRegressor: Modelo entrenado
+    """
+    start = history_length()
+    features = []
+    targets = []
+
+    for (codes, values, dates), end in zip(groups, ends):
+        if end <= start:
+            continue
+        positions = np.arange(start, end)
+        features.append(lag_features(values[:, :end], positions, dates[positions], codes, categories))
+        targets.append(values[:, positions].ravel())
+
+    model = xgb.XGBRegressor(**(model_params or XGB_PARAMS))
+    model.fit(pd.concat(features, ignore_index=True), np.concatenate(targets))
+    return model
+
+
+class XGBoostPredictor:
+    """
+    Clase para predicción usando un modelo XGBoost global con variables de rezago
+
+    Un solo modelo se entrena con las filas de todas las regiones (la región
+    entra como variable categórica) y pronostica de forma recursiva todas
+    las regiones en lote.
+    """
+
+    def __init__(self, data_file="data/processed/processed_ndvi_data.csv", model_params=None,
+                 interval_level=DEFAULT_INTERVAL_LEVEL, quantiles=DEFAULT_QUANTILES, interval_method='conformal',
+                 calibration_errors=None):
+        """
+        Inicializa el predictor XGBoost
+
+        Args:
+            data_file (str): Archivo CSV con datos procesados
+            model_params (dict): Parámetros de XGBRegressor (por defecto XGB_PARAMS)
+            interval_level (float): Cobertura de Lower_Bound–Upper_Bound
+            quantiles (tuple): Cuantiles intermedios adicionales (columnas Q<porcentaje>)
+            interval_method (str): 'conformal' o 'bootstrap' (ver interval_engine)
+            calibration_errors (pd.DataFrame | str): Errores del backtest (o ruta
+                del CSV exportado) con los que se calibran los intervalos; None =
+                errores de la validación 80/20
+        """
+        self.data_file = data_file
+        self.data = None
+        self.panel = None
+        self.model_params = {**XGB_PARAMS, **(model_params or {})}
+        self.model = None
+        self.interval_level = interval_level
+        self.quantiles = quantiles
+        self.interval_method = interval_method
+        self.calibration_errors = calibration_errors
+
+    def load_data(self):
+        """
+        Carga los datos procesados y el panel región × tiempo
+        """
+        self.data, self.panel = load_panel_data(self.data_file, "XGBoost")
+        return self.data
+
+    def fit_global(self, groups, ends):
+        """
+        Entrena un único modelo con las filas de todas las regiones
+
+        Args:
+            groups (list): Resultado de NDVIPanel.group_values
+            ends (list): Períodos de entrenamiento de cada grupo
+
+        Returns:
+            XGBRegressor: Modelo entrenado
+        """
+        return fit_global(groups, ends, self.panel.regions, self.model_params)
+
+    def predict_all_regions(self, periods=12):
+        """
+        Predice NDVI para todas las regiones con el modelo global
+
+        Las métricas se calculan entrenando con el 80 % inicial de cada
+        serie y pronosticando el 20 % restante de forma recursiva; el
+        pronóstico futuro usa un modelo entrenado con las series completas.
+
+        Args:
+            periods (int): Número de períodos a predecir
+
+        Returns:
+            dict: Predicciones para todas las regiones y métricas
+        """
+        print("\n🎯 Prediciendo NDVI para todas las regiones usando XGBoost global...")
+
+        groups = [group for group in self.panel.group_values() if group[1].shape[1] > history_length() + 1]
+        if not groups:
+            print("❌ No se pudieron generar predicciones")
+            return None
+
+        regions = self.panel.regions
+        all_predictions = []
+        all_metrics = {}
+        residuals = {}
+
+        # Validación: un modelo con el 80 % de cada serie
+        train_sizes = [int(values.shape[1] * 0.8) for _, values, _ in groups]
+        validation_model = self.fit_global(groups, train_sizes)
+
+        for (codes, values, dates), train_size in zip(groups, train_sizes):
+            test_predictions, _ = recursive_forecast(validation_model, values[:, :train_size], dates[train_size - 1],
+                                                     values.shape[1] - train_size, codes, regions,
+                                                     dates=dates[train_size:])
+            metrics = row_metrics(values[:, train_size:], test_predictions)
+            for row, code in enumerate(codes):
+                all_metrics[str(regions[code])] = metrics[row]
+                residuals[str(regions[code])] = values[row, train_size:] - test_predictions[row]
+
+        # Pronóstico futuro con las series completas
+        self.model = self.fit_global(groups, [values.shape[1] for _, values, _ in groups])
+        params = f"lags={list(LAGS)}, ventanas={list(WINDOWS)}, árboles={self.model_params['n_estimators']}"
+
+        for codes, values, dates in groups:
+            forecast, future_dates = recursive_forecast(self.model, values, dates[-1], periods, codes, regions)
+
+            for row, code in enumerate(codes):
+                region = str(regions[code])
+                all_predictions.append(prediction_frame(future_dates, forecast[row], region, 'XGBoost', params))
+
+                print(f"  {region}: RMSE={all_metrics[region]['RMSE']:.4f}, MAPE={all_metrics[region]['MAPE']:.2f}%")
+
+        combined_predictions = pd.concat(all_predictions, ignore_index=True)
+
+        # Intervalos a partir de los errores del backtest o de validación (sin reajustar)
+        combined_predictions = add_prediction_intervals(
+            combined_predictions, calibration_residuals(residuals, self.calibration_errors, 'xgboost'),
+            self.interval_level, self.quantiles, self.interval_method
+        )
+
+        print(f"\n✅ Predicciones XGBoost completadas para {len(all_metrics)} regiones")
+
+        return {
+            'predictions': combined_predictions,
+            'metrics': all_metrics
+        }
+
+    def export_predictions(self, predictions, output_file="data/predictions/ndvi_predictions_xgboost.csv"):
+        """
+        Exporta las predicciones a un archivo CSV
+
+        Args:
+            predictions (pd.DataFrame): DataFrame con predicciones
+            output_file (str): Nombre del archivo de salida
+        """
+        predictions.to_csv(output_file, index=False)
+        print(f"✓ Predicciones XGBoost exportadas a: {output_file}")
+
+        return output_file
+
+def main():
+    """
+    Función principal para ejecutar el predictor XGBoost
+    """
+    if not XGBOOST_AVAILABLE:
+        print("❌ XGBoost no está disponible. Instala con:")
+        print("pip install xgboost")
+        return
+
+    print("🔮 PREDICTOR XGBOOST - MONTERREY")
+    print("="*50)
+
+    # Crear instancia del predictor
+    predictor = XGBoostPredictor()
+
+    try:
+        # Cargar datos
+        predictor.load_data()
+
+        # Predicciones usando el modelo global
+        print("\n" + "="*50)
+        print("PREDICCIONES USANDO XGBOOST GLOBAL")
+        print("="*50)
+
+        xgb_results = predictor.predict_all_regions(periods=12)
+
+        if xgb_results is not None:
+            predictor.export_predictions(xgb_results['predictions'])
+
+        print("\n" + "="*50)
+        print("✅ PREDICCIONES XGBOOST COMPLETADAS")
+        print("="*50)
+
+    except Exception as e:
+        print(f"❌ Error durante la predicción XGBoost: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()